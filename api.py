@@ -0,0 +1,308 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# --- Configuration (same artifacts the Streamlit app reads) ---
+TOURISM_ANALYSIS_FILE = 'data/analysis_results.json'
+TOURISM_MAP_FILE = 'data/map_data.json'
+CIVIC_METRICS_FILE = 'data/civic_impact_metrics.json'
+DASHBOARD_ARTIFACTS_FILE = 'data/dashboard_artifacts.json'
+PERF_METRICS_FILE = 'data/perf_metrics.prom'   # periodically dumped by the Streamlit app
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 8502
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+GZIP_MIN_BYTES = 1024
+
+
+class ArtifactCache:
+    """
+    Thread-safe cache of parsed JSON artifacts. Each file is re-read only when its mtime or size
+    changes, and carries a content hash (used as the ETag) and its Last-Modified time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, path):
+        """Returns (data, etag, last_modified_ts) or None if the artifact does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                return entry[1]
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        loaded = (json.loads(raw), hashlib.sha256(raw).hexdigest()[:16], int(stat.st_mtime))
+
+        with self._lock:
+            self._entries[path] = (key, loaded)
+        return loaded
+
+
+ARTIFACTS = ArtifactCache()
+
+# --- Resources: name -> (artifact file, extractor, paginated collection key or None) ---
+
+def _key_metrics(data):
+    return data['key_metrics']
+
+def _place_sentiment(data):
+    return data['place_sentiment_data']
+
+def _map_data(data):
+    return [row for row in data if row.get('city') != 'MISSING_CITY']
+
+def _civic_density(data):
+    return {
+        'total_extracted_complaints': data.get('total_extracted_complaints', 0),
+        'city_complaint_density': data['city_complaint_density'],
+    }
+
+def _rollups(data):
+    return {
+        'version': data['version'],
+        'kpis': data['kpis'],
+        'city_rollup': (data['correlation'] or {}).get('table', []),
+        'pearson': (data['correlation'] or {}).get('pearson'),
+    }
+
+RESOURCES = {
+    '/v1/metrics': (TOURISM_ANALYSIS_FILE, _key_metrics, None),
+    '/v1/places': (TOURISM_ANALYSIS_FILE, _place_sentiment, 'data'),
+    '/v1/map': (TOURISM_MAP_FILE, _map_data, 'data'),
+    '/v1/civic': (CIVIC_METRICS_FILE, _civic_density, 'city_complaint_density'),
+    '/v1/rollups': (DASHBOARD_ARTIFACTS_FILE, _rollups, 'city_rollup'),
+}
+
+
+class QueryError(ValueError):
+    """Raised for malformed pagination or field-selection parameters (mapped to HTTP 400)."""
+
+
+def _parse_int(params, name, default, minimum, maximum):
+    value = params.get(name, [str(default)])[0]
+    try:
+        value = int(value)
+    except ValueError:
+        raise QueryError(f"'{name}' must be an integer.")
+    if not minimum <= value <= maximum:
+        raise QueryError(f"'{name}' must be between {minimum} and {maximum}.")
+    return value
+
+
+def _select_fields(rows, fields):
+    if not fields:
+        return rows
+    available = set().union(*(row.keys() for row in rows)) if rows else set()
+    unknown = [f for f in fields if f not in available]
+    if rows and unknown:
+        raise QueryError(f"Unknown field(s): {', '.join(unknown)}.")
+    return [{f: row.get(f) for f in fields} for row in rows]
+
+
+def shape_payload(payload, collection_key, query):
+    """
+    Applies pagination (?page, ?page_size) and field selection (?fields=a,b) to the resource's
+    collection. Non-collection resources support field selection on their top-level keys.
+    """
+    params = parse_qs(query)
+    fields = [f for f in params.get('fields', [''])[0].split(',') if f]
+
+    if collection_key is None:
+        if fields:
+            unknown = [f for f in fields if f not in payload]
+            if unknown:
+                raise QueryError(f"Unknown field(s): {', '.join(unknown)}.")
+            payload = {f: payload[f] for f in fields}
+        return payload
+
+    page = _parse_int(params, 'page', 1, 1, 10 ** 9)
+    page_size = _parse_int(params, 'page_size', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+
+    if isinstance(payload, list):
+        envelope, rows = {}, payload
+    else:
+        envelope = {k: v for k, v in payload.items() if k != collection_key}
+        rows = payload[collection_key]
+
+    start = (page - 1) * page_size
+    page_rows = _select_fields(rows[start:start + page_size], fields)
+    envelope.update({
+        'data': page_rows,
+        'page': page,
+        'page_size': page_size,
+        'total': len(rows),
+        'next_page': page + 1 if start + page_size < len(rows) else None,
+    })
+    return envelope
+
+
+@lru_cache(maxsize=256)
+def render_body(path, query, etag, use_gzip):
+    """Serializes (and optionally gzips) one representation; memoized per artifact version."""
+    artifact_file, extractor, collection_key = RESOURCES[path]
+    loaded = ARTIFACTS.get(artifact_file)
+    if loaded is None or loaded[1] != etag:
+        # The artifact changed between the ETag lookup and now; skip caching this race
+        raise LookupError(path)
+    payload = shape_payload(extractor(loaded[0]), collection_key, query)
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    if use_gzip and len(body) >= GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=6), True
+    return body, False
+
+
+class MetricsAPIHandler(BaseHTTPRequestHandler):
+    """Read-only JSON endpoints over the pipeline artifacts with conditional GET and gzip."""
+
+    server_version = 'TouriscopeAPI/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(parsedate_to_datetime(if_modified_since).timestamp()) >= last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_metrics(self):
+        """Serves the app's latest Prometheus text dump as-is, for a Prometheus scrape job."""
+        try:
+            with open(PERF_METRICS_FILE, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            self._send_json(503, {'error': f"'{PERF_METRICS_FILE}' not found. The Streamlit app writes it once it has served traffic."})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip('/') or '/'
+
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', 'resources': sorted(RESOURCES)})
+            return
+        if path == '/metrics':
+            self._send_metrics()
+            return
+        if path not in RESOURCES:
+            self._send_json(404, {'error': f"Unknown resource '{path}'.", 'resources': sorted(RESOURCES)})
+            return
+
+        artifact_file = RESOURCES[path][0]
+        loaded = ARTIFACTS.get(artifact_file)
+        if loaded is None:
+            self._send_json(503, {'error': f"'{artifact_file}' not found. Run the data pipeline first."})
+            return
+        _, artifact_hash, last_modified = loaded
+
+        # Query-specific representations get distinct validators; weak because gzip and identity share one
+        etag = f'W/"{artifact_hash}-{zlib.crc32(url.query.encode()):08x}"'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': formatdate(last_modified, usegmt=True),
+            'Cache-Control': 'public, max-age=0, must-revalidate',
+            'Vary': 'Accept-Encoding',
+        }
+
+        if self._not_modified(etag, last_modified):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        try:
+            body, gzipped = render_body(path, url.query, artifact_hash, use_gzip)
+        except QueryError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except LookupError:
+            self._send_json(503, {'error': 'Artifact is being updated, retry shortly.'}, {'Retry-After': '1'})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=False):
+    server = ThreadingHTTPServer((host, port), MetricsAPIHandler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless JSON API for the Touriscope pipeline metrics.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--quiet', action='store_true', help="Disable per-request access logging.")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.quiet)
+    print(f"Touriscope metrics API serving {', '.join(sorted(RESOURCES))} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
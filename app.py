@@ -2,20 +2,36 @@ import streamlit as st
 import pandas as pd
 import json
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import re
 from datetime import datetime
+from types import MappingProxyType
 import random 
-import google.generativeai as genai
-from google.genai.errors import APIError
+import time
+import threading
+from functools import wraps
 
 # --- Configuration (External Data Files) ---
 # NOTE: These files must exist in a 'data/' directory relative to app.py
 TOURISM_ANALYSIS_FILE = 'data/analysis_results.json'
 TOURISM_MAP_FILE = 'data/map_data.json' 
+MAP_COLUMNS = ['city', 'latitude', 'longitude', 'avg_score', 'total_posts']
 CIVIC_METRICS_FILE = 'data/civic_impact_metrics.json' 
+DASHBOARD_ARTIFACTS_FILE = 'data/dashboard_artifacts.json'
+TREND_ALERTS_FILE = 'data/trend_alerts.json'
+TAG_ANALYTICS_FILE = 'data/tag_term_analytics.json'
+COMPLAINT_TOPICS_FILE = 'data/complaint_topics.json'
+POST_STORE_STATS_FILE = 'data/post_store/_stats.json'
+ARTIFACT_VERSION_FILE = 'data/artifact_version.json'
+LIVE_REFRESH_SECONDS = 10   # how often live views poll ARTIFACT_VERSION_FILE (one stat() per poll)
+ADMIN_ENV_VAR = 'TOURISCOPE_ADMIN'   # '1' (or `admin = true` under [touriscope] in secrets.toml) shows the Performance page
+
+# Sidebar views and the label their render times are recorded under
+VIEWS = {
+    "Touriscope: MP Tourism Sentiment": 'tourism',
+    "Integrated Civic Impact Analysis": 'civic',
+    "Touriscope Assistant (Chatbot)": 'chatbot',
+}
+PERFORMANCE_VIEW = "Performance (Admin)"
 
 # -----------------------------------------------------
 # --- CHATBOT GEMINI CONFIGURATION ---
@@ -67,6 +83,7 @@ MP_PLACES = {
     }
 }
 
+# Fallback trend labels, used only until scripts/trend_detector.py has produced TREND_ALERTS_FILE
 TRENDING_DATA = {
     "Mahakaleshwar Temple (Ujjain)": {"sentiment_score": 0.85, "trend": "Trending Positively"},
     "Western Group Temples (Khajuraho)": {"sentiment_score": 0.91, "trend": "Trending Positively"},
@@ -91,7 +108,9 @@ if 'feedback_log' not in st.session_state:
 # -----------------------------------------------------
 
 # --- UPDATED SYSTEM INSTRUCTIONS FOR MADHYA PRADESH SCOPE ---
-SYSTEM_INSTRUCTIONS = f"""
+def get_system_instructions():
+    """Builds the system prompt on demand, so only chatbot requests pay for serializing the knowledge base."""
+    return f"""
 You are Touriscope Assistant, an AI-powered tourism guide focused on **Madhya Pradesh (MP)**, built for the Touriscope: Data-Driven Tourism Intelligence Platform.
 Your purpose is to answer all tourist queries accurately, politely, and using the constraints below.
 
@@ -106,7 +125,7 @@ Your purpose is to answer all tourist queries accurately, politely, and using th
 📊 DATA SOURCES (You MUST reference this internal data)
 ========================================================
 -   **Known Attractions:** {json.dumps(MP_PLACES)}
--   **Trending Data:** {json.dumps(TRENDING_DATA)}
+-   **Trending Data:** {get_trending_json()}
 -   **Cultural FAQs:** {json.dumps(CULTURAL_FAQ)}
 
 RULES FOR RESPONDING:
@@ -131,15 +150,24 @@ If a user reports a problem (e.g., "dirty," "garbage," "smell"), you MUST do two
 }}
 """
 
-import google.generativeai as genai
+def get_gemini_response(prompt: str, context=None):
+    """
+    Handles Gemini API calls with function calling support, fallback handling, and proper error checks.
+    With a ConversationContext, the budgeted history is sent along with the prompt, the turn's
+    prompt size and latency are recorded on it, and the exchange is added to it only when the
+    model actually replied (error messages never become history).
+    """
+    # Deferred so dashboard-only sessions never import the Gemini SDK
+    import google.generativeai as genai
+    from scripts.chat_context import estimate_tokens
 
-def get_gemini_response(prompt: str):
-    """Handles Gemini API calls with function calling support, fallback handling, and proper error checks."""
+    metrics = get_metrics_registry()
 
     # 1. Configure API key
     try:
         genai.configure(api_key= st.secrets["gemini"]["api_key"])
     except Exception as e:
+        metrics.inc('llm_errors', stage='configure')
         return f"Gemini configuration failed: {e}"
 
     # 2. Define Python function for feedback logging
@@ -176,30 +204,44 @@ def get_gemini_response(prompt: str):
     }]
 
     # 4. Load the model (with fallback if flash-lite fails)
+    system_instructions = get_system_instructions()
     try:
         model = genai.GenerativeModel(
             model_name=MODEL_ID,
-            system_instruction=SYSTEM_INSTRUCTIONS,
+            system_instruction=system_instructions,
             tools=tools
         )
     except:
         model = genai.GenerativeModel(
             model_name="gemini-2.5-flash",
-            system_instruction=SYSTEM_INSTRUCTIONS,
+            system_instruction=system_instructions,
             tools=tools
         )
 
-    # 5. Primary model call
+    # 5. Primary model call (recent turns verbatim + a summary of older ones, under a fixed token budget)
+    contents = context.build_contents(prompt) if context is not None else prompt
+    started = time.perf_counter()
     try:
-        response = model.generate_content(prompt)
+        response = model.generate_content(contents)
     except Exception as e:
+        metrics.inc('llm_errors', stage='generate')
         return f"Gemini error: {e}"
+    finally:
+        latency = time.perf_counter() - started
+        metrics.observe('llm_latency_seconds', latency, call='generate')
+        if context is not None:
+            context.record_turn(contents, estimate_tokens(system_instructions), latency)
+
+    def model_reply(text):
+        if context is not None:
+            context.add_exchange(prompt, text)
+        return text
 
     # 6. Parse tool call (function call)
     try:
         parts = response.candidates[0].content.parts
     except:
-        return response.text
+        return model_reply(response.text)
 
     for part in parts:
         if hasattr(part, "function_call"):
@@ -210,21 +252,34 @@ def get_gemini_response(prompt: str):
                 result = log_feedback(**fn.args)
 
                 # Send the result back to Gemini for the final message
-                followup = model.generate_content(
-                    contents=prompt,
-                    tool_results=[{
-                        "call": fn,
-                        "result": result
-                    }]
-                )
-                return followup.text
-
-    return response.text
+                try:
+                    with metrics.timer('llm_latency_seconds', call='tool_followup'):
+                        followup = model.generate_content(
+                            contents=contents,
+                            tool_results=[{
+                                "call": fn,
+                                "result": result
+                            }]
+                        )
+                except Exception:
+                    metrics.inc('llm_errors', stage='tool_followup')
+                    raise
+                return model_reply(followup.text)
+
+    return model_reply(response.text)
 
 # -----------------------------------------------------
 # --- 4. CHATBOT STREAMLIT UI ---
 # -----------------------------------------------------
 
+def get_chat_entities():
+    """Place and city names the conversation summary tracks, so 'its' still resolves after older turns are folded."""
+    entities = set()
+    for key in MP_PLACES:
+        place, _, city = key.partition(' (')
+        entities.update({place, city.rstrip(')')})
+    return sorted(entities)
+
 def render_chatbot_assistant():
     st.title("🤖 Touriscope Assistant: Madhya Pradesh Tourism Chatbot")
     st.markdown("Your AI-powered guide for data-driven insights into Madhya Pradesh's attractions, trends, and tourism intelligence.")
@@ -240,6 +295,12 @@ def render_chatbot_assistant():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+    # Conversation context sent to the model (kept separately from the displayed history)
+    if "chat_context" not in st.session_state:
+        from scripts.chat_context import ConversationContext
+        st.session_state["chat_context"] = ConversationContext(entities=get_chat_entities())
+    context = st.session_state["chat_context"]
+
     # Accept user input
     if prompt := st.chat_input("Ask about places, food, or report a cleanliness issue..."):
         # Add user message to chat history
@@ -248,7 +309,7 @@ def render_chatbot_assistant():
             st.markdown(prompt)
 
         # Get assistant response using the Gemini API
-        response = get_gemini_response(prompt)
+        response = get_gemini_response(prompt, context)
         
         # Display assistant response
         with st.chat_message("assistant"):
@@ -258,6 +319,9 @@ def render_chatbot_assistant():
     
     st.sidebar.markdown("---")
     st.sidebar.caption(f"Total Feedback Reports Recorded: **{len(st.session_state['feedback_log'])}**")
+    if context.turn_metrics:
+        last = context.turn_metrics[-1]
+        st.sidebar.caption(f"Last reply: ~{last['prompt_tokens']:,} prompt tokens, {last['latency_s']:.2f}s")
 
 
 # -----------------------------------------------------
@@ -304,206 +368,551 @@ def set_custom_styles():
         unsafe_allow_html=True
     )
 
-@st.cache_data
-def load_tourism_data():
-    """Loads all data for the Touriscope project."""
-    data = {}
+@st.cache_resource(show_spinner=False)
+def get_metrics_registry():
+    """Process-wide performance metrics (render/load/LLM timers, cache and error counters)."""
+    from scripts.perf_metrics import MetricsRegistry
+    return MetricsRegistry()
+
+def instrumented_cache(store, cache=st.cache_resource, **cache_options):
+    """
+    Applies `cache` (st.cache_resource or st.cache_data) and counts hits and misses per store.
+    The wrapped loader only runs on a miss, so its duration is recorded as the store's data load time.
+    """
+    def decorate(loader):
+        state = threading.local()
+
+        @wraps(loader)
+        def timed_loader(*args):
+            state.missed = True
+            with get_metrics_registry().timer('data_load_seconds', store=store):
+                return loader(*args)
+
+        cached = cache(**cache_options)(timed_loader)
+
+        @wraps(loader)
+        def lookup(*args):
+            state.missed = False
+            result = cached(*args)
+            get_metrics_registry().inc('cache_misses' if state.missed else 'cache_hits', store=store)
+            return result
+
+        return lookup
+    return decorate
+
+def _artifact_signature(*paths):
+    """Returns (path, mtime, size) for each artifact so the shared store reloads only when a file changes."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def _freeze_frame(df):
+    """Rebuilds a DataFrame on read-only column arrays so sessions can share it but never mutate it."""
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy(copy=True)
+        values.flags.writeable = False
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+def _freeze_mapping(value):
+    """Recursively wraps dicts in read-only proxies (and lists in tuples) for the shared store."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze_mapping(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze_mapping(v) for v in value)
+    return value
+
+@instrumented_cache('tourism', max_entries=1, show_spinner=False)
+def _load_tourism_store(signature):
+    """
+    Process-wide, read-only tourism data store shared by every session.
+    The artifact signature is the cache key, so a pipeline run (new mtime/size) triggers exactly one reload.
+    """
     if not os.path.exists(TOURISM_ANALYSIS_FILE) or not os.path.exists(TOURISM_MAP_FILE):
-        st.error("Tourism data missing. Run analysis_engine.py and add_coordinates.py.")
         return None
-    
+
     with open(TOURISM_ANALYSIS_FILE, 'r') as f:
         data = json.load(f)
-        
-    map_data_df = pd.read_json(TOURISM_MAP_FILE)
-    map_data_df = map_data_df[map_data_df['city'] != 'MISSING_CITY']
-    data['map_data_df'] = map_data_df
-    return data
 
-@st.cache_data
-def load_civic_metrics():
-    """Loads the civic complaint density metrics inferred from tourism data."""
+    map_data_df = pd.read_json(TOURISM_MAP_FILE)
+    if map_data_df.empty:
+        map_data_df = pd.DataFrame(columns=MAP_COLUMNS)
+    map_data_df = map_data_df[map_data_df['city'] != 'MISSING_CITY'].reset_index(drop=True)
+
+    return MappingProxyType({
+        'key_metrics': _freeze_mapping(data['key_metrics']),
+        'place_sentiment_df': _freeze_frame(pd.DataFrame(data['place_sentiment_data'])),
+        'map_data_df': _freeze_frame(map_data_df),
+        'city_month_df': _freeze_frame(pd.DataFrame(data['city_month_sentiment'])) if data.get('city_month_sentiment') else None,
+    })
+
+@instrumented_cache('civic', max_entries=1, show_spinner=False)
+def _load_civic_store(signature):
+    """Process-wide, read-only civic metrics store (see _load_tourism_store)."""
     if not os.path.exists(CIVIC_METRICS_FILE):
-        st.error(f"Civic metrics missing. Run civic_complaint_extractor.py.")
         return None
     with open(CIVIC_METRICS_FILE, 'r') as f:
-        return json.load(f)
+        civic = json.load(f)
+
+    return MappingProxyType({
+        'total_extracted_complaints': civic.get('total_extracted_complaints', 0),
+        'city_complaint_density': _freeze_frame(pd.DataFrame(civic['city_complaint_density'])),
+        'place_complaint_density': _freeze_frame(pd.DataFrame(civic['place_complaint_density'], columns=['place_id', 'total_civic_complaints'])) if 'place_complaint_density' in civic else None,
+        'city_month_complaints': _freeze_frame(pd.DataFrame(civic['city_month_complaints'], columns=['city', 'month', 'total_civic_complaints'])) if 'city_month_complaints' in civic else None,
+    })
+
+@instrumented_cache('dashboard_artifacts', max_entries=1, show_spinner=False)
+def _load_dashboard_artifacts(signature):
+    """
+    Loads the pipeline's precomputed correlation table and Plotly figure JSON, parsing each figure
+    once per artifact version. If the artifact is missing or older than its inputs, the same
+    builders are run once against the shared data stores instead.
+    """
+    import plotly.io as pio
+
+    mtimes = {path: mtime for path, mtime, _ in signature}
+    inputs = [mtimes[TOURISM_ANALYSIS_FILE], mtimes[TOURISM_MAP_FILE], mtimes[CIVIC_METRICS_FILE], mtimes[COMPLAINT_TOPICS_FILE]]
+    artifact_mtime = mtimes[DASHBOARD_ARTIFACTS_FILE]
+
+    if artifact_mtime is not None and all(m is None or m <= artifact_mtime for m in inputs):
+        with open(DASHBOARD_ARTIFACTS_FILE, 'r') as f:
+            artifacts = json.load(f)
+    else:
+        from scripts.dashboard_artifacts import assemble_dashboard_artifacts, compute_artifact_version
+
+        tourism = _load_tourism_store(_artifact_signature(TOURISM_ANALYSIS_FILE, TOURISM_MAP_FILE))
+        if tourism is None:
+            return None
+        civic = _load_civic_store(_artifact_signature(CIVIC_METRICS_FILE))
+        topics = None
+        if os.path.exists(COMPLAINT_TOPICS_FILE):
+            with open(COMPLAINT_TOPICS_FILE, 'r') as f:
+                topics = json.load(f)
+        artifacts = assemble_dashboard_artifacts(
+            tourism['key_metrics'],
+            tourism['place_sentiment_df'],
+            tourism['map_data_df'],
+            civic_df=civic['city_complaint_density'] if civic else None,
+            total_complaints=civic['total_extracted_complaints'] if civic else 0,
+            version=compute_artifact_version(TOURISM_ANALYSIS_FILE, TOURISM_MAP_FILE, CIVIC_METRICS_FILE, COMPLAINT_TOPICS_FILE),
+            topics=topics,
+            place_civic_df=civic['place_complaint_density'] if civic else None,
+            city_month_df=tourism['city_month_df'],
+            civic_month_df=civic['city_month_complaints'] if civic else None,
+        )
+
+    correlation = artifacts['correlation']
+    if correlation is not None:
+        correlation = MappingProxyType({
+            'pearson': correlation['pearson'],
+            'evidence': _freeze_mapping(correlation.get('evidence')),
+            'table_df': _freeze_frame(pd.DataFrame(correlation['table'])),
+        })
+
+    topic_correlations = MappingProxyType({
+        topic_id: MappingProxyType({
+            'label': topic['label'],
+            'pearson': topic['pearson'],
+            'evidence': _freeze_mapping(topic.get('evidence')),
+            'table_df': _freeze_frame(pd.DataFrame(topic['table'])),
+        })
+        for topic_id, topic in artifacts.get('topic_correlations', {}).items()
+    })
+
+    return MappingProxyType({
+        'version': artifacts['version'],
+        'kpis': _freeze_mapping(artifacts['kpis']),
+        'correlation': correlation,
+        'topic_correlations': topic_correlations,
+        'correlation_variants': _freeze_mapping(artifacts.get('correlation_variants', {'place': None, 'lagged': []})),
+        'figures': MappingProxyType({name: pio.from_json(spec) for name, spec in artifacts['figures'].items()}),
+    })
+
+@instrumented_cache('trend_alerts', max_entries=1, show_spinner=False)
+def _load_trend_store(signature):
+    """Process-wide, read-only trend labels and sentiment-drop alerts from trend_detector.py."""
+    if not os.path.exists(TREND_ALERTS_FILE):
+        return None
+    with open(TREND_ALERTS_FILE, 'r') as f:
+        trends = json.load(f)
+    return MappingProxyType({
+        'trending_json': json.dumps(trends['trending']),
+        'alerts_df': _freeze_frame(pd.DataFrame(trends['alerts'])),
+        'generated_at': trends.get('generated_at'),
+    })
+
+def load_trend_alerts():
+    """Returns the detected trends/alerts, or None if trend_detector.py has not run yet."""
+    return _load_trend_store(_artifact_signature(TREND_ALERTS_FILE))
+
+def get_trending_json():
+    """Trend labels for the chatbot prompt: detected from posts when available, else the fallback dict."""
+    trends = load_trend_alerts()
+    return trends['trending_json'] if trends else json.dumps(TRENDING_DATA)
+
+@instrumented_cache('tag_analytics', max_entries=1, show_spinner=False)
+def _load_tag_store(signature):
+    """Process-wide, read-only hashtag/term analytics from cooccurrence.py."""
+    if not os.path.exists(TAG_ANALYTICS_FILE):
+        return None
+    with open(TAG_ANALYTICS_FILE, 'r') as f:
+        analytics = json.load(f)
+    return MappingProxyType({
+        'tag_sentiment_df': _freeze_frame(pd.DataFrame(analytics['tag_sentiment'])),
+        'tag_pairs_df': _freeze_frame(pd.DataFrame(analytics['tag_pairs'])),
+        'negative_tags_by_city': MappingProxyType({
+            city: _freeze_frame(pd.DataFrame(rows, columns=['tag', 'posts']))
+            for city, rows in analytics['negative_tags_by_city'].items()
+        }),
+        'place_top_terms': MappingProxyType({
+            f"{place['place_name']} ({place['city']})": _freeze_frame(pd.DataFrame(place['terms'], columns=['term', 'count', 'score']))
+            for place in analytics['place_top_terms'].values()
+        }),
+    })
+
+def load_tag_analytics():
+    """Returns the tag/term analytics, or None if cooccurrence.py has not run yet."""
+    return _load_tag_store(_artifact_signature(TAG_ANALYTICS_FILE))
+
+@instrumented_cache('post_store_index', max_entries=1, show_spinner=False)
+def _load_post_store_index(signature):
+    """Process-wide city -> available months index of the partitioned post store (no post data is read)."""
+    if not os.path.exists(POST_STORE_STATS_FILE):
+        return None
+    from scripts.post_store import load_store_stats
+
+    months_by_city = {}
+    for entry in load_store_stats(POST_STORE_STATS_FILE).values():
+        months_by_city.setdefault(entry['city'], set()).add(entry['month'])
+    return MappingProxyType({
+        city: tuple(sorted(months)) for city, months in sorted(months_by_city.items()) if city != 'MISSING_CITY'
+    })
+
+@instrumented_cache('city_posts', cache=st.cache_data, max_entries=64, show_spinner=False)
+def _load_city_posts(city, months, signature):
+    """Reads one city's posts for a month range; only that city's partitions are opened."""
+    from scripts.post_store import load_posts
+    return load_posts(
+        columns=['place_name', 'sentiment_score', 'sentiment', 'likes', 'month'],
+        cities=[city], months=months,
+    )
+
+def load_post_store_index():
+    """Returns the post store's city -> months index, or None if data_cleaner.py has not built it."""
+    return _load_post_store_index(_artifact_signature(POST_STORE_STATS_FILE))
 
-def render_kpi_cards(metrics):
+@instrumented_cache('version', max_entries=1, show_spinner=False)
+def _load_version_store(signature):
+    """Process-wide copy of the latest artifact version published by watch_pipeline.py."""
+    if not os.path.exists(ARTIFACT_VERSION_FILE):
+        return None
+    with open(ARTIFACT_VERSION_FILE, 'r') as f:
+        return _freeze_mapping(json.load(f))
+
+def load_artifact_version():
+    """Returns the latest published artifact version, or None when the watcher has never run."""
+    return _load_version_store(_artifact_signature(ARTIFACT_VERSION_FILE))
+
+def load_dashboard_artifacts():
+    """Returns the ready-to-render dashboard artifacts for the current pipeline output."""
+    artifacts = _load_dashboard_artifacts(_artifact_signature(
+        TOURISM_ANALYSIS_FILE, TOURISM_MAP_FILE, CIVIC_METRICS_FILE, COMPLAINT_TOPICS_FILE, DASHBOARD_ARTIFACTS_FILE
+    ))
+    if artifacts is None:
+        st.error("Tourism data missing. Run analysis_engine.py and add_coordinates.py.")
+    return artifacts
+
+def render_figure(artifacts, name, missing_message=None):
+    """Renders a precomputed figure by name (a warning if the pipeline did not produce it)."""
+    fig = artifacts['figures'].get(name)
+    if fig is None:
+        st.warning(missing_message or f"Chart '{name}' is unavailable. Re-run dashboard_artifacts.py.")
+        return
+    with get_metrics_registry().timer('chart_render_seconds', chart=name):
+        st.plotly_chart(fig, use_container_width=True)
+
+def render_kpi_cards(kpis):
     """Renders the Key Performance Indicator (KPI) cards."""
     st.markdown("### 📊 Key Performance Indicators")
     
-    total_posts = metrics['total_posts']
-    positive_percent = metrics['sentiment_distribution'].get('Positive', 0)
-    top_place = next(iter(metrics['top_10_places'].keys()), "N/A") 
-    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric(label="Total Posts Analyzed", value=f"{total_posts:,}")
+        st.metric(label="Total Posts Analyzed", value=f"{kpis['total_posts']:,}")
     with col2:
-        st.metric(label="Positive Sentiment Share", value=f"{positive_percent}%")
+        st.metric(label="Positive Sentiment Share", value=f"{kpis['positive_percent']}%")
     with col3:
-        st.metric(label="Most Discussed Place", value=top_place)
+        st.metric(label="Most Discussed Place", value=kpis['top_place'])
     
     st.markdown("---")
 
-def create_geospatial_map(df):
-    """Creates a scatter map of MP showing sentiment by city."""
-    if df.empty:
-        st.warning("Cannot display map: Geographical data is missing.")
+def render_sentiment_alerts(trends):
+    """Renders the sentiment-drop alerts raised by trend_detector.py."""
+    st.markdown("### 🚨 Sentiment Alerts")
+    if trends is None:
+        st.info("Trend detection has not run yet. Run trend_detector.py to enable sentiment alerts.")
         return
 
-    df['marker_size'] = df['total_posts'].apply(lambda x: 10 + x / 100)
-    df['hover_text'] = df.apply(
-        lambda row: f"City: {row['city']}<br>Posts: {row['total_posts']}<br>Avg. Sentiment: {row['avg_score']:.3f}", 
-        axis=1
-    )
+    alerts_df = trends['alerts_df']
+    if alerts_df.empty:
+        st.success("No sudden or sustained sentiment drops detected. 👍")
+    else:
+        st.dataframe(
+            alerts_df[['severity', 'entity_type', 'name', 'city', 'last_period', 'latest', 'baseline', 'z_score', 'reason']].rename(columns={
+                'entity_type': 'Level', 'name': 'Place / City', 'city': 'City', 'last_period': 'Period',
+                'latest': 'Latest Sentiment', 'baseline': 'Baseline', 'z_score': 'Z-Score',
+                'reason': 'Reason', 'severity': 'Severity',
+            }),
+            hide_index=True, use_container_width=True
+        )
+    st.caption(f"Detected {trends['generated_at']} (EWMA baseline, z-score and CUSUM per place and city).")
+    st.markdown("---")
 
-    fig = px.scatter_mapbox(
-        df,
-        lat="latitude",
-        lon="longitude",
-        hover_name="hover_text",
-        size="marker_size", 
-        color="avg_score", 
-        color_continuous_scale=px.colors.sequential.Inferno, 
-        zoom=5.5, 
-        center={"lat": 23.00, "lon": 78.00}, 
-        title="Geospatial Sentiment Analysis of MP Tourism (Map View)",
-        height=600
-    )
+def render_tag_insights(tag_analytics):
+    """Renders hashtag sentiment, tag pairs and per-city/per-place drill-downs from cooccurrence.py."""
+    st.markdown("### 🏷️ Hashtags & Themes")
+    if tag_analytics is None:
+        st.info("Tag analytics not found. Run cooccurrence.py to enable this section.")
+        return
+
+    colA, colB = st.columns(2)
+    with colA:
+        st.markdown("**Hashtag Sentiment**")
+        st.dataframe(
+            tag_analytics['tag_sentiment_df'].rename(columns={
+                'tag': 'Hashtag', 'posts': 'Posts', 'avg_sentiment': 'Avg. Sentiment', 'negative_share': 'Negative Share',
+            }),
+            hide_index=True, use_container_width=True, height=300
+        )
+    with colB:
+        st.markdown("**Hashtags That Travel Together**")
+        st.dataframe(
+            tag_analytics['tag_pairs_df'].rename(columns={
+                'tag_a': 'Hashtag A', 'tag_b': 'Hashtag B', 'posts': 'Posts Together', 'lift': 'Lift',
+            }),
+            hide_index=True, use_container_width=True, height=300
+        )
 
-    fig.update_layout(mapbox_style="open-street-map")
-    fig.update_layout(margin={"r":0,"t":40,"l":0,"b":0})
-    st.plotly_chart(fig, use_container_width=True)
+    colC, colD = st.columns(2)
+    with colC:
+        cities = sorted(tag_analytics['negative_tags_by_city'])
+        city = st.selectbox("Hashtags on negative posts in:", cities, key='tag_city')
+        if city:
+            st.dataframe(tag_analytics['negative_tags_by_city'][city], hide_index=True, use_container_width=True)
+    with colD:
+        places = sorted(tag_analytics['place_top_terms'])
+        place = st.selectbox("Most distinctive words for:", places, key='term_place')
+        if place:
+            st.dataframe(tag_analytics['place_top_terms'][place], hide_index=True, use_container_width=True)
     st.markdown("---")
 
+def render_city_drilldown(store_index):
+    """Renders one city's monthly sentiment and place table, read from that city's post-store partitions only."""
+    st.markdown("### 🏙️ City Drill-down")
+    if not store_index:
+        st.info("Post store not found. Run data_cleaner.py to enable city drill-downs.")
+        return
 
-def create_sentiment_distribution_chart(metrics):
-    """Creates a donut chart for overall sentiment distribution."""
-    sentiment_df = pd.DataFrame(
-        list(metrics['sentiment_distribution'].items()), 
-        columns=['Sentiment', 'Percentage']
-    )
-    sentiment_df['Sort_Order'] = sentiment_df['Sentiment'].map({'Positive': 1, 'Neutral': 2, 'Negative': 3})
-    sentiment_df.sort_values(by='Sort_Order', inplace=True)
-    color_map = {'Positive': 'green', 'Neutral': 'gray', 'Negative': 'red'}
-
-    fig = px.pie(
-        sentiment_df, names='Sentiment', values='Percentage',
-        title='Overall Sentiment Distribution Across Madhya Pradesh Tourism',
-        hole=0.4, color='Sentiment', color_discrete_map=color_map,
-    )
-    fig.update_traces(textinfo='percent+label')
-    st.plotly_chart(fig, use_container_width=True)
+    colA, colB = st.columns([1, 2])
+    with colA:
+        city = st.selectbox("City:", list(store_index), key='drilldown_city')
+    available = store_index[city]
+    with colB:
+        start, end = st.select_slider(
+            "Months:", options=available, value=(available[0], available[-1]), key='drilldown_months'
+        ) if len(available) > 1 else (available[0], available[0])
+
+    posts = _load_city_posts(city, (start, end), _artifact_signature(POST_STORE_STATS_FILE))
+    if posts.empty:
+        st.info("No posts for this city in the selected months.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Posts", f"{len(posts):,}")
+    col2.metric("Avg. Sentiment", f"{posts['sentiment_score'].mean():.3f}")
+    col3.metric("Negative Share", f"{(posts['sentiment'] == 'negative').mean():.1%}")
+
+    colC, colD = st.columns([1.5, 1])
+    with colC:
+        with get_metrics_registry().timer('chart_render_seconds', chart='city_monthly_sentiment'):
+            monthly = posts.groupby('month')['sentiment_score'].mean().rename('Avg. Sentiment')
+            st.line_chart(monthly)
+    with colD:
+        places = posts.groupby('place_name').agg(
+            Posts=('sentiment_score', 'size'),
+            Avg_Sentiment=('sentiment_score', 'mean'),
+            Likes=('likes', 'sum'),
+        ).sort_values('Posts', ascending=False).reset_index()
+        st.dataframe(
+            places.rename(columns={'place_name': 'Place', 'Avg_Sentiment': 'Avg. Sentiment'}).round(3),
+            hide_index=True, use_container_width=True, height=300
+        )
+    st.markdown("---")
 
+def render_data_version():
+    """Caption with the live artifact version, when the dashboard is fed by watch_pipeline.py."""
+    version = load_artifact_version()
+    # This session now shows this version; poll_artifact_version reruns the page only for a newer one
+    st.session_state['rendered_artifact_version'] = version['version'] if version is not None else None
+    if version is not None:
+        st.caption(f"Live data v{version['version']} · published {version['published_at']} "
+                   f"({version['freshness_seconds']:.0f}s after the oldest post in that batch arrived)")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def poll_artifact_version():
+    """
+    Cheap live-mode poll: compares the published artifact version with the one this session rendered
+    and reruns the page only when watch_pipeline.py has published a newer one. Nothing is drawn, so
+    an unchanged version costs one stat() and no chart is re-sent.
+    """
+    version = load_artifact_version()
+    current = version['version'] if version is not None else None
+    if current != st.session_state.setdefault('rendered_artifact_version', current):
+        st.session_state['rendered_artifact_version'] = current
+        st.rerun()
+
+@st.fragment
+def render_live_overview():
+    """
+    KPIs, alerts and charts, re-rendered when poll_artifact_version sees a new version; the stores it
+    reads are keyed by artifact signature, so only a new pipeline output reloads them.
+    """
+    artifacts = load_dashboard_artifacts()
+    if not artifacts:
+        return
+    render_data_version()
+    render_kpi_cards(artifacts['kpis'])
+    render_sentiment_alerts(load_trend_alerts())
+    render_figure(artifacts, 'geospatial_map', "Cannot display map: Geographical data is missing.")
+    st.markdown("---")
 
-def create_top_places_chart(data):
-    """Creates a bar chart for top places by weighted sentiment score."""
-    sentiment_df = pd.DataFrame(data['place_sentiment_data'])
-    sentiment_df.sort_values(by='Sentiment Index', ascending=False, inplace=True)
+    colA, colB = st.columns([1, 1.5])
     
-    fig = px.bar(
-        sentiment_df.head(15), 
-        x='place_name', y='Sentiment Index', color='Total Posts', 
-        color_continuous_scale=px.colors.sequential.Sunset,
-        hover_data=['Total Posts'],
-        labels={'place_name': 'Attraction/Place Name', 'Sentiment Index': 'Weighted Sentiment Index (0 to 1)'},
-        title='Top 15 Places Ranked by Weighted Sentiment Index',
-    )
-    fig.update_layout(xaxis_tickangle=-45)
-    st.plotly_chart(fig, use_container_width=True)
+    with colA:
+        render_figure(artifacts, 'sentiment_donut')
+        render_figure(artifacts, 'platform_donut')
 
-def render_tourism_dashboard(data):
+    with colB:
+        render_figure(artifacts, 'top_places_bar')
+        render_figure(artifacts, 'discussion_bar')
+
+    st.markdown("---")
+
+@st.fragment
+def render_live_city_drilldown():
+    """City drill-down as its own fragment: picking a city or month range reruns only this section."""
+    render_city_drilldown(load_post_store_index())
+
+def render_tourism_dashboard(tag_analytics=None):
     """Renders the layout and charts for the Touriscope project."""
-    metrics = data['key_metrics']
-    map_data_df = data['map_data_df']
-    
     st.title("🗺️ Touriscope: Madhya Pradesh Tourism Sentiment Dashboard")
     st.markdown("An analysis of social media posts regarding MP tourism attractions.")
     
-    render_kpi_cards(metrics)
-    create_geospatial_map(map_data_df)
+    poll_artifact_version()
+    render_live_overview()
+    render_tag_insights(tag_analytics)
+    render_live_city_drilldown()
 
-    colA, colB = st.columns([1, 1.5])
-    
-    with colA:
-        create_sentiment_distribution_chart(metrics)
-        
-        platform_df = pd.DataFrame(
-            list(metrics['platform_distribution'].items()), 
-            columns=['Platform', 'Percentage']
-        )
-        fig_platform = px.pie(
-            platform_df, names='Platform', values='Percentage', title='Source Platform Distribution',
-            hole=0.4, color='Platform', color_discrete_map={'Twitter': '#1DA1F2', 'Instagram': '#C13584', 'Reddit': '#FF4500'}
-        )
-        fig_platform.update_traces(textinfo='percent')
-        st.plotly_chart(fig_platform, use_container_width=True)
 
+def _format_interval(interval):
+    return f"[{interval[0]:+.2f}, {interval[1]:+.2f}]" if interval else "n/a"
 
-    with colB:
-        create_top_places_chart(data)
-        
-        discussion_df = pd.DataFrame(
-            list(metrics['top_10_places'].items()), 
-            columns=['Place Name', 'Total Posts']
-        ).sort_values(by='Total Posts', ascending=True)
-
-        fig_discussion = px.bar(
-            discussion_df, x='Total Posts', y='Place Name', orientation='h',
-            title='Top 10 Most Discussed Places (By Post Volume)',
-            color='Total Posts', color_continuous_scale=px.colors.sequential.Blues,
-        )
-        st.plotly_chart(fig_discussion, use_container_width=True)
+def render_correlation_verdict(correlation_coefficient, evidence):
+    """
+    Verdict on the city correlation. With bootstrap evidence it rests on whether the rank-correlation
+    interval excludes zero; older artifacts without evidence fall back to fixed Pearson cutoffs.
+    """
+    if not evidence or not evidence['spearman_ci']:
+        if correlation_coefficient < -0.5:
+            st.error("Strong Negative Correlation Found! 📉")
+            st.markdown("This suggests that civic issues like waste management are a **major driver** of negative tourist sentiment in MP.")
+        elif correlation_coefficient < 0:
+            st.info("Weak Negative Correlation Found.")
+            st.markdown("There is a slight link observed; civic issues contribute to, but are not the main driver of, low sentiment.")
+        else:
+            st.success("Weak/No Correlation Found. 👍")
+            st.markdown("Tourist sentiment and civic complaints are independent of each other by location.")
+        return
 
+    low, high = evidence['spearman_ci']
+    interval = f"{evidence['confidence']:.0%} interval {_format_interval(evidence['spearman_ci'])}"
+    if high < 0 and evidence['spearman'] <= -0.5:
+        st.error("Strong Negative Correlation, Supported by the Data 📉")
+        st.markdown(f"Cities with more civic complaints have clearly lower sentiment ({interval}, below zero in "
+                    f"{evidence['negative_share']:.0%} of resamples). Civic issues like waste management look like a **major driver** of negative tourist sentiment.")
+    elif high < 0:
+        st.warning("Moderate Negative Correlation, Supported by the Data.")
+        st.markdown(f"The link is consistently negative ({interval}) but not strong; civic issues contribute to, but are not the main driver of, low sentiment.")
+    elif low > 0:
+        st.info("Positive Correlation Found.")
+        st.markdown(f"Cities with more complaints also score higher ({interval}), most likely because busier destinations simply produce more posts of every kind.")
+    else:
+        st.success("No Reliable Correlation 👍")
+        st.markdown(f"With {evidence['n']} cities the {interval} includes zero, so the data cannot separate a real link from chance. "
+                    "Use the place-level and lagged checks below before drawing conclusions.")
+
+def render_correlation_robustness(variants):
+    """Place-level and time-lagged versions of the civic correlation (precomputed by dashboard_artifacts.py)."""
+    rows = []
+    if variants['place']:
+        rows.append({'Variant': 'Per place (all posts)', **_evidence_row(variants['place'])})
+    for lagged in variants['lagged']:
+        label = "Per city-month (same month)" if lagged['lag_months'] == 0 else f"Per city-month, sentiment {lagged['lag_months']} month(s) later"
+        rows.append({'Variant': label, **_evidence_row(lagged)})
+    if not rows:
+        return
+    st.markdown("#### Robustness Checks")
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+    st.caption("An interval that excludes zero means the association holds across bootstrap resamples. "
+               "Lagged rows ask whether complaints precede a later drop in sentiment.")
+
+def _evidence_row(evidence):
+    return {
+        'Pairs': evidence['n'],
+        'Pearson': evidence['pearson'],
+        'Pearson CI': _format_interval(evidence['pearson_ci']),
+        'Spearman': evidence['spearman'],
+        'Spearman CI': _format_interval(evidence['spearman_ci']),
+    }
 
-def render_integrated_analysis(tourism_data, civic_metrics):
+def render_integrated_analysis(artifacts):
     """
     Renders the correlation analysis between tourism sentiment and inferred civic complaints,
-    using the Dual-Axis Bar Chart for clarity.
+    using the Dual-Axis Bar Chart for clarity. The city merge and Pearson coefficient are
+    precomputed by dashboard_artifacts.py, for the keyword count and for every complaint topic
+    discovered by complaint_topics.py.
     """
     st.title("🔗 Integrated Civic Impact Analysis: Tourism & Civic Issues")
     st.markdown("This analysis correlates **Average Tourist Sentiment** (low scores = negative experience) with the **Density of Inferred Civic Complaints** (posts mentioning 'garbage', 'smell', 'dirty', etc.) to identify high-impact problem areas.")
-    st.markdown("---")
 
-    # 1. Prepare Tourism Data (Weighted Average Sentiment by City)
-    tourism_df = tourism_data['map_data_df']
-    
-    # Calculate a weighted score for robustness
-    tourism_df['weighted_score'] = tourism_df['avg_score'] * tourism_df['total_posts']
+    # Complaint measure: the fixed civic keyword count, or one of the discovered complaint topics
+    topic_correlations = artifacts['topic_correlations']
+    measures = ['keywords'] + list(topic_correlations)
+    measure = st.selectbox(
+        "Complaint measure:", measures, key='complaint_measure',
+        format_func=lambda m: "Civic keywords (garbage, smell, dirty, ...)" if m == 'keywords' else f"Topic: {topic_correlations[m]['label']}"
+    )
+    st.markdown("---")
 
-    tourism_city_metrics = tourism_df.groupby('city').agg(
-        total_weighted_score=('weighted_score', 'sum'),
-        tourism_posts=('total_posts', 'sum')
-    ).reset_index()
+    if measure == 'keywords':
+        correlation, figure_name = artifacts['correlation'], 'dual_axis_chart'
+    else:
+        correlation, figure_name = topic_correlations[measure], f'dual_axis_chart_{measure}'
 
-    # Calculate the final Weighted Average Sentiment
-    tourism_city_metrics['avg_sentiment'] = (
-        tourism_city_metrics['total_weighted_score'] / tourism_city_metrics['tourism_posts']
-    )
-    
-    # 2. Prepare Civic Complaint Data
-    civic_df = pd.DataFrame(civic_metrics['city_complaint_density'])
-    civic_df.rename(columns={'total_civic_complaints': 'inferred_complaints'}, inplace=True)
-    
-    # 3. Merge and Correlate (on 'city')
-    correlation_df = pd.merge(
-        tourism_city_metrics,
-        civic_df,
-        on='city',
-        how='inner'
-    )
-    
-    if correlation_df.empty:
+    if correlation is None or correlation['table_df'].empty or correlation['pearson'] is None:
         st.warning("No overlapping city data found for correlation. Check data integrity.")
         return
 
-    # Calculate Correlation Coefficient (we expect a negative result)
-    correlation_coefficient = correlation_df['avg_sentiment'].corr(correlation_df['inferred_complaints'])
+    correlation_coefficient = correlation['pearson']
 
     st.markdown("### Correlation Summary")
+    evidence = correlation['evidence']
     
     col1, col2 = st.columns(2)
     
@@ -513,17 +922,21 @@ def render_integrated_analysis(tourism_data, civic_metrics):
             value=f"{correlation_coefficient:.4f}",
             delta_color="off"
         )
+        if evidence:
+            st.metric(
+                label="Spearman Rank Correlation",
+                value=f"{evidence['spearman']:.4f}",
+                delta_color="off"
+            )
+            st.caption(
+                f"{evidence['confidence']:.0%} bootstrap intervals over {evidence['n']} cities "
+                f"({evidence['resamples']:,} resamples): Pearson {_format_interval(evidence['pearson_ci'])}, "
+                f"Spearman {_format_interval(evidence['spearman_ci'])}."
+            )
     with col2:
-        if correlation_coefficient < -0.5:
-            st.error("Strong Negative Correlation Found! 📉")
-            st.markdown("This suggests that civic issues like waste management are a **major driver** of negative tourist sentiment in MP.")
-        elif correlation_coefficient < 0:
-            st.info("Weak Negative Correlation Found.")
-            st.markdown("There is a slight link observed; civic issues contribute to, but are not the main driver of, low sentiment.")
-        else:
-            st.success("Weak/No Correlation Found. 👍")
-            st.markdown("Tourist sentiment and civic complaints are independent of each other by location.")
+        render_correlation_verdict(correlation_coefficient, evidence)
             
+    render_correlation_robustness(artifacts['correlation_variants'])
     st.markdown("---")
     
     # --- Dual-Axis Bar Chart (Visualization) ---
@@ -540,58 +953,117 @@ def render_integrated_analysis(tourism_data, civic_metrics):
     )
 
 
-    # Sort the data by Sentiment (ascending) to highlight problem areas first
-    correlation_df_sorted = correlation_df.sort_values(by='avg_sentiment', ascending=True)
-
-    # Create figure with secondary y-axis
-    fig_dual = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Add Inferred Complaints as a primary bar chart (Orange/Red for "Warning" or "Issue")
-    fig_dual.add_trace(
-        go.Bar(
-            x=correlation_df_sorted['city'],
-            y=correlation_df_sorted['inferred_complaints'],
-            name='Inferred Civic Complaints (Count)',
-            marker_color='#FF4500' 
-        ),
-        secondary_y=False,
-    )
-
-    # Add Average Sentiment as a line/scatter on the secondary axis (Blue for "Analysis")
-    fig_dual.add_trace(
-        go.Scatter(
-            x=correlation_df_sorted['city'],
-            y=correlation_df_sorted['avg_sentiment'],
-            name='Average Tourist Sentiment (0 to 1)',
-            mode='lines+markers',
-            marker=dict(size=10, color='#1a629b'), 
-            line=dict(width=3, color='#1a629b')
-        ),
-        secondary_y=True,
-    )
-
-    # Add figure title and axis labels
-    fig_dual.update_layout(
-        title_text="Correlation: Low Sentiment vs. High Complaint Density by City",
-        hovermode="x unified",
-        height=550
-    )
-
-    # Set x-axis title
-    fig_dual.update_xaxes(title_text="City / Location", tickangle=-45)
-
-    # Set y-axes titles
-    fig_dual.update_yaxes(title_text="Total Inferred Complaints", secondary_y=False, range=[0, correlation_df_sorted['inferred_complaints'].max() * 1.1])
-    fig_dual.update_yaxes(title_text="Average Sentiment Score (Higher is Better)", secondary_y=True, range=[0, 1])
-
-    st.plotly_chart(fig_dual, use_container_width=True)
+    render_figure(artifacts, figure_name)
 
     st.markdown("""
     *Actionable Insight:* The negative correlation is visually apparent where **tall orange bars** coincide with **low blue markers**. These cities (e.g., Ujjain, Indore, if your data shows this) should be prioritized for civic improvement projects to maximize the positive impact on the tourist economy.
     """)
     st.markdown("---")
-    st.caption(f"Total Inferred Civic Complaints: {civic_metrics.get('total_extracted_complaints', 0)} / Data source: Filtered tourism data.")
+    st.caption(f"Total Inferred Civic Complaints: {artifacts['kpis']['total_extracted_complaints']} / Data source: Filtered tourism data.")
     
+@st.fragment
+def render_live_integrated_analysis():
+    """Integrated analysis as a fragment, so its own widgets rerun only this section."""
+    dashboard_artifacts = load_dashboard_artifacts()
+    if dashboard_artifacts and dashboard_artifacts['correlation'] is not None:
+        render_integrated_analysis(dashboard_artifacts)
+        render_data_version()
+    else:
+         st.error("Cannot load all data sources. Please ensure all preparation scripts have been run successfully.")
+
+def is_admin_session():
+    """The Performance page is listed only when the server enables it (TOURISCOPE_ADMIN=1 or the secrets file)."""
+    if os.environ.get(ADMIN_ENV_VAR) == '1':
+        return True
+    try:
+        return st.secrets.get('touriscope', {}).get('admin') is True
+    except FileNotFoundError:
+        # No secrets.toml on this server
+        return False
+
+def _timer_table(snapshot, name, label):
+    """One row per label value of a timer, in milliseconds, slowest p90 first."""
+    rows = [
+        {
+            label.replace('_', ' ').title(): timer['labels'].get(label, ''),
+            'Calls': timer['count'],
+            'p50 (ms)': timer['p50'] * 1000,
+            'p90 (ms)': timer['p90'] * 1000,
+            'p99 (ms)': timer['p99'] * 1000,
+            'Max (ms)': timer['max'] * 1000,
+            'Total (s)': timer['sum'],
+        }
+        for timer in snapshot['timers'] if timer['name'] == name
+    ]
+    if not rows:
+        return None
+    return pd.DataFrame(rows).sort_values('p90 (ms)', ascending=False).round(1)
+
+def _counter_values(snapshot, name, label):
+    return {c['labels'].get(label, ''): c['value'] for c in snapshot['counters'] if c['name'] == name}
+
+def render_performance_page():
+    """Admin view of the process-wide metrics: render, load and LLM timings, cache hit rates and errors."""
+    metrics = get_metrics_registry()
+    snapshot = metrics.snapshot()
+
+    st.title("⏱️ Performance")
+    st.caption(f"All sessions of this server process since {datetime.fromtimestamp(snapshot['started_at']):%Y-%m-%d %H:%M:%S}. "
+               f"Quantiles cover each timer's most recent calls.")
+
+    hits = _counter_values(snapshot, 'cache_hits', 'store')
+    misses = _counter_values(snapshot, 'cache_misses', 'store')
+    llm_errors = _counter_values(snapshot, 'llm_errors', 'stage')
+    llm_calls = sum(t['count'] for t in snapshot['timers'] if t['name'] == 'llm_latency_seconds')
+    lookups = sum(hits.values()) + sum(misses.values())
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Page Renders", f"{sum(t['count'] for t in snapshot['timers'] if t['name'] == 'view_render_seconds'):,}")
+    col2.metric("Cache Hit Rate", f"{sum(hits.values()) / lookups:.1%}" if lookups else "–")
+    col3.metric("LLM Calls", f"{llm_calls:,}")
+    col4.metric("LLM Errors", f"{sum(llm_errors.values()):,}")
+
+    sections = [
+        ("View Render Time", 'view_render_seconds', 'view'),
+        ("Chart Render Time", 'chart_render_seconds', 'chart'),
+        ("Data Load Time (cache misses)", 'data_load_seconds', 'store'),
+        ("LLM Call Latency", 'llm_latency_seconds', 'call'),
+    ]
+    for title, name, label in sections:
+        st.markdown(f"#### {title}")
+        table = _timer_table(snapshot, name, label)
+        if table is None:
+            st.info("No calls recorded yet.")
+        else:
+            st.dataframe(table, hide_index=True, use_container_width=True)
+
+    st.markdown("#### Cache Hits and Misses")
+    stores = sorted(set(hits) | set(misses))
+    if stores:
+        st.dataframe(pd.DataFrame([
+            {'Store': store, 'Hits': hits.get(store, 0), 'Misses': misses.get(store, 0),
+             'Hit Rate': f"{hits.get(store, 0) / (hits.get(store, 0) + misses.get(store, 0)):.1%}"}
+            for store in stores
+        ]), hide_index=True, use_container_width=True)
+    else:
+        st.info("No cache lookups recorded yet.")
+    if llm_errors:
+        st.warning("LLM errors by stage: " + ", ".join(f"{stage} {count}" for stage, count in sorted(llm_errors.items())))
+
+    st.markdown("#### Export")
+    prometheus_text = metrics.to_prometheus(snapshot)
+    colA, colB, colC = st.columns(3)
+    colA.download_button("Download Prometheus text", prometheus_text, file_name='perf_metrics.prom', mime='text/plain')
+    if colB.button("Write JSON/Prometheus dump now"):
+        from scripts.perf_metrics import DUMP_JSON_FILE, DUMP_PROM_FILE
+        metrics.dump()
+        st.success(f"Wrote {DUMP_JSON_FILE} and {DUMP_PROM_FILE}.")
+    if colC.button("Reset metrics"):
+        metrics.reset()
+        st.rerun()
+    with st.expander("Prometheus exposition"):
+        st.code(prometheus_text, language='text')
+
 def main():
     st.set_page_config(
         page_title="Data Science Project",
@@ -604,25 +1076,27 @@ def main():
     # Sidebar Navigation
     project_mode = st.sidebar.radio(
         "Select Project View:",
-        ("Touriscope: MP Tourism Sentiment", "Integrated Civic Impact Analysis", "Touriscope Assistant (Chatbot)")
+        tuple(VIEWS) + ((PERFORMANCE_VIEW,) if is_admin_session() else ())
     )
     
+    metrics = get_metrics_registry()
+    with metrics.timer('view_render_seconds', view=VIEWS.get(project_mode, 'performance')):
+        if project_mode == "Touriscope: MP Tourism Sentiment":
+            if load_dashboard_artifacts():
+                render_tourism_dashboard(load_tag_analytics())
+
+        elif project_mode == "Integrated Civic Impact Analysis":
+            poll_artifact_version()
+            render_live_integrated_analysis()
+        
+        elif project_mode == "Touriscope Assistant (Chatbot)":
+            render_chatbot_assistant()
 
-    tourism_data = load_tourism_data()
-    civic_metrics = load_civic_metrics()
-
-    if project_mode == "Touriscope: MP Tourism Sentiment":
-        if tourism_data:
-            render_tourism_dashboard(tourism_data)
+        elif project_mode == PERFORMANCE_VIEW:
+            render_performance_page()
 
-    elif project_mode == "Integrated Civic Impact Analysis":
-        if tourism_data and civic_metrics:
-            render_integrated_analysis(tourism_data, civic_metrics)
-        elif not tourism_data or not civic_metrics:
-             st.error("Cannot load all data sources. Please ensure all preparation scripts have been run successfully.")
-    
-    elif project_mode == "Touriscope Assistant (Chatbot)":
-        render_chatbot_assistant()
+    # Periodic JSON + Prometheus text dump (at most once a minute, from whichever session runs next)
+    metrics.maybe_dump()
 
 
 if __name__ == "__main__":
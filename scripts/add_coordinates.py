@@ -2,6 +2,7 @@ import pandas as pd
 import os
 
 INPUT_FILE = 'turiscope_mp_tourism_clean_data.csv'
+MAP_FILE = 'data/map_data.json'
 
 # Dictionary of approximate coordinates for key cities/attractions in MP
 COORDINATES_MAP = {
@@ -21,15 +22,8 @@ COORDINATES_MAP = {
     'MISSING_CITY': (23.00, 78.00)
 }
 
-def add_coordinates_and_save():
-    """Reads the clean data, adds lat/lon based on city, and overwrites the CSV."""
-    if not os.path.exists(INPUT_FILE):
-        print(f"Error: Clean data file not found at {INPUT_FILE}. Please run data_cleaner.py first.")
-        return
-
-    df = pd.read_csv(INPUT_FILE)
-    print(f"Loaded {len(df)} rows from clean CSV.")
-
+def add_coordinates(df):
+    """Adds latitude/longitude columns based on city."""
     # Create Latitude and Longitude columns based on the 'city' column
     df['latitude'] = df['city'].apply(lambda x: COORDINATES_MAP.get(x, (None, None))[0])
     df['longitude'] = df['city'].apply(lambda x: COORDINATES_MAP.get(x, (None, None))[1])
@@ -38,21 +32,57 @@ def add_coordinates_and_save():
     default_lat, default_lon = COORDINATES_MAP['MISSING_CITY']
     df['latitude'] = df['latitude'].fillna(default_lat)
     df['longitude'] = df['longitude'].fillna(default_lon)
+    return df
+
 
-    # Calculate average sentiment for plotting marker size/color
-    avg_sentiment = df.groupby(['city', 'latitude', 'longitude']).agg(
+def aggregate_map(df):
+    """Calculates average sentiment per city for plotting marker size/color."""
+    return df.groupby(['city', 'latitude', 'longitude']).agg(
         avg_score=('sentiment_score', 'mean'),
         total_posts=('id', 'count')
     ).reset_index()
 
+
+def add_coordinates_and_save():
+    """Reads the clean data, adds lat/lon based on city, and overwrites the CSV."""
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: Clean data file not found at {INPUT_FILE}. Please run data_cleaner.py first.")
+        return
+
+    df = pd.read_csv(INPUT_FILE)
+    print(f"Loaded {len(df)} rows from clean CSV.")
+    df = add_coordinates(df)
+    avg_sentiment = aggregate_map(df)
+
     # Save the updated data (with lat/lon) back to the clean CSV
     df.to_csv(INPUT_FILE, index=False)
     print(f"Successfully added coordinates and saved the updated data to {INPUT_FILE}.")
     
     # Save the aggregated map data to a JSON for the app to consume easily
-    map_data_output = 'data/map_data.json'
-    avg_sentiment.to_json(map_data_output, orient='records', indent=4)
-    print(f"Aggregated map data saved to {map_data_output}.")
+    avg_sentiment.to_json(MAP_FILE, orient='records', indent=4)
+    print(f"Aggregated map data saved to {MAP_FILE}.")
+
+
+def update_coordinates(new_df):
+    """
+    Micro-batch version of add_coordinates_and_save: geocodes only the new posts, appends them to the
+    clean CSV and merges their per-city counts and average score into the existing map data.
+    """
+    if new_df.empty:
+        return
+    new_df = add_coordinates(new_df.copy())
+    header = pd.read_csv(INPUT_FILE, nrows=0).columns
+    new_df.reindex(columns=header).to_csv(INPUT_FILE, mode='a', header=False, index=False)
+
+    combined = pd.concat([pd.read_json(MAP_FILE), aggregate_map(new_df)], ignore_index=True)
+    # Coordinates are a function of the city (and lose their last bits in the JSON round trip)
+    merged = combined.assign(score_sum=combined['avg_score'] * combined['total_posts']).groupby('city').agg(
+        latitude=('latitude', 'first'), longitude=('longitude', 'first'),
+        score_sum=('score_sum', 'sum'), total_posts=('total_posts', 'sum')
+    ).reset_index()
+    merged['avg_score'] = merged['score_sum'] / merged['total_posts']
+    merged[['city', 'latitude', 'longitude', 'avg_score', 'total_posts']].to_json(MAP_FILE, orient='records', indent=4)
+    print(f"Appended {len(new_df)} geocoded posts to {INPUT_FILE} and merged them into {MAP_FILE}.")
 
 
 if __name__ == "__main__":
@@ -1,51 +1,117 @@
 import pandas as pd
+import argparse
+import hashlib
+import io
 import json
 import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 # --- Configuration ---
 INPUT_FILE = 'turiscope_mp_tourism_clean_data.csv'
 OUTPUT_FILE = 'data/analysis_results.json'
+ANALYSIS_STATE_FILE = 'data/analysis_state.json'   # additive sums behind OUTPUT_FILE, merged by micro-batches
+STREAMING_OUTPUT_FILE = 'data/streaming_metrics.json'
+STREAMING_STATE_FILE = 'data/streaming_sketches.json'
+POST_STORE_STATS = 'data/post_store/_stats.json'
+STREAM_CHUNK_SIZE = 100_000
+STREAM_CHUNKS_IN_FLIGHT = 2      # per worker; bounds how many parsed chunks wait in memory
+STREAM_COLUMNS = ['username', 'city', 'place_name', 'place_id', 'tags', 'sentiment_score']
+ANALYSIS_COLUMNS = ['id', 'username', 'platform', 'sentiment', 'sentiment_score', 'likes', 'city', 'date', 'place_name', 'place_id', 'canonical_place_name']
 
 # --- Analysis Functions ---
+# Every exact metric is derived from additive sums (see summarize_posts), so a micro-batch merges the
+# sums of its new posts into the saved ones instead of re-reading the whole post history.
 
-def calculate_place_sentiment(df):
+def _records(frame):
+    """JSON-safe list of row dicts (numpy scalars converted)."""
+    return [{k: (v.item() if hasattr(v, 'item') else v) for k, v in row.items()} for row in frame.to_dict('records')]
+
+
+def summarize_posts(df):
+    """
+    Additive per-place, per-city-month and per-label sums behind every exact metric. Summaries of
+    disjoint sets of posts combine with merge_summaries into the summary of their union.
+    """
+    summary = {'places': [], 'city_months': [], 'total_posts': int(df.shape[0])}
+
+    # Weighted sentiment sums (Score * Likes) per canonical place (entity_resolution).
+    # Older clean files without place_id fall back to the raw place_name.
+    if 'sentiment_score' in df.columns and 'likes' in df.columns:
+        group_cols = ['place_id', 'canonical_place_name'] if 'place_id' in df.columns else ['place_name']
+        summary['places'] = _records(df.assign(weighted_score=df['sentiment_score'] * df['likes']).groupby(group_cols).agg(
+            total_weighted_score=('weighted_score', 'sum'),
+            total_likes=('likes', 'sum'),
+            total_posts=('id', 'count')
+        ).reset_index())
+
+    monthly = df[df['city'] != 'MISSING_CITY'].assign(month=df['date'].astype(str).str[:7])
+    summary['city_months'] = _records(monthly.groupby(['city', 'month']).agg(
+        score_sum=('sentiment_score', 'sum'),
+        scored=('sentiment_score', 'count'),
+        posts=('id', 'count')
+    ).reset_index())
+
+    summary['sentiment_counts'] = {k: int(v) for k, v in df['sentiment'].value_counts().items()}
+    summary['platform_counts'] = {k: int(v) for k, v in df['platform'].value_counts().items()}
+    # Distinct authors have no additive form; the (much smaller than the posts) set of names is kept
+    summary['authors'] = sorted(df['username'].dropna().astype(str).unique()) if 'username' in df.columns else None
+    return summary
+
+
+def merge_summaries(a, b):
+    """Summary of the union of the (disjoint) posts summarised by `a` and `b`."""
+    def merge_records(key, group_cols):
+        frame = pd.DataFrame(a[key] + b[key])
+        if frame.empty:
+            return []
+        return _records(frame.groupby(group_cols, dropna=False).sum(numeric_only=True).reset_index())
+
+    def merge_counts(key):
+        return {k: a[key].get(k, 0) + b[key].get(k, 0) for k in {**a[key], **b[key]}}
+
+    place_cols = [col for col in ('place_id', 'canonical_place_name', 'place_name') if any(col in r for r in a['places'] + b['places'])]
+    authors = None
+    if a['authors'] is not None and b['authors'] is not None:
+        authors = sorted(set(a['authors']) | set(b['authors']))
+    return {
+        'places': merge_records('places', place_cols),
+        'city_months': merge_records('city_months', ['city', 'month']),
+        'total_posts': a['total_posts'] + b['total_posts'],
+        'sentiment_counts': merge_counts('sentiment_counts'),
+        'platform_counts': merge_counts('platform_counts'),
+        'authors': authors,
+    }
+
+
+def calculate_place_sentiment(summary):
     """
     Calculates the weighted average sentiment score for each unique place.
     Weighting by the number of likes gives more importance to popular posts.
     """
-    # NOTE: This function relies on 'sentiment_score' and 'likes' columns.
+    # NOTE: This relies on 'sentiment_score' and 'likes' columns.
     # If these are missing from your cleaned CSV, this section will either
     # run with errors or use imputed data (from data_cleaner.py).
     print("Calculating place-specific sentiment scores...")
-    
-    # 1. Calculate weighted sentiment score (Score * Likes)
-    if 'sentiment_score' in df.columns and 'likes' in df.columns:
-        df['weighted_score'] = df['sentiment_score'] * df['likes']
-        
-        # 2. Group by place and sum the weighted score and total likes
-        sentiment_metrics = df.groupby('place_name').agg(
-            total_weighted_score=('weighted_score', 'sum'),
-            total_likes=('likes', 'sum'),
-            total_posts=('id', 'count')
-        ).reset_index()
-        
-        # 3. Calculate the Weighted Average Sentiment Score
+
+    if summary['places']:
+        sentiment_metrics = pd.DataFrame(summary['places']).rename(columns={'canonical_place_name': 'place_name'})
+
+        # Weighted Average Sentiment Score
         sentiment_metrics['weighted_avg_score'] = (
             sentiment_metrics['total_weighted_score'] / sentiment_metrics['total_likes']
-        ).fillna(sentiment_metrics['total_weighted_score'] / sentiment_metrics['total_posts']) 
-        
-        # 4. Filter out the missing place (if the cleaning used imputation)
+        ).fillna(sentiment_metrics['total_weighted_score'] / sentiment_metrics['total_posts'])
+
+        # Filter out the missing place (if the cleaning used imputation)
         sentiment_metrics = sentiment_metrics[
             sentiment_metrics['place_name'] != 'MISSING_PLACE'
         ].sort_values(by='weighted_avg_score', ascending=False)
-        
-        # Select final columns and rename
+
+        # Select final columns and rename (place_id is kept so downstream joins use the canonical key)
         sentiment_metrics = sentiment_metrics[[
-            'place_name', 
-            'weighted_avg_score', 
-            'total_posts'
+            col for col in ['place_id', 'place_name', 'weighted_avg_score', 'total_posts']
+            if col in sentiment_metrics.columns
         ]].rename(columns={'weighted_avg_score': 'Sentiment Index', 'total_posts': 'Total Posts'})
-        
+
         return sentiment_metrics
     else:
         print("Warning: Skipping weighted sentiment calculation due to missing 'sentiment_score' or 'likes'.")
@@ -53,78 +119,263 @@ def calculate_place_sentiment(df):
         return pd.DataFrame(columns=['place_name', 'Sentiment Index', 'Total Posts'])
 
 
-def generate_key_metrics(df):
+def calculate_city_month_sentiment(summary):
+    """Average sentiment and post count per city and calendar month (input to the time-lagged civic correlation)."""
+    monthly = pd.DataFrame(summary['city_months'], columns=['city', 'month', 'score_sum', 'scored', 'posts'])
+    monthly['avg_sentiment'] = monthly['score_sum'] / monthly['scored'].where(monthly['scored'] > 0)
+    return monthly[['city', 'month', 'avg_sentiment', 'posts']].sort_values(['city', 'month']).reset_index(drop=True)
+
+
+def generate_key_metrics(summary):
     """
     Calculates overall sentiment distribution and top discussion places.
     """
     metrics = {}
 
     # 1. Overall Sentiment Distribution
-    sentiment_counts = df['sentiment'].value_counts(normalize=True).mul(100).round(2)
-    
+    sentiment_counts = pd.Series(summary['sentiment_counts'], dtype=float).sort_values(ascending=False)
+    sentiment_counts = sentiment_counts.div(sentiment_counts.sum()).mul(100).round(2)
+
     # *** CRITICAL FIX HERE: Capitalize keys for dashboard compatibility ***
     metrics['sentiment_distribution'] = {
-        k.title(): v 
+        k.title(): v
         for k, v in sentiment_counts.to_dict().items()
     }
     # *******************************************************************
 
-    # 2. Top 10 Most Discussed Places (by total posts)
-    top_discussion = df['place_name'].value_counts()
-    top_discussion = top_discussion[top_discussion.index != 'MISSING_PLACE']
-    metrics['top_10_places'] = top_discussion.head(10).to_dict()
-    
+    # 2. Top 10 Most Discussed Places (by total posts, counted per canonical place)
+    places = pd.DataFrame(summary['places'])
+    if places.empty:
+        top_discussion = pd.Series(dtype=int)
+    elif 'place_id' in places.columns:
+        places = places[places['place_id'] != 'MISSING_PLACE']
+        top_discussion = places.groupby('place_id').agg(
+            name=('canonical_place_name', 'first'), posts=('total_posts', 'sum')
+        ).set_index('name')['posts'].sort_values(ascending=False, kind='stable')
+    else:
+        places = places[places['place_name'] != 'MISSING_PLACE']
+        top_discussion = places.set_index('place_name')['total_posts'].sort_values(ascending=False, kind='stable')
+    metrics['top_10_places'] = {k: int(v) for k, v in top_discussion.head(10).items()}
+
     # 3. Platform Distribution
-    platform_counts = df['platform'].value_counts(normalize=True).mul(100).round(2)
-    metrics['platform_distribution'] = platform_counts.to_dict()
+    platform_counts = pd.Series(summary['platform_counts'], dtype=float).sort_values(ascending=False)
+    metrics['platform_distribution'] = platform_counts.div(platform_counts.sum()).mul(100).round(2).to_dict()
 
     # 4. Total Posts
-    metrics['total_posts'] = int(df.shape[0])
-    
-    return metrics
+    metrics['total_posts'] = int(summary['total_posts'])
 
-# --- Main Execution Block (remains unchanged) ---
+    # 5. Reach: distinct authors
+    if summary['authors'] is not None:
+        metrics['distinct_authors'] = len(summary['authors'])
 
-def main():
-    if not os.path.exists(INPUT_FILE):
-        print(f"\nError: Input file '{INPUT_FILE}' not found.")
-        print("Please run data_cleaner.py first, or ensure the file is named correctly.")
-        return
+    return metrics
 
-    print(f"\nLoading cleaned data from {INPUT_FILE} for analysis...")
-    try:
-        df = pd.read_csv(INPUT_FILE)
-    except Exception as e:
-        print(f"Failed to load CSV: {e}")
-        return
 
-    # --- Run Analysis ---
-    
+# --- Exact Mode ---
+
+def write_analysis(summary, output_file=OUTPUT_FILE, state_file=ANALYSIS_STATE_FILE):
+    """Writes the exact place sentiment and key metrics of `summary` to `output_file`, and the summary itself to `state_file`."""
     # Calculate weighted sentiment scores for each place
-    place_sentiment_df = calculate_place_sentiment(df)
-    
+    place_sentiment_df = calculate_place_sentiment(summary)
+
     # Calculate overall key metrics
-    key_metrics = generate_key_metrics(df)
+    key_metrics = generate_key_metrics(summary)
 
     # --- Format Output ---
-    
+
     # Combine all results into a single dictionary
     final_output = {
         'key_metrics': key_metrics,
-        'place_sentiment_data': place_sentiment_df.to_dict('records') # List of dictionaries for Streamlit
+        'place_sentiment_data': _records(place_sentiment_df), # List of dictionaries for Streamlit
+        'city_month_sentiment': _records(calculate_city_month_sentiment(summary)),
     }
-    
+
     # --- Export Results ---
-    
-    print(f"\nExporting analysis results to {OUTPUT_FILE}...")
-    
+
+    print(f"\nExporting analysis results to {output_file}...")
+
     # Ensure the 'data' directory exists
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    
-    with open(OUTPUT_FILE, 'w') as f:
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    with open(output_file, 'w') as f:
         json.dump(final_output, f, indent=4)
-        
-    print("[SUCCESS] Analysis complete! Results saved to analysis_results.json.")
+    with open(state_file, 'w') as f:
+        json.dump(summary, f)
+
+    print(f"[SUCCESS] Analysis complete! Results saved to {output_file}.")
+
+    return place_sentiment_df
+
+
+def run_exact_analysis(df, output_file=OUTPUT_FILE, state_file=ANALYSIS_STATE_FILE):
+    """Computes the exact place sentiment and key metrics for `df` and writes them to `output_file`."""
+    return write_analysis(summarize_posts(df), output_file, state_file)
+
+
+def update_exact_analysis(new_df, output_file=OUTPUT_FILE, state_file=ANALYSIS_STATE_FILE):
+    """Micro-batch version of run_exact_analysis: merges the sums of `new_df` into the saved ones."""
+    with open(state_file, 'r') as f:
+        summary = json.load(f)
+    return write_analysis(merge_summaries(summary, summarize_posts(new_df)), output_file, state_file)
+
+
+# --- Streaming Mode (fixed-memory sketches) ---
+
+def _sketch_chunk(chunk):
+    """Worker: folds one chunk into fresh sketches and returns them serialised for merging."""
+    from streaming_sketches import StreamingMetrics
+    return StreamingMetrics().update(chunk).to_dict()
+
+
+def _file_prefix_sha1(path, length):
+    """sha1 of the first `length` bytes, used to check a file was only appended to since it was sketched."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while length > 0:
+            block = f.read(min(1 << 20, length))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+    return digest.hexdigest()
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of an open binary file that stops `length` bytes after its current position."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def run_streaming_analysis(input_file, workers=1, resume=False):
+    """
+    Approximate key metrics over an arbitrarily large post file in fixed memory.
+    The file is read in chunks; each chunk is sketched (optionally in parallel worker processes)
+    and merged into the running state. With resume=True the previous sketch state is loaded
+    first and only the bytes appended to the input since it was last sketched are read, so no
+    post is counted twice. If the input was rewritten rather than appended to, the state is
+    rebuilt from scratch.
+
+    Only the bytes present when the run starts are read, and that is the offset recorded in the
+    state, so rows appended while the run is in progress are left for the next resume.
+    """
+    from streaming_sketches import StreamingMetrics
+
+    source = os.path.normpath(input_file)
+    size = os.path.getsize(input_file)
+    state, offset = StreamingMetrics(), 0
+    if resume and os.path.exists(STREAMING_STATE_FILE):
+        with open(STREAMING_STATE_FILE, 'r') as f:
+            state = StreamingMetrics.from_dict(json.load(f))
+        print(f"Resumed sketch state covering {state.posts:,} posts.")
+
+        seen = state.sources.get(source)
+        if seen is not None:
+            if seen['bytes'] <= size and _file_prefix_sha1(input_file, seen['bytes']) == seen['sha1']:
+                offset = seen['bytes']
+            else:
+                print(f"{input_file} changed since it was sketched (not just appended to); rebuilding the sketch state.")
+                state = StreamingMetrics()
+        if offset == size:
+            print(f"No new posts in {input_file} since the saved state.")
+            return state
+
+    header = pd.read_csv(input_file, nrows=0).columns
+    usecols = [col for col in STREAM_COLUMNS if col in header]
+    rows_before = state.sources.get(source, {}).get('rows', 0) if offset else 0
+
+    with open(input_file, 'rb') as f:
+        # Continue right after the last sketched row (the header is not repeated there) and stop at `size`
+        f.seek(offset)
+        reader = io.BufferedReader(_ByteRange(f, size - offset))
+        if offset:
+            chunks = pd.read_csv(reader, chunksize=STREAM_CHUNK_SIZE, header=None, names=list(header), usecols=usecols)
+        else:
+            chunks = pd.read_csv(reader, chunksize=STREAM_CHUNK_SIZE, usecols=usecols)
+
+        posts_before = state.posts
+        if workers > 1:
+            # Submit chunks as workers free up rather than all at once, so memory stays bounded
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for chunk in chunks:
+                    pending.add(pool.submit(_sketch_chunk, chunk))
+                    if len(pending) >= STREAM_CHUNKS_IN_FLIGHT * workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            state.merge(StreamingMetrics.from_dict(future.result()))
+                for future in wait(pending).done:
+                    state.merge(StreamingMetrics.from_dict(future.result()))
+        else:
+            for chunk in chunks:
+                state.update(chunk)
+
+    state.sources[source] = {
+        'bytes': size,
+        'sha1': _file_prefix_sha1(input_file, size),
+        'rows': rows_before + state.posts - posts_before,
+    }
+    return state
+
+# --- Main Execution Block ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Touriscope sentiment and key-metric analysis.")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Approximate metrics with mergeable sketches (fixed memory, any input size).")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for --streaming.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Merge into the saved sketch state instead of starting fresh (--streaming).")
+    parser.add_argument('--input', default=INPUT_FILE)
+    args = parser.parse_args()
+
+    if args.streaming:
+        if not os.path.exists(args.input):
+            print(f"\nError: Input file '{args.input}' not found.")
+            return
+        print(f"\nStreaming {args.input} through sketches ({args.workers} worker(s))...")
+        state = run_streaming_analysis(args.input, workers=args.workers, resume=args.resume)
+
+        os.makedirs(os.path.dirname(STREAMING_OUTPUT_FILE), exist_ok=True)
+        with open(STREAMING_STATE_FILE, 'w') as f:
+            json.dump(state.to_dict(), f)
+        summary = state.summary()
+        with open(STREAMING_OUTPUT_FILE, 'w') as f:
+            json.dump(summary, f, indent=4)
+
+        print(f"Posts: {summary['total_posts']:,} | Distinct authors (approx.): {summary['distinct_authors']:,}")
+        print(f"[SUCCESS] Streaming metrics saved to {STREAMING_OUTPUT_FILE} (sketch state: {STREAMING_STATE_FILE}).")
+        return
+
+    if not os.path.exists(args.input):
+        print(f"\nError: Input file '{args.input}' not found.")
+        print("Please run data_cleaner.py first, or ensure the file is named correctly.")
+        return
+
+    try:
+        if args.input == INPUT_FILE and os.path.exists(POST_STORE_STATS):
+            # Only the columns the metrics use are decoded from the partitioned post store
+            from post_store import load_posts
+            print(f"\nLoading cleaned data from the post store for analysis...")
+            df = load_posts(columns=ANALYSIS_COLUMNS)
+        else:
+            print(f"\nLoading cleaned data from {args.input} for analysis...")
+            df = pd.read_csv(args.input)
+    except Exception as e:
+        print(f"Failed to load clean data: {e}")
+        return
+
+    place_sentiment_df = run_exact_analysis(df)
     
     print("\n--- Sample Place Sentiment Data (Top 5) ---")
     print(place_sentiment_df.head().to_markdown(index=False, numalign="left", stralign="left"))
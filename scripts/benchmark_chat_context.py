@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from chat_context import ConversationContext, estimate_tokens
+
+# --- Configuration ---
+OUTPUT_FILE = 'benchmarks/chat_context.json'
+SYSTEM_TOKENS = 1500                # roughly the size of app.py's system instructions
+BASE_LATENCY_S = 0.02               # stub model: fixed cost per call...
+LATENCY_PER_1K_TOKENS_S = 0.01      # ...plus a cost proportional to the prompt
+CHECKPOINTS = (1, 5, 10, 25, 50, 100, 200)
+ENTITIES = ['Upper Lake', 'Bhopal', 'Mahakaleshwar Temple', 'Ujjain', 'Western Group Temples', 'Khajuraho',
+            'Sarafa Bazaar', 'Indore', 'Van Vihar National Park']
+
+# A scripted session cycling through places with pronoun follow-ups
+SCRIPT = [
+    "Tell me about {place}.",
+    "What are its timings?",
+    "Is it crowded on weekends? My family wants a calm visit and we are travelling with two kids and grandparents.",
+    "Any food recommendations nearby?",
+]
+PLACES = ['Upper Lake', 'Mahakaleshwar Temple', 'Western Group Temples', 'Sarafa Bazaar', 'Van Vihar National Park']
+
+
+class StubModel:
+    """Stands in for GenerativeModel: latency grows with prompt size and replies are ~120-token paragraphs."""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, contents):
+        if isinstance(contents, str):
+            contents = [{'role': 'user', 'parts': [contents]}]
+        tokens = SYSTEM_TOKENS + ConversationContext.contents_tokens(contents)
+        time.sleep(BASE_LATENCY_S + LATENCY_PER_1K_TOKENS_S * tokens / 1000)
+        self.calls.append(contents)
+        last = contents[-1]['parts'][0]
+        return f"Here is what Touriscope knows about that ({last[:40]}). " + "It is a popular stop in Madhya Pradesh. " * 10
+
+
+class FullHistory(ConversationContext):
+    """The naive strategy: every exchange verbatim, forever."""
+
+    def _fold(self):
+        pass
+
+
+def run_session(context, turns):
+    model = StubModel()
+    for turn in range(turns):
+        prompt = SCRIPT[turn % len(SCRIPT)].format(place=PLACES[(turn // len(SCRIPT)) % len(PLACES)])
+        contents = context.build_contents(prompt)
+        started = time.perf_counter()
+        reply = model.generate_content(contents)
+        context.record_turn(contents, SYSTEM_TOKENS, time.perf_counter() - started)
+        context.add_exchange(prompt, reply)
+    return context.turn_metrics, model.calls
+
+
+def summarize(metrics):
+    by_turn = {m['turn']: m for m in metrics}
+    return {
+        'checkpoints': {
+            turn: {'prompt_tokens': by_turn[turn]['prompt_tokens'], 'latency_s': by_turn[turn]['latency_s']}
+            for turn in CHECKPOINTS if turn in by_turn
+        },
+        'max_prompt_tokens': max(m['prompt_tokens'] for m in metrics),
+        'median_latency_s': round(statistics.median(m['latency_s'] for m in metrics), 4),
+        'last_10_mean_latency_s': round(statistics.mean(m['latency_s'] for m in metrics[-10:]), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares budgeted vs full-history chatbot context against a stub model.")
+    parser.add_argument('--turns', type=int, default=100)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    print(f"Simulating a {args.turns}-turn session against the stub model...")
+    budgeted_metrics, budgeted_calls = run_session(ConversationContext(entities=ENTITIES), args.turns)
+    full_metrics, _ = run_session(FullHistory(entities=ENTITIES), args.turns)
+
+    # Pronoun follow-ups must still see the place they refer to, verbatim or in the summary
+    unresolved = [
+        turn + 1 for turn, contents in enumerate(budgeted_calls)
+        if SCRIPT[turn % len(SCRIPT)].startswith("What are its")
+        and PLACES[(turn // len(SCRIPT)) % len(PLACES)] not in json.dumps(contents[:-1])
+    ]
+
+    report = {
+        'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'turns': args.turns,
+        'stub_latency': {'base_s': BASE_LATENCY_S, 'per_1k_tokens_s': LATENCY_PER_1K_TOKENS_S, 'system_tokens': SYSTEM_TOKENS},
+        'budgeted': summarize(budgeted_metrics),
+        'full_history': summarize(full_metrics),
+        'follow_ups_missing_their_place': unresolved,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"\n{'turn':>6} {'budgeted tokens':>16} {'full-history tokens':>20}")
+    for turn, checkpoint in report['budgeted']['checkpoints'].items():
+        print(f"{turn:>6} {checkpoint['prompt_tokens']:>16,} {report['full_history']['checkpoints'][turn]['prompt_tokens']:>20,}")
+    print(f"\nMean latency of the last 10 turns: budgeted {report['budgeted']['last_10_mean_latency_s']}s, "
+          f"full history {report['full_history']['last_10_mean_latency_s']}s")
+    print(f"Follow-ups whose place was lost: {unresolved or 'none'}")
+    print(f"[SUCCESS] Chat context benchmark saved to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
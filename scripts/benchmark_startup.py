@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+# --- Configuration ---
+APP_FILE = 'app.py'
+OUTPUT_FILE = 'benchmarks/startup_profile.json'
+TOP_N_IMPORTS = 15
+VIEWS = (
+    "Touriscope: MP Tourism Sentiment",
+    "Integrated Civic Impact Analysis",
+    "Touriscope Assistant (Chatbot)",
+)
+# Errors the app shows when the pipeline outputs are absent; a render measured against them is meaningless
+MISSING_DATA_MARKERS = (
+    "Tourism data missing",
+    "Cannot load all data sources",
+)
+
+# Runs in a fresh interpreter so every measurement is a true cold start
+FIRST_RENDER_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+first = time.perf_counter() - start
+errors = [str(e.value) for e in at.error]
+views = {{}}
+for view in {views!r}:
+    t0 = time.perf_counter()
+    at.sidebar.radio[0].set_value(view).run()
+    views[view] = time.perf_counter() - t0
+    errors += [str(e.value) for e in at.error]
+print(json.dumps({{
+    'first_render_s': first,
+    'view_switch_s': views,
+    'exceptions': [str(e.message) for e in at.exception],
+    'errors': sorted(set(errors)),
+    'heavy_modules_loaded': sorted(m for m in ('plotly', 'plotly.express', 'google.generativeai', 'google.genai') if m in sys.modules),
+}}))
+"""
+
+
+def profile_imports(app_file):
+    """
+    Runs `python -X importtime -c "import app"` and aggregates the per-module timings.
+    Returns the total import time and the slowest top-level packages (cumulative microseconds).
+    """
+    module = os.path.splitext(os.path.basename(app_file))[0]
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(app_file)),
+        capture_output=True, text=True
+    )
+
+    # Each line is "import time: self | cumulative | <indent>name"; two spaces of indent per nesting level
+    top_level, pending = {}, {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, raw_name = line[len('import time:'):].split('|')
+        name = raw_name.strip()
+        level = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        if level == 1:
+            pending[name] = int(cumulative_us)
+        elif level == 0:
+            if name == module:
+                top_level = pending
+                total_us = int(cumulative_us)
+            pending = {}
+
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:TOP_N_IMPORTS]
+    return {
+        'total_import_us': total_us,
+        'slowest_imports_us': dict(slowest),
+        'import_error': result.returncode != 0 and result.stderr.strip().splitlines()[-1] or None,
+    }
+
+
+def measure_first_render(app_file):
+    """Time-to-first-render of the default view and each view switch, measured with Streamlit's AppTest."""
+    snippet = FIRST_RENDER_SNIPPET.format(app=os.path.basename(app_file), views=VIEWS)
+    result = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=os.path.dirname(os.path.abspath(app_file)),
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr else 'unknown'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def missing_data_errors(render_run):
+    """Error messages of a render run that mean the app was measured without its data artifacts."""
+    return [message for message in render_run.get('errors', [])
+            if any(marker in message for marker in MISSING_DATA_MARKERS)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profiles app.py cold-start imports and time-to-first-render.")
+    parser.add_argument('--app', default=APP_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--runs', type=int, default=3, help="Cold starts to measure; the median is reported.")
+    args = parser.parse_args()
+
+    print(f"Profiling imports of {args.app} ({args.runs} cold runs)...")
+    import_runs = [profile_imports(args.app) for _ in range(args.runs)]
+    render_runs = [measure_first_render(args.app) for _ in range(args.runs)]
+
+    failed = [run.get('error') for run in render_runs if 'error' in run]
+    failed += sorted({message for run in render_runs for message in missing_data_errors(run)})
+    if failed:
+        print("[ERROR] The app did not render its dashboards; run the data pipeline first. "
+              f"{args.output} was not updated.")
+        for message in failed:
+            print(f"  - {message}")
+        sys.exit(1)
+
+    import_totals = sorted(run['total_import_us'] for run in import_runs)
+    render_totals = sorted(run['first_render_s'] for run in render_runs if 'first_render_s' in run)
+
+    report = {
+        'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'median_import_ms': round(import_totals[len(import_totals) // 2] / 1000, 1),
+        'median_first_render_s': round(render_totals[len(render_totals) // 2], 3) if render_totals else None,
+        'imports': import_runs[-1],
+        'render': render_runs[-1],
+    }
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"\nMedian `import app`: {report['median_import_ms']} ms")
+    print(f"Median time-to-first-render: {report['median_first_render_s']} s")
+    print("\n--- Slowest imports (cumulative us) ---")
+    for name, us in report['imports']['slowest_imports_us'].items():
+        print(f"{us:>10}  {name}")
+    print(f"\n[SUCCESS] Startup profile saved to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import re
+import time
+
+# --- Configuration ---
+CHARS_PER_TOKEN = 4             # rough English/Hinglish estimate; no tokenizer download needed
+HISTORY_TOKEN_BUDGET = 1200     # verbatim turns + summary sent with each prompt
+SUMMARY_TOKEN_BUDGET = 300      # share of the budget the folded summary may use
+KEEP_RECENT_EXCHANGES = 3       # user/assistant exchanges always kept verbatim (if they fit)
+SUMMARY_SNIPPET_CHARS = 160     # per side of a folded exchange
+MAX_ENTITIES = 5                # most recently discussed places/cities kept in the summary
+MAX_TURN_METRICS = 200          # per-turn records kept per session
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def _snippet(text, limit=SUMMARY_SNIPPET_CHARS):
+    """First sentence of `text`, cut to `limit` characters, on one line."""
+    text = ' '.join(str(text).split())
+    text = SENTENCE_END.split(text, maxsplit=1)[0]
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + '…'
+
+
+class ConversationContext:
+    """
+    Multi-turn context for the chatbot under a fixed token budget.
+
+    The newest exchanges are sent verbatim; once they no longer fit HISTORY_TOKEN_BUDGET (or exceed
+    KEEP_RECENT_EXCHANGES), the oldest are folded into a compact extractive summary (one line per
+    exchange, oldest lines dropped first) plus the places most recently discussed, so follow-ups
+    like "what are its timings?" still resolve. Folding is local string work, never a model call,
+    so the prompt stays bounded and per-turn latency stays flat however long the session runs.
+    """
+
+    def __init__(self, entities=(), budget_tokens=HISTORY_TOKEN_BUDGET, summary_tokens=SUMMARY_TOKEN_BUDGET,
+                 keep_recent=KEEP_RECENT_EXCHANGES):
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.keep_recent = keep_recent
+        # Longest names first so 'Upper Lake (Bhopal)' wins over 'Bhopal'
+        self.entities = sorted({e for e in entities if e}, key=len, reverse=True)
+        self.exchanges = []          # [(user, assistant)] kept verbatim
+        self.summary_lines = []      # folded exchanges, oldest first
+        self.omitted = 0             # folded lines dropped to respect summary_tokens
+        self.recent_entities = []    # most recent last
+        self.turn_metrics = []
+
+    # --- History ---
+
+    def add_exchange(self, user, assistant):
+        self.exchanges.append((user, assistant))
+        self._track_entities(user)
+        self._track_entities(assistant)
+        self._fold()
+
+    def _track_entities(self, text):
+        lowered = str(text).lower()
+        for entity in self.entities:
+            if entity.lower() in lowered:
+                if entity in self.recent_entities:
+                    self.recent_entities.remove(entity)
+                self.recent_entities.append(entity)
+        del self.recent_entities[:-MAX_ENTITIES]
+
+    def _exchange_tokens(self):
+        return sum(estimate_tokens(u) + estimate_tokens(a) for u, a in self.exchanges)
+
+    def _fold(self):
+        """Moves the oldest verbatim exchanges into the summary until the verbatim part fits its budget."""
+        verbatim_budget = self.budget_tokens - self.summary_tokens
+        while self.exchanges and (len(self.exchanges) > self.keep_recent or self._exchange_tokens() > verbatim_budget):
+            user, assistant = self.exchanges.pop(0)
+            self.summary_lines.append(f"- User: {_snippet(user)} | Assistant: {_snippet(assistant)}")
+        while self.summary_lines and estimate_tokens(self.summary()) > self.summary_tokens:
+            self.summary_lines.pop(0)
+            self.omitted += 1
+
+    def summary(self):
+        """Compact text standing in for every folded exchange ('' while nothing has been folded)."""
+        if not self.summary_lines and not self.omitted:
+            return ''
+        lines = ["Summary of the earlier conversation:"]
+        if self.recent_entities:
+            lines.append(f"Places discussed, most recent last: {', '.join(self.recent_entities)}.")
+        if self.omitted:
+            lines.append(f"({self.omitted} older exchange(s) omitted.)")
+        return '\n'.join(lines + self.summary_lines)
+
+    def build_contents(self, prompt):
+        """Gemini `contents` for the next call: summary, verbatim recent exchanges, then the new prompt."""
+        contents = []
+        summary = self.summary()
+        if summary:
+            contents.append({'role': 'user', 'parts': [summary]})
+            contents.append({'role': 'model', 'parts': ["Noted, I'll use that context."]})
+        for user, assistant in self.exchanges:
+            contents.append({'role': 'user', 'parts': [user]})
+            contents.append({'role': 'model', 'parts': [assistant]})
+        contents.append({'role': 'user', 'parts': [prompt]})
+        return contents
+
+    # --- Per-turn metrics ---
+
+    @staticmethod
+    def contents_tokens(contents):
+        return sum(estimate_tokens(part) for message in contents for part in message['parts'])
+
+    def record_turn(self, contents, system_tokens, latency_s):
+        """Stores prompt size (history + system) and latency of one model call."""
+        history_tokens = self.contents_tokens(contents)
+        self.turn_metrics.append({
+            'turn': len(self.turn_metrics) + 1,
+            'history_tokens': history_tokens,
+            'prompt_tokens': history_tokens + system_tokens,
+            'verbatim_exchanges': len(self.exchanges),
+            'folded_exchanges': len(self.summary_lines) + self.omitted,
+            'latency_s': round(latency_s, 3),
+            'recorded_at': time.time(),
+        })
+        del self.turn_metrics[:-MAX_TURN_METRICS]
+        return self.turn_metrics[-1]
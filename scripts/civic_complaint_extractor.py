@@ -1,12 +1,15 @@
 import pandas as pd
 import json
 import os
+from post_store import load_posts
 
 # --- Configuration ---
 INPUT_FILE = 'turiscope_mp_tourism_clean_data.csv' 
 OUTPUT_JSON = 'data/civic_impact_metrics.json'
 OUTPUT_CSV = 'data/extracted_civic_complaints.csv'
 
+SENTIMENT_THRESHOLD = 0.35
+
 # --- Civic/Waste Keywords ---
 # These keywords will be used to identify posts related to waste, dirt, smell, and poor maintenance.
 CIVIC_KEYWORDS = [
@@ -14,6 +17,48 @@ CIVIC_KEYWORDS = [
     'hygiene', 'litter', 'maintenance', 'filth', 'toilet', 'trash'
 ]
 
+def find_civic_complaints(df_filtered):
+    """Low-sentiment posts whose cleaned text contains at least one civic keyword."""
+    def contains_civic_keyword(text):
+        if pd.isna(text):
+            return False
+        # Check for presence of any keyword in the cleaned text
+        return any(keyword in str(text) for keyword in CIVIC_KEYWORDS)
+
+    df_filtered['is_civic_complaint'] = df_filtered['cleaned_text'].apply(contains_civic_keyword)
+    return df_filtered[df_filtered['is_civic_complaint']].copy()
+
+
+def summarize_complaints(civic_complaints_df):
+    """Complaint counts by city, by canonical place and by city-month (all additive across batches)."""
+    # Calculate Civic Complaint Density by City
+    city_complaint_density = civic_complaints_df.groupby('city').agg(
+        total_civic_complaints=('id', 'count')
+    ).reset_index()
+
+    # Per canonical place and per city-month, for the place-level and time-lagged correlations
+    place_complaint_density = civic_complaints_df.groupby('place_id').agg(
+        total_civic_complaints=('id', 'count')
+    ).reset_index()
+    city_month_complaints = civic_complaints_df.assign(month=civic_complaints_df['date'].astype(str).str[:7]).groupby(['city', 'month']).agg(
+        total_civic_complaints=('id', 'count')
+    ).reset_index()
+
+    return {
+        'total_extracted_complaints': int(len(civic_complaints_df)),
+        'city_complaint_density': city_complaint_density.to_dict('records'),
+        'place_complaint_density': place_complaint_density.to_dict('records'),
+        'city_month_complaints': city_month_complaints.to_dict('records'),
+    }
+
+
+def save_civic_metrics(final_output):
+    # Save the density metrics to JSON for the integrated dashboard
+    os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
+    with open(OUTPUT_JSON, 'w') as f:
+        json.dump(final_output, f, indent=4)
+
+
 def extract_and_analyze_civic_data():
     """
     Loads clean tourism data, filters for civic/waste complaints, 
@@ -23,52 +68,56 @@ def extract_and_analyze_civic_data():
         print(f"\nError: Clean data file not found at {INPUT_FILE}. Please run data_cleaner.py first.")
         return
 
-    df = pd.read_csv(INPUT_FILE)
-    print(f"Loaded {len(df)} cleaned tourism records.")
-
     # 1. Filter: Posts must have low/negative sentiment
-    # We use a threshold of 0.35 to capture Negative and strongly Neutral/Negative posts
-    df_filtered = df[df['sentiment_score'] < 0.35].copy()
-    print(f"Filtered to {len(df_filtered)} posts with low sentiment.")
+    # We use a threshold of 0.35 to capture Negative and strongly Neutral/Negative posts.
+    # The filter is pushed down to the post store, so files and row groups without such posts are never read.
+    df_filtered = load_posts(filters=[('sentiment_score', '<', SENTIMENT_THRESHOLD)]).drop(columns='month', errors='ignore')
+    print(f"Loaded {len(df_filtered)} cleaned posts with low sentiment.")
 
     # 2. Filter: Posts must contain at least one civic keyword in the cleaned text
-    def contains_civic_keyword(text):
-        if pd.isna(text):
-            return False
-        # Check for presence of any keyword in the cleaned text
-        return any(keyword in str(text) for keyword in CIVIC_KEYWORDS)
-
-    df_filtered['is_civic_complaint'] = df_filtered['cleaned_text'].apply(contains_civic_keyword)
-    
-    # Final dataset of extracted civic complaints
-    civic_complaints_df = df_filtered[df_filtered['is_civic_complaint']].copy()
+    civic_complaints_df = find_civic_complaints(df_filtered)
     print(f"Final extracted civic complaints: {len(civic_complaints_df)}.")
     
     if civic_complaints_df.empty:
         print("No civic complaints found with the current filters.")
         return
 
-    # --- Analysis for Correlation ---
-    
-    # Calculate Civic Complaint Density by City
-    city_complaint_density = civic_complaints_df.groupby('city').agg(
-        total_civic_complaints=('id', 'count')
-    ).reset_index()
-
     # Save the filtered complaints (optional but good for tracking)
     civic_complaints_df.to_csv(OUTPUT_CSV, index=False)
-    
-    # Save the density metrics to JSON for the integrated dashboard
-    final_output = {
-        'total_extracted_complaints': int(len(civic_complaints_df)),
-        'city_complaint_density': city_complaint_density.to_dict('records')
-    }
-    
-    os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(final_output, f, indent=4)
+    save_civic_metrics(summarize_complaints(civic_complaints_df))
         
     print(f"[SUCCESS] Civic complaint analysis complete. Density metrics saved to {OUTPUT_JSON}.")
 
+
+def update_civic_data(new_df):
+    """
+    Micro-batch version of extract_and_analyze_civic_data: extracts complaints from the new posts only,
+    appends them to OUTPUT_CSV and adds their counts to the saved density metrics.
+    """
+    civic_complaints_df = find_civic_complaints(new_df[new_df['sentiment_score'] < SENTIMENT_THRESHOLD].copy())
+    print(f"New civic complaints in this batch: {len(civic_complaints_df)}.")
+    if civic_complaints_df.empty:
+        return
+
+    if os.path.exists(OUTPUT_CSV):
+        header = pd.read_csv(OUTPUT_CSV, nrows=0).columns
+        civic_complaints_df.reindex(columns=header).to_csv(OUTPUT_CSV, mode='a', header=False, index=False)
+    else:
+        civic_complaints_df.to_csv(OUTPUT_CSV, index=False)
+
+    added = summarize_complaints(civic_complaints_df)
+    if not os.path.exists(OUTPUT_JSON):
+        save_civic_metrics(added)
+        return
+    with open(OUTPUT_JSON, 'r') as f:
+        final_output = json.load(f)
+    final_output['total_extracted_complaints'] += added['total_extracted_complaints']
+    for key, group_cols in (('city_complaint_density', ['city']), ('place_complaint_density', ['place_id']),
+                            ('city_month_complaints', ['city', 'month'])):
+        counts = pd.DataFrame(final_output.get(key, []) + added[key])
+        final_output[key] = counts.groupby(group_cols)['total_civic_complaints'].sum().reset_index().to_dict('records')
+    save_civic_metrics(final_output)
+    print(f"[SUCCESS] Merged the batch's complaints into {OUTPUT_JSON}.")
+
 if __name__ == "__main__":
-    extract_and_analyze_civic_data()
\ No newline at end of file
+    extract_and_analyze_civic_data()
@@ -0,0 +1,122 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import sqlite3
+
+# --- Configuration ---
+CACHE_FILE = 'data/cache/cleaned_text.sqlite'
+CLEANING_RULES_VERSION = 1       # bump when data_cleaner's cleaning steps change in code
+LOOKUP_CHUNK_SIZE = 50_000
+
+
+def cleaning_config_version(*components):
+    """
+    Version key for the cleaning configuration: a hash of CLEANING_RULES_VERSION and every rule set
+    passed in (stopwords, lexicons, split phrases...). Any change yields a new key, which makes
+    every cached row a miss.
+    """
+    digest = hashlib.sha256(str(CLEANING_RULES_VERSION).encode())
+    for component in components:
+        if isinstance(component, (set, frozenset)):
+            component = sorted(component)
+        digest.update(json.dumps(component, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def text_keys(texts):
+    """Fast vectorized 64-bit content hash of each raw text (independent of the index)."""
+    return pd.util.hash_pandas_object(texts.astype(str), index=False).astype('int64')
+
+
+class CleanTextCache:
+    """
+    Persistent content-addressed cache of cleaned text, keyed by (config version, hash of raw text).
+
+    Lookups are done in bulk through a temporary key table and only misses are cleaned. The current
+    config version is recorded in a meta table; rows cached under other versions are pruned once,
+    when that version changes (or by calling prune()), never on an ordinary lookup.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60)  # parallel cleaners share the file
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cleaned_text ("
+            "version TEXT NOT NULL, key INTEGER NOT NULL, cleaned TEXT NOT NULL, "
+            "PRIMARY KEY (version, key)) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+        self._checked_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def prune(self, version):
+        """Drops every row cached under a version other than `version` and records it as current."""
+        with self.conn:
+            deleted = self.conn.execute("DELETE FROM cleaned_text WHERE version != ?", (version,)).rowcount
+            self.conn.execute("INSERT OR REPLACE INTO cache_meta VALUES ('version', ?)", (version,))
+        return deleted
+
+    def _ensure_version(self, version):
+        """Prunes stale rows when `version` differs from the recorded one; checked once per instance and version."""
+        if self._checked_version == version:
+            return
+        recorded = self.conn.execute("SELECT value FROM cache_meta WHERE name = 'version'").fetchone()
+        if recorded is None or recorded[0] != version:
+            self.prune(version)
+        self._checked_version = version
+
+    def _lookup(self, keys, version):
+        found = {}
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_keys (key INTEGER PRIMARY KEY)")
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            self.conn.execute("DELETE FROM lookup_keys")
+            self.conn.executemany("INSERT INTO lookup_keys VALUES (?)", ((int(k),) for k in chunk))
+            found.update(self.conn.execute(
+                "SELECT c.key, c.cleaned FROM cleaned_text c JOIN lookup_keys k ON c.key = k.key "
+                "WHERE c.version = ?", (version,)
+            ))
+        return found
+
+    def clean(self, texts, clean_fn, version):
+        """
+        Returns `texts` cleaned by `clean_fn`, reusing cached results. Each distinct miss is cleaned
+        once and written back. Hit/miss counts are per row.
+        """
+        texts = texts.astype(str)
+        keys = text_keys(texts)
+        distinct = pd.Series(texts.to_numpy(), index=keys.to_numpy())
+        distinct = distinct[~distinct.index.duplicated()]
+
+        self._ensure_version(version)
+        cleaned = self._lookup(distinct.index.tolist(), version)
+
+        missing = distinct[~distinct.index.isin(list(cleaned))]
+        fresh = {int(key): clean_fn(text) for key, text in missing.items()}
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO cleaned_text VALUES (?, ?, ?)",
+            ((version, key, value) for key, value in fresh.items())
+        )
+        self.conn.commit()
+        cleaned.update(fresh)
+
+        hit_rows = keys.isin(list(set(cleaned) - set(fresh)))
+        self.hits += int(hit_rows.sum())
+        self.misses += int((~hit_rows).sum())
+        return pd.Series(keys.map(cleaned).to_numpy(), index=texts.index, name=texts.name)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'cached_rows': self.conn.execute("SELECT COUNT(*) FROM cleaned_text").fetchone()[0],
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+import pickle
+from datetime import datetime
+from sklearn.decomposition import MiniBatchNMF
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# --- Configuration ---
+INPUT_FILE = 'turiscope_mp_tourism_clean_data.csv'
+OUTPUT_JSON = 'data/complaint_topics.json'
+STATE_FILE = 'data/complaint_topics_state.pkl'
+
+LOW_SENTIMENT_THRESHOLD = 0.35   # same cut as civic_complaint_extractor.py
+N_TOPICS = 6
+N_FEATURES = 2 ** 16             # hashed vocabulary size; no fitted vocabulary to outgrow
+BATCH_SIZE = 2048                # posts per partial_fit step
+TOP_TERMS = 8
+MIN_TOPIC_WEIGHT = 1e-3          # posts whose strongest topic weight is below this stay unassigned
+
+
+class IncrementalTopicModel:
+    """
+    Online TF-IDF + mini-batch NMF over complaint text.
+
+    Terms are hashed (HashingVectorizer), so new words need no refit. Document frequencies are
+    running counts, so IDF keeps improving as batches arrive, and MiniBatchNMF.partial_fit moves
+    the existing topics instead of relearning them. The whole state pickles to STATE_FILE.
+    """
+
+    def __init__(self, n_topics=N_TOPICS, n_features=N_FEATURES):
+        self.hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self.nmf = MiniBatchNMF(n_components=n_topics, init='nndsvda', random_state=42)
+        self.doc_freq = np.zeros(n_features)
+        self.n_docs = 0
+        self.term_counts = {}        # term -> occurrences, to label hashed columns with words
+        self.seen_ids = set()
+        self.stop_words = set()      # place/city name words, which would otherwise become "topics"
+        self.fitted = False
+
+    def _strip(self, texts):
+        return [' '.join(w for w in str(t).split() if w not in self.stop_words) for t in texts]
+
+    def _tfidf(self, counts):
+        idf = np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+        return normalize(counts.multiply(idf).tocsr())
+
+    def partial_fit(self, texts):
+        """Updates IDF statistics and the topics with one batch of (new) documents."""
+        texts = self._strip(texts)
+        counts = self.hasher.transform(texts)
+        self.doc_freq += np.bincount(counts.indices, minlength=len(self.doc_freq))
+        self.n_docs += counts.shape[0]
+        for text in texts:
+            for word in text.split():
+                self.term_counts[word] = self.term_counts.get(word, 0) + 1
+
+        tfidf = self._tfidf(counts)
+        if not self.fitted and tfidf.shape[0] < self.nmf.n_components:
+            return self
+        self.nmf.partial_fit(tfidf)
+        self.fitted = True
+        return self
+
+    def transform(self, texts):
+        """Document x topic weights for any texts under the current topics."""
+        return self.nmf.transform(self._tfidf(self.hasher.transform(self._strip(texts))))
+
+    def topic_terms(self, top_n=TOP_TERMS):
+        """Top words per topic, mapping hashed columns back to the most frequent word seen for each."""
+        words = sorted(self.term_counts, key=self.term_counts.get, reverse=True)
+        columns = self.hasher.transform(words).indices
+        column_word = {}
+        for word, column in zip(words, columns):
+            column_word.setdefault(column, word)
+
+        topics = []
+        for weights in self.nmf.components_:
+            ranked = [c for c in np.argsort(-weights) if c in column_word and weights[c] > 0][:top_n]
+            topics.append([column_word[c] for c in ranked])
+        return topics
+
+    def save(self, path=STATE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path=STATE_FILE):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def low_sentiment_posts(df):
+    """Candidate complaint posts: low sentiment score and some cleaned text."""
+    posts = df[(df['sentiment_score'] < LOW_SENTIMENT_THRESHOLD) & df['cleaned_text'].notna()]
+    return posts.reset_index(drop=True)
+
+
+def name_words(df):
+    """Lowercased words of every place and city name in the posts."""
+    name_cols = [c for c in ('place_name', 'canonical_place_name', 'city') if c in df.columns]
+    names = pd.concat([df[c] for c in name_cols]).dropna().astype(str).str.lower().str.findall(r'[a-z0-9]+').explode()
+    return set(names.dropna())
+
+
+def update_topic_model(model, posts):
+    """Feeds only posts the model has not seen yet through partial_fit, in BATCH_SIZE chunks."""
+    new_posts = posts[~posts['id'].astype(str).isin(model.seen_ids)]
+    model.stop_words |= name_words(new_posts)
+    for start in range(0, len(new_posts), BATCH_SIZE):
+        batch = new_posts.iloc[start:start + BATCH_SIZE]
+        model.partial_fit(batch['cleaned_text'])
+        model.seen_ids.update(batch['id'].astype(str))
+    return len(new_posts)
+
+
+def compute_topic_densities(model, posts):
+    """
+    Assigns each low-sentiment post its dominant topic and counts posts per city and topic.
+    Returns (topics list, city x topic count frame with a 'city' column and one column per topic).
+    """
+    weights = model.transform(posts['cleaned_text'])
+    dominant = np.where(weights.max(axis=1) >= MIN_TOPIC_WEIGHT, weights.argmax(axis=1), -1)
+    labels = [f"topic_{k}" for k in range(weights.shape[1])]
+
+    assigned = posts.assign(topic=dominant)
+    assigned = assigned[(assigned['topic'] >= 0) & (assigned['city'] != 'MISSING_CITY')]
+    density = pd.crosstab(assigned['city'], assigned['topic']).reindex(columns=range(len(labels)), fill_value=0)
+    density.columns = labels
+
+    topics = [
+        {
+            'topic_id': topic_id,
+            'label': ' / '.join(terms[:3]) or topic_id,
+            'top_terms': terms,
+            'posts': int((dominant == k).sum()),
+        }
+        for k, (topic_id, terms) in enumerate(zip(labels, model.topic_terms()))
+    ]
+    return topics, density.reset_index()
+
+# --- Main Execution Block ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental complaint-topic discovery over low-sentiment posts.")
+    parser.add_argument('--rebuild', action='store_true', help="Discard the saved topic state and start over.")
+    parser.add_argument('--input', default=INPUT_FILE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: Clean data file not found at {args.input}. Please run data_cleaner.py first.")
+        return
+
+    posts = low_sentiment_posts(pd.read_csv(args.input))
+    print(f"Found {len(posts)} low-sentiment posts (score < {LOW_SENTIMENT_THRESHOLD}).")
+
+    if os.path.exists(STATE_FILE) and not args.rebuild:
+        model = IncrementalTopicModel.load()
+        print(f"Resumed topic model trained on {model.n_docs} posts.")
+    else:
+        model = IncrementalTopicModel()
+
+    added = update_topic_model(model, posts)
+    print(f"Updated topics with {added} new posts.")
+    if not model.fitted:
+        print("Not enough posts to fit topics yet.")
+        return
+    model.save()
+
+    topics, density = compute_topic_densities(model, posts)
+    output = {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'trained_posts': model.n_docs,
+        'topics': topics,
+        'city_topic_density': density.to_dict('records'),
+    }
+    os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
+    with open(OUTPUT_JSON, 'w') as f:
+        json.dump(output, f, indent=4)
+
+    for topic in topics:
+        print(f"  {topic['topic_id']} ({topic['posts']} posts): {', '.join(topic['top_terms'])}")
+    print(f"[SUCCESS] Complaint topics and per-city densities saved to {OUTPUT_JSON} (state: {STATE_FILE}).")
+
+
+if __name__ == "__main__":
+    main()
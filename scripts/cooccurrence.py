@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+from datetime import datetime
+from scipy import sparse
+
+# --- Configuration ---
+INPUT_FILE = 'turiscope_mp_tourism_clean_data.csv'
+OUTPUT_FILE = 'data/tag_term_analytics.json'
+
+TOP_TAGS = 30           # tags listed with their sentiment
+TOP_PAIRS = 30          # strongest tag co-occurrences kept
+TOP_TERMS = 10          # distinctive terms kept per place
+TOP_CITY_TAGS = 10      # tags kept per city for negative posts
+MIN_TAG_POSTS = 3       # rarer tags are left out of the sentiment/pair tables
+
+
+def build_incidence_matrix(token_lists, binary=True):
+    """
+    Builds a CSR (rows x vocabulary) matrix from a Series of token lists.
+    Returns (matrix, vocabulary) where vocabulary[j] is the token of column j.
+    """
+    exploded = token_lists.explode()
+    exploded = exploded[exploded.notna() & (exploded != '')]
+    rows = pd.Index(token_lists.index).get_indexer(exploded.index)
+    cols, vocabulary = pd.factorize(exploded.to_numpy())
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(len(token_lists), len(vocabulary))
+    )
+    matrix.sum_duplicates()
+    if binary:
+        matrix.data[:] = 1.0
+    return matrix, np.asarray(vocabulary, dtype=object)
+
+
+def build_indicator_matrix(values):
+    """One-hot CSR (rows x categories) for a categorical column; returns (matrix, categories)."""
+    codes, categories = pd.factorize(values)
+    valid = codes >= 0
+    matrix = sparse.csr_matrix(
+        (np.ones(valid.sum()), (np.flatnonzero(valid), codes[valid])),
+        shape=(len(values), len(categories))
+    )
+    return matrix, np.asarray(categories, dtype=object)
+
+
+def post_tag_lists(df):
+    """Normalised tags per post (text_normalizer's '|'-joined column, or the raw tags as a fallback)."""
+    if 'tags_normalized' in df.columns:
+        return df['tags_normalized'].fillna('').str.split('|')
+    raw = df['tags'].where(df['tags'] != 'MISSING_TAGS').fillna('')
+    return raw.str.lower().str.replace('#', ' ').str.replace(',', ' ').str.split()
+
+
+class TagTermMatrices:
+    """
+    Sparse post x tag (binary) and post x term (counts) matrices, plus post x place and post x city
+    indicators, built once. Every analytic below is a sparse product over these.
+    """
+
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        self.n_posts = len(df)
+        self.sentiment = df['sentiment_score'].to_numpy(dtype=np.float64)
+        self.negative = (df['sentiment'].astype(str).str.lower() == 'negative').to_numpy(dtype=np.float64)
+
+        self.tags, self.tag_vocab = build_incidence_matrix(post_tag_lists(df))
+        self.terms, self.term_vocab = build_incidence_matrix(
+            df['cleaned_text'].fillna('').astype(str).str.split(), binary=False
+        )
+        place_key = 'place_id' if 'place_id' in df.columns else 'place_name'
+        places = df[place_key].where(df['place_name'] != 'MISSING_PLACE')
+        self.places, self.place_vocab = build_indicator_matrix(places)
+        self.cities, self.city_vocab = build_indicator_matrix(df['city'].where(df['city'] != 'MISSING_CITY'))
+
+        name_col = 'canonical_place_name' if 'canonical_place_name' in df.columns else 'place_name'
+        first_rows = df.drop_duplicates(place_key).set_index(place_key)
+        self.place_names = first_rows[name_col].reindex(self.place_vocab).to_numpy()
+        self.place_cities = first_rows['city'].reindex(self.place_vocab).to_numpy()
+
+    def tag_counts_for(self, post_mask):
+        """Tag frequencies over any subset of posts (a boolean/0-1 vector): one sparse mat-vec."""
+        return self.tags.T @ np.asarray(post_mask, dtype=np.float64)
+
+    def tag_sentiment(self):
+        """Per-tag post count, mean sentiment score and share of negative posts."""
+        posts = self.tag_counts_for(np.ones(self.n_posts))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_sentiment = (self.tags.T @ self.sentiment) / posts
+            negative_share = self.tag_counts_for(self.negative) / posts
+        return pd.DataFrame({
+            'tag': self.tag_vocab, 'posts': posts.astype(int),
+            'avg_sentiment': mean_sentiment, 'negative_share': negative_share,
+        })
+
+    def tag_cooccurrence(self):
+        """Tag x tag co-occurrence counts (T'T); the diagonal holds each tag's post count."""
+        return (self.tags.T @ self.tags).tocsr()
+
+    def top_tag_pairs(self, limit=TOP_PAIRS, min_posts=MIN_TAG_POSTS):
+        """Strongest tag pairs by co-occurring posts, with lift = P(a,b) / (P(a) P(b))."""
+        cooc = self.tag_cooccurrence()
+        diagonal = cooc.diagonal()
+        pairs = sparse.triu(cooc, k=1).tocoo()
+        keep = pairs.data >= min_posts
+        a, b, together = pairs.row[keep], pairs.col[keep], pairs.data[keep]
+        lift = together * self.n_posts / (diagonal[a] * diagonal[b])
+        order = np.lexsort((-lift, -together))[:limit]
+        return pd.DataFrame({
+            'tag_a': self.tag_vocab[a[order]], 'tag_b': self.tag_vocab[b[order]],
+            'posts': together[order].astype(int), 'lift': lift[order],
+        })
+
+    def place_top_terms(self, limit=TOP_TERMS):
+        """
+        Distinctive terms per place from the place x term matrix (P'X), scored TF-IDF style:
+        term count in the place x log(places / places using the term). Words of the place's own
+        name and city are skipped, since every post about the place contains them.
+        """
+        place_terms = (self.places.T @ self.terms).tocsr()
+        place_df = np.bincount(place_terms.indices, minlength=len(self.term_vocab))
+        idf = np.log(len(self.place_vocab) / np.maximum(place_df, 1))
+        scores = place_terms.multiply(idf[np.newaxis, :]).tocsr()
+
+        results = {}
+        for i, place in enumerate(self.place_vocab):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            if start == end:
+                continue
+            own_words = set(f"{self.place_names[i]} {self.place_cities[i]}".lower().split())
+            cols, values = scores.indices[start:end], scores.data[start:end]
+            ranked = np.argsort(-values, kind='stable')
+            best = np.array([k for k in ranked if self.term_vocab[cols[k]] not in own_words][:limit], dtype=int)
+            counts = place_terms[i, cols[best]].toarray().ravel()
+            results[place] = {
+                'place_name': self.place_names[i],
+                'city': self.place_cities[i],
+                'terms': [
+                    {'term': self.term_vocab[c], 'count': int(n), 'score': round(float(s), 4)}
+                    for c, n, s in zip(cols[best], counts, values[best]) if s > 0
+                ],
+            }
+        return results
+
+    def negative_tags_by_city(self, limit=TOP_CITY_TAGS):
+        """Tags travelling with each city's negative posts: T' (C .* negative), one sparse product."""
+        tag_city = (self.tags.T @ self.cities.multiply(self.negative[:, np.newaxis]).tocsc()).tocsc()
+        results = {}
+        for j, city in enumerate(self.city_vocab):
+            column = tag_city[:, j].toarray().ravel()
+            own_name = str(city).lower()
+            ranked = [i for i in np.argsort(-column, kind='stable') if column[i] > 0 and self.tag_vocab[i] != own_name]
+            results[city] = [{'tag': self.tag_vocab[i], 'posts': int(column[i])} for i in ranked[:limit]]
+        return results
+
+
+def build_tag_term_analytics(df):
+    """Builds the matrices once and returns the JSON-ready analytics payload."""
+    matrices = TagTermMatrices(df)
+    tag_table = matrices.tag_sentiment()
+    tag_table = tag_table[tag_table['posts'] >= MIN_TAG_POSTS].sort_values('posts', ascending=False).head(TOP_TAGS)
+
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total_posts': matrices.n_posts,
+        'matrix_shapes': {
+            'post_tag': list(matrices.tags.shape), 'post_term': list(matrices.terms.shape),
+        },
+        'tag_sentiment': tag_table.round(4).to_dict('records'),
+        'tag_pairs': matrices.top_tag_pairs().round(4).to_dict('records'),
+        'place_top_terms': matrices.place_top_terms(),
+        'negative_tags_by_city': matrices.negative_tags_by_city(),
+    }
+
+# --- Main Execution Block ---
+
+def main():
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: Clean data file not found at {INPUT_FILE}. Please run data_cleaner.py first.")
+        return
+
+    df = pd.read_csv(INPUT_FILE)
+    print(f"Building sparse tag/term matrices for {len(df)} posts...")
+    analytics = build_tag_term_analytics(df)
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with open(OUTPUT_FILE, 'w') as f:
+        json.dump(analytics, f, indent=4)
+
+    shapes = analytics['matrix_shapes']
+    print(f"post x tag {shapes['post_tag']}, post x term {shapes['post_term']}")
+    print(f"[SUCCESS] Tag and term analytics saved to {OUTPUT_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
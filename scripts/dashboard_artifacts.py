@@ -0,0 +1,460 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import hashlib
+import json
+import os
+
+# --- Configuration ---
+ANALYSIS_FILE = 'data/analysis_results.json'
+MAP_FILE = 'data/map_data.json'
+MAP_COLUMNS = ['city', 'latitude', 'longitude', 'avg_score', 'total_posts']
+CIVIC_FILE = 'data/civic_impact_metrics.json'
+TOPICS_FILE = 'data/complaint_topics.json'
+OUTPUT_FILE = 'data/dashboard_artifacts.json'
+
+SENTIMENT_COLORS = {'Positive': 'green', 'Neutral': 'gray', 'Negative': 'red'}
+PLATFORM_COLORS = {'Twitter': '#1DA1F2', 'Instagram': '#C13584', 'Reddit': '#FF4500'}
+
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 42                # fixed so a rebuilt artifact reports the same interval
+MAX_MATRIX_ELEMENTS = 4_000_000    # resample-matrix cells per block; bounds memory for large n
+MIN_PAIRS = 4                      # fewer pairs than this get no correlation evidence
+CORRELATION_LAGS = [0, 1, 2, 3]    # months between complaints and the sentiment they are compared with
+
+# --- Correlation Evidence (vectorized bootstrap) ---
+
+def _rowwise_pearson(x, y):
+    """Pearson coefficient of each row pair of two (resamples x n) matrices (NaN for constant rows)."""
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    denominator = np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, (x * y).sum(axis=1) / denominator, np.nan)
+
+
+def _average_ranks(values):
+    """Ranks of a 1-D array with ties averaged."""
+    codes, counts = np.unique(values, return_inverse=True, return_counts=True)[1:]
+    upper = np.cumsum(counts)
+    return (upper - (counts - 1) / 2)[codes]
+
+
+def _resampled_ranks(codes, n_codes, index):
+    """
+    Tie-averaged ranks within each row of a resample, without sorting: a resample only repeats the
+    original values, so the rank of a value is the count of drawn values below it plus its own
+    tie midpoint, read off a per-row cumulative histogram over the distinct values (`codes`).
+    """
+    rows, n = index.shape
+    drawn = codes[index]
+    histogram = np.bincount((drawn + n_codes * np.arange(rows)[:, None]).ravel(), minlength=rows * n_codes)
+    histogram = histogram.reshape(rows, n_codes)
+    rank_of_code = np.cumsum(histogram, axis=1) - (histogram - 1) / 2
+    return np.take_along_axis(rank_of_code, drawn, axis=1)
+
+
+def _interval(samples, confidence):
+    samples = samples[~np.isnan(samples)]
+    if samples.size == 0:
+        return None
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail])
+    return [round(float(low), 4), round(float(high), 4)]
+
+
+def bootstrap_correlations(x, y, n_resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE, seed=BOOTSTRAP_SEED):
+    """
+    Pearson and Spearman coefficients of paired samples with percentile bootstrap intervals.
+
+    Resampling is done with one (resamples x n) index matrix per block (a single block unless n is
+    very large) and every coefficient is computed row-wise, so thousands of resamples cost a few
+    array operations. Returns None with fewer than MIN_PAIRS pairs or a constant input.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    n = x.size
+    if n < MIN_PAIRS or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return None
+
+    pearson = float(_rowwise_pearson(x[None, :], y[None, :])[0])
+    spearman = float(_rowwise_pearson(_average_ranks(x)[None, :], _average_ranks(y)[None, :])[0])
+    x_codes, y_codes = np.unique(x, return_inverse=True)[1], np.unique(y, return_inverse=True)[1]
+    n_x, n_y = int(x_codes.max()) + 1, int(y_codes.max()) + 1
+
+    rng = np.random.default_rng(seed)
+    block = max(1, MAX_MATRIX_ELEMENTS // n)
+    pearson_samples, spearman_samples = [], []
+    for start in range(0, n_resamples, block):
+        index = rng.integers(0, n, size=(min(block, n_resamples - start), n))
+        xs, ys = x[index], y[index]
+        pearson_samples.append(_rowwise_pearson(xs, ys))
+        spearman_samples.append(_rowwise_pearson(_resampled_ranks(x_codes, n_x, index), _resampled_ranks(y_codes, n_y, index)))
+    pearson_samples = np.concatenate(pearson_samples)
+    spearman_samples = np.concatenate(spearman_samples)
+
+    return {
+        'n': int(n),
+        'pearson': round(pearson, 4),
+        'pearson_ci': _interval(pearson_samples, confidence),
+        'spearman': round(spearman, 4),
+        'spearman_ci': _interval(spearman_samples, confidence),
+        # Share of resamples with a negative rank correlation (how consistently the sign holds)
+        'negative_share': round(float(np.nanmean(spearman_samples < 0)), 4),
+        'confidence': confidence,
+        'resamples': int(n_resamples),
+    }
+
+
+def shift_months(months, lag):
+    """Shifts 'YYYY-MM' labels forward by `lag` months (vectorized over a pandas Series)."""
+    periods = months.astype(str).str[:7]
+    year, month = periods.str[:4].astype(int), periods.str[5:7].astype(int)
+    total = year * 12 + (month - 1) + lag
+    return (total // 12).astype(str) + '-' + (total % 12 + 1).astype(str).str.zfill(2)
+
+
+# --- Aggregations ---
+
+def build_kpis(metrics, total_complaints=0):
+    """Pre-computes the headline KPI values shown on the dashboard cards."""
+    return {
+        'total_posts': int(metrics['total_posts']),
+        'positive_percent': metrics['sentiment_distribution'].get('Positive', 0),
+        'top_place': next(iter(metrics['top_10_places'].keys()), "N/A"),
+        'total_extracted_complaints': int(total_complaints),
+    }
+
+
+def build_city_correlation(map_df, civic_df):
+    """
+    Merges the post-weighted city sentiment with the civic complaint counts and
+    returns (correlation_df, pearson_coefficient). Empty frame and None when no city overlaps.
+    """
+    tourism_df = map_df[map_df['city'] != 'MISSING_CITY']
+    tourism_df = tourism_df.assign(weighted_score=tourism_df['avg_score'] * tourism_df['total_posts'])
+
+    tourism_city_metrics = tourism_df.groupby('city').agg(
+        total_weighted_score=('weighted_score', 'sum'),
+        tourism_posts=('total_posts', 'sum')
+    ).reset_index()
+    tourism_city_metrics['avg_sentiment'] = (
+        tourism_city_metrics['total_weighted_score'] / tourism_city_metrics['tourism_posts']
+    )
+
+    civic_df = civic_df.rename(columns={'total_civic_complaints': 'inferred_complaints'})
+    correlation_df = pd.merge(tourism_city_metrics, civic_df, on='city', how='inner')
+    if correlation_df.empty:
+        return correlation_df, None
+
+    # Sorted by sentiment (ascending) so problem areas come first in the table and chart
+    correlation_df = correlation_df.sort_values(by='avg_sentiment', ascending=True).reset_index(drop=True)
+    coefficient = correlation_df['avg_sentiment'].corr(correlation_df['inferred_complaints'])
+    return correlation_df, (None if pd.isna(coefficient) else float(coefficient))
+
+def build_topic_correlations(map_df, topics):
+    """
+    Correlates city sentiment with each discovered complaint topic's per-city post count
+    (complaint_topics.py), exactly as build_city_correlation does for the keyword count.
+    Returns {topic_id: (label, correlation_df, pearson)}.
+    """
+    density_df = pd.DataFrame(topics['city_topic_density'])
+    results = {}
+    for topic in topics['topics']:
+        topic_id = topic['topic_id']
+        # Topics no post currently falls into have nothing to correlate
+        if density_df.empty or topic_id not in density_df.columns or density_df[topic_id].nunique() < 2:
+            continue
+        civic_df = density_df[['city', topic_id]].rename(columns={topic_id: 'total_civic_complaints'})
+        correlation_df, coefficient = build_city_correlation(map_df, civic_df)
+        results[topic_id] = (topic['label'], correlation_df, coefficient)
+    return results
+
+def build_place_correlation(place_df, place_civic_df):
+    """
+    Place-level evidence: each canonical place's Sentiment Index against its civic complaint count.
+    Places without any extracted complaint count as zero rather than being dropped.
+    """
+    if place_df.empty or 'place_id' not in place_df.columns:
+        return None
+    merged = place_df.merge(place_civic_df, on='place_id', how='left')
+    return bootstrap_correlations(merged['Sentiment Index'], merged['total_civic_complaints'].fillna(0))
+
+
+def build_lagged_correlations(city_month_df, civic_month_df, lags=CORRELATION_LAGS):
+    """
+    Time-lagged evidence: complaints in a city-month against that city's average sentiment `lag`
+    months later, pooled over all city-months. Months without complaints count as zero.
+    """
+    results = []
+    for lag in lags:
+        shifted = civic_month_df.assign(month=shift_months(civic_month_df['month'], lag))
+        merged = city_month_df.merge(shifted, on=['city', 'month'], how='left')
+        evidence = bootstrap_correlations(merged['avg_sentiment'], merged['total_civic_complaints'].fillna(0))
+        if evidence is not None:
+            results.append({'lag_months': lag, **evidence})
+    return results
+
+# --- Figure Builders (shared by the pipeline and the app's live fallback) ---
+
+def build_geospatial_map(map_df):
+    """Scatter map of MP showing sentiment by city (None when there is no geographical data)."""
+    df = map_df[map_df['city'] != 'MISSING_CITY']
+    if df.empty:
+        return None
+    df = df.assign(
+        marker_size=10 + df['total_posts'] / 100,
+        hover_text=(
+            "City: " + df['city'].astype(str)
+            + "<br>Posts: " + df['total_posts'].astype(str)
+            + "<br>Avg. Sentiment: " + df['avg_score'].map('{:.3f}'.format)
+        ),
+    )
+
+    fig = px.scatter_mapbox(
+        df,
+        lat="latitude",
+        lon="longitude",
+        hover_name="hover_text",
+        size="marker_size",
+        color="avg_score",
+        color_continuous_scale=px.colors.sequential.Inferno,
+        zoom=5.5,
+        center={"lat": 23.00, "lon": 78.00},
+        title="Geospatial Sentiment Analysis of MP Tourism (Map View)",
+        height=600
+    )
+    fig.update_layout(mapbox_style="open-street-map")
+    fig.update_layout(margin={"r": 0, "t": 40, "l": 0, "b": 0})
+    return fig
+
+
+def build_sentiment_donut(metrics):
+    """Donut chart for overall sentiment distribution."""
+    sentiment_df = pd.DataFrame(
+        list(metrics['sentiment_distribution'].items()),
+        columns=['Sentiment', 'Percentage']
+    )
+    sentiment_df['Sort_Order'] = sentiment_df['Sentiment'].map({'Positive': 1, 'Neutral': 2, 'Negative': 3})
+    sentiment_df = sentiment_df.sort_values(by='Sort_Order')
+
+    fig = px.pie(
+        sentiment_df, names='Sentiment', values='Percentage',
+        title='Overall Sentiment Distribution Across Madhya Pradesh Tourism',
+        hole=0.4, color='Sentiment', color_discrete_map=SENTIMENT_COLORS,
+    )
+    fig.update_traces(textinfo='percent+label')
+    return fig
+
+
+def build_platform_donut(metrics):
+    """Donut chart for the source platform share."""
+    platform_df = pd.DataFrame(
+        list(metrics['platform_distribution'].items()),
+        columns=['Platform', 'Percentage']
+    )
+    fig = px.pie(
+        platform_df, names='Platform', values='Percentage', title='Source Platform Distribution',
+        hole=0.4, color='Platform', color_discrete_map=PLATFORM_COLORS
+    )
+    fig.update_traces(textinfo='percent')
+    return fig
+
+
+def build_top_places_bar(place_df):
+    """Bar chart for top places by weighted sentiment score."""
+    sentiment_df = place_df.sort_values(by='Sentiment Index', ascending=False)
+
+    fig = px.bar(
+        sentiment_df.head(15),
+        x='place_name', y='Sentiment Index', color='Total Posts',
+        color_continuous_scale=px.colors.sequential.Sunset,
+        hover_data=['Total Posts'],
+        labels={'place_name': 'Attraction/Place Name', 'Sentiment Index': 'Weighted Sentiment Index (0 to 1)'},
+        title='Top 15 Places Ranked by Weighted Sentiment Index',
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+def build_discussion_bar(metrics):
+    """Horizontal bar chart for the most discussed places."""
+    discussion_df = pd.DataFrame(
+        list(metrics['top_10_places'].items()),
+        columns=['Place Name', 'Total Posts']
+    ).sort_values(by='Total Posts', ascending=True)
+
+    return px.bar(
+        discussion_df, x='Total Posts', y='Place Name', orientation='h',
+        title='Top 10 Most Discussed Places (By Post Volume)',
+        color='Total Posts', color_continuous_scale=px.colors.sequential.Blues,
+    )
+
+
+def build_dual_axis_chart(correlation_df, measure_label='Inferred Civic Complaints'):
+    """Dual-axis chart: complaint counts (bars, left) against average sentiment (line, right) per city."""
+    fig_dual = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig_dual.add_trace(
+        go.Bar(
+            x=correlation_df['city'],
+            y=correlation_df['inferred_complaints'],
+            name=f'{measure_label} (Count)',
+            marker_color='#FF4500'
+        ),
+        secondary_y=False,
+    )
+    fig_dual.add_trace(
+        go.Scatter(
+            x=correlation_df['city'],
+            y=correlation_df['avg_sentiment'],
+            name='Average Tourist Sentiment (0 to 1)',
+            mode='lines+markers',
+            marker=dict(size=10, color='#1a629b'),
+            line=dict(width=3, color='#1a629b')
+        ),
+        secondary_y=True,
+    )
+
+    fig_dual.update_layout(
+        title_text="Correlation: Low Sentiment vs. High Complaint Density by City",
+        hovermode="x unified",
+        height=550
+    )
+    fig_dual.update_xaxes(title_text="City / Location", tickangle=-45)
+    fig_dual.update_yaxes(title_text=f"Total {measure_label}", secondary_y=False, range=[0, correlation_df['inferred_complaints'].max() * 1.1])
+    fig_dual.update_yaxes(title_text="Average Sentiment Score (Higher is Better)", secondary_y=True, range=[0, 1])
+    return fig_dual
+
+# --- Artifact Assembly ---
+
+def compute_artifact_version(*paths):
+    """Content hash of the input artifacts; the app memoizes parsed figures per version."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def assemble_dashboard_artifacts(metrics, place_df, map_df, civic_df=None, total_complaints=0, version=None, topics=None,
+                                 place_civic_df=None, city_month_df=None, civic_month_df=None):
+    """
+    Builds every ready-to-render dashboard artifact from already-loaded pipeline outputs.
+    Figures are stored as Plotly JSON strings so consumers only have to deserialize them.
+    The civic parts are None when no civic metrics are available; `topics` (complaint_topics.json)
+    adds one correlation and dual-axis chart per discovered complaint topic. Every correlation
+    carries bootstrap `evidence`; the place-level and time-lagged variants need the per-place and
+    per-city-month inputs.
+    """
+    figures = {
+        'geospatial_map': build_geospatial_map(map_df),
+        'sentiment_donut': build_sentiment_donut(metrics),
+        'platform_donut': build_platform_donut(metrics),
+        'top_places_bar': build_top_places_bar(place_df),
+        'discussion_bar': build_discussion_bar(metrics),
+    }
+
+    correlation = None
+    if civic_df is not None:
+        correlation_df, coefficient = build_city_correlation(map_df, civic_df)
+        correlation = {
+            'pearson': coefficient,
+            'evidence': bootstrap_correlations(correlation_df['avg_sentiment'], correlation_df['inferred_complaints']) if coefficient is not None else None,
+            'table': correlation_df.to_dict('records'),
+        }
+        if not correlation_df.empty:
+            figures['dual_axis_chart'] = build_dual_axis_chart(correlation_df)
+
+    topic_correlations = {}
+    if topics is not None:
+        for topic_id, (label, correlation_df, coefficient) in build_topic_correlations(map_df, topics).items():
+            topic_correlations[topic_id] = {
+                'label': label,
+                'pearson': coefficient,
+                'evidence': bootstrap_correlations(correlation_df['avg_sentiment'], correlation_df['inferred_complaints']) if coefficient is not None else None,
+                'table': correlation_df.to_dict('records'),
+            }
+            if not correlation_df.empty:
+                figures[f'dual_axis_chart_{topic_id}'] = build_dual_axis_chart(correlation_df, f'Topic Complaints: {label}')
+
+    correlation_variants = {
+        'place': build_place_correlation(place_df, place_civic_df) if place_civic_df is not None else None,
+        'lagged': build_lagged_correlations(city_month_df, civic_month_df) if city_month_df is not None and civic_month_df is not None else [],
+    }
+
+    return {
+        'version': version,
+        'kpis': build_kpis(metrics, total_complaints),
+        'correlation': correlation,
+        'topic_correlations': topic_correlations,
+        'correlation_variants': correlation_variants,
+        'figures': {name: fig.to_json() for name, fig in figures.items() if fig is not None},
+    }
+
+
+def build_dashboard_artifacts(analysis_file=ANALYSIS_FILE, map_file=MAP_FILE, civic_file=CIVIC_FILE, topics_file=TOPICS_FILE):
+    """Loads the pipeline outputs from disk and assembles the dashboard artifacts (None if tourism inputs are missing)."""
+    if not os.path.exists(analysis_file) or not os.path.exists(map_file):
+        return None
+
+    with open(analysis_file, 'r') as f:
+        analysis = json.load(f)
+
+    civic_df, total_complaints, place_civic_df, civic_month_df = None, 0, None, None
+    if os.path.exists(civic_file):
+        with open(civic_file, 'r') as f:
+            civic_metrics = json.load(f)
+        civic_df = pd.DataFrame(civic_metrics['city_complaint_density'])
+        total_complaints = civic_metrics.get('total_extracted_complaints', 0)
+        if 'place_complaint_density' in civic_metrics:
+            place_civic_df = pd.DataFrame(civic_metrics['place_complaint_density'], columns=['place_id', 'total_civic_complaints'])
+            civic_month_df = pd.DataFrame(civic_metrics['city_month_complaints'], columns=['city', 'month', 'total_civic_complaints'])
+    city_month_df = pd.DataFrame(analysis['city_month_sentiment']) if analysis.get('city_month_sentiment') else None
+
+    topics = None
+    if os.path.exists(topics_file):
+        with open(topics_file, 'r') as f:
+            topics = json.load(f)
+
+    map_df = pd.read_json(map_file)
+    if map_df.empty:
+        map_df = pd.DataFrame(columns=MAP_COLUMNS)
+
+    return assemble_dashboard_artifacts(
+        analysis['key_metrics'],
+        pd.DataFrame(analysis['place_sentiment_data']),
+        map_df,
+        civic_df=civic_df,
+        total_complaints=total_complaints,
+        version=compute_artifact_version(analysis_file, map_file, civic_file, topics_file),
+        topics=topics,
+        place_civic_df=place_civic_df,
+        city_month_df=city_month_df,
+        civic_month_df=civic_month_df,
+    )
+
+# --- Main Execution Block ---
+
+def main():
+    print("Building precomputed dashboard artifacts...")
+    artifacts = build_dashboard_artifacts()
+    if artifacts is None:
+        print(f"\nError: '{ANALYSIS_FILE}' or '{MAP_FILE}' not found.")
+        print("Please run analysis_engine.py and add_coordinates.py first.")
+        return
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with open(OUTPUT_FILE, 'w') as f:
+        json.dump(artifacts, f)
+
+    print(f"[SUCCESS] {len(artifacts['figures'])} figures and the city correlation table saved to {OUTPUT_FILE} (version {artifacts['version']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,22 @@ import nltk
 from nltk.corpus import stopwords
 import string
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from entity_resolution import assign_place_ids, assign_known_place_ids, save_place_ids
+from text_normalizer import TextNormalizer, SEED_WORDS, GAZETTEER, SPLIT_PHRASES, HINGLISH_LEXICON
+from clean_cache import CleanTextCache, cleaning_config_version
+from ingestion import ingest_file, print_summary, record_quality_summaries
+from raw_manifest import RawManifest, resolve_sources, source_key, RAW_DIR, CLEAN_STORE_DIR
+from post_store import write_post_store, append_post_store, load_posts, STORE_DIR
+from sentiment_scorer import add_lexicon_scores, VALENCE, NEGATORS, BOOSTERS
 
 # --- Configuration ---
 INPUT_FILE = 'turiscope_mp_tourism_sentiment_dataset_unclean.csv' 
 OUTPUT_FILE = 'turiscope_mp_tourism_clean_data.csv'
 TEXT_COLUMN = 'text'
 
-# --- Custom Word Lists ---
-# Add common Hindi/regional stop words found in the dataset
-CUSTOM_NOISE_WORDS = set(['ekdum', 'tha', 'thik', 'thak', 'maja', 'gaya', 'bhi', 'nahi', 'kya'])
-# Common hashtag concatenations to fix
-SPLIT_PHRASES = {
-    'mustvisit': 'must visit',
-    'highlyrecommend': 'highly recommend',
-    'traveltips': 'travel tips',
-    'exploremp': 'explore mp',
-}
+# Hinglish noise words, hashtag splits and the segmentation vocabulary live in text_normalizer.py
 
 
 # --- NLTK Setup ---
@@ -36,11 +36,23 @@ def setup_nltk():
     print("NLTK setup complete.")
 
 
+def text_rules_version():
+    """Version key of the text-cleaning rules (stopwords, Hinglish lexicon, split phrases, segmenter vocabulary); keys the cleaned-text cache."""
+    return cleaning_config_version(set(stopwords.words('english')), SEED_WORDS, GAZETTEER, SPLIT_PHRASES, HINGLISH_LEXICON)
+
+
+def cleaning_rules_version():
+    """Version key of everything a clean partition depends on: the text rules plus the sentiment lexicon behind lexicon_score."""
+    return cleaning_config_version(text_rules_version(), VALENCE, NEGATORS, BOOSTERS)
+
+
 # --- Data Cleaning and Type Conversion ---
-def clean_and_process_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_and_process_data(df: pd.DataFrame, resolve_places: bool = True) -> pd.DataFrame:
     """
     Performs comprehensive cleaning on the DataFrame, including text preprocessing,
     data type conversion, and post-cleaning of categorical and text data.
+    With resolve_places=False the canonical place ids are left to the caller (multi-file runs
+    resolve them once over all partitions).
     """
     print(f"\n--- Starting Data Cleaning and Processing ---")
     initial_rows = len(df)
@@ -53,37 +65,47 @@ def clean_and_process_data(df: pd.DataFrame) -> pd.DataFrame:
     print(f"Dropped {rows_dropped} rows (NaNs in text / Duplicates). Remaining rows: {len(df)}")
     
     # --- A. NUMERICAL CLEANING ---
-    for col in ['sentiment_score', 'likes', 'comments']:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace(r'[^\d\.]', '', regex=True)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            
+    # Columns arrive typed and range-checked from ingestion.py; only the imputation policy lives here
     df[['likes', 'comments']] = df[['likes', 'comments']].fillna(0).astype(int)
-    df['sentiment_score'] = df['sentiment_score'].fillna(df['sentiment_score'].median())
+
+    # Local lexicon score next to the source score (from the raw text: negators and intensifiers are
+    # stopwords), which also fills posts that arrived without a score or with an unparseable one
+    df = add_lexicon_scores(df, TEXT_COLUMN)
+    missing_scores = df['sentiment_score'].isna()
+    df['sentiment_score'] = df['sentiment_score'].fillna(df['lexicon_score'])
+    print(f"Lexicon-scored {len(df)} posts; filled {int(missing_scores.sum())} missing sentiment scores from the lexicon.")
 
     # --- B. TEXT PREPROCESSING (Initial Clean) ---
     df['cleaned_text'] = df[TEXT_COLUMN].astype(str).copy()
-    stop_words = set(stopwords.words('english')).union(CUSTOM_NOISE_WORDS)
+    stop_words = set(stopwords.words('english'))
+    # Fixed vocabulary (never this batch's words), so a cached result is what any batch would have produced
+    normalizer = TextNormalizer.from_gazetteer()
 
     def apply_initial_cleaning_steps(text):
+        # Hashtags are segmented first, while their camel case still marks word boundaries
+        text = normalizer.expand_hashtags(text)
         text = text.lower()
         text = re.sub(r'https?://\S+|www\.\S+', '', text)
         text = re.sub(r'<.*?>', '', text) 
         text = re.sub(r'@\w+', '', text)
-        text = re.sub(r'#', ' ', text)
         text = text.translate(str.maketrans(string.punctuation, ' ' * len(string.punctuation)))
         
-        # Simple string split tokenization
-        tokens = text.split() 
+        # Simple string split tokenization, then Hinglish normalisation (fillers dropped, slang translated)
+        tokens = normalizer.normalize_tokens(text.split())
         
-        # Filter English and Custom stopwords
+        # Filter English stopwords
         filtered_tokens = [word for word in tokens if word not in stop_words and len(word) > 1]
         text = ' '.join(filtered_tokens)
 
         text = re.sub(r'\s+', ' ', text).strip()
         return text
 
-    df['cleaned_text'] = df['cleaned_text'].apply(apply_initial_cleaning_steps)
+    # Only texts not cleaned under the current rules before are processed (content-addressed cache)
+    cache = CleanTextCache()
+    version = text_rules_version()
+    df['cleaned_text'] = cache.clean(df['cleaned_text'], apply_initial_cleaning_steps, version)
+    print(f"Cleaned-text cache (rules {version}): {cache.stats()}")
+    cache.close()
     
     
     # --- C. POST-PROCESSING (Fixing Remaining Issues) ---
@@ -94,36 +116,161 @@ def clean_and_process_data(df: pd.DataFrame) -> pd.DataFrame:
     df['tags'] = df['tags'].fillna('MISSING_TAGS')
     print(f"Imputed NaNs in city/place_name/tags with 'MISSING...'")
 
-    # 3. Fixing Concatenated Words
-    def fix_concatenation(text):
-        for original, replacement in SPLIT_PHRASES.items():
-            text = text.replace(original, replacement)
-        return text
-        
-    df['cleaned_text'] = df['cleaned_text'].apply(fix_concatenation)
+    # 3. Normalised Tags (hashtags segmented, '#A, #B' / 'A B' formats unified, '|'-joined)
+    df['tags_normalized'] = normalizer.normalize_tag_column(df['tags'].where(df['tags'] != 'MISSING_TAGS'))
+    print(f"Normalised tags with the hashtag segmenter: {normalizer.cache_stats()}")
+
+    # 4. Canonical Place IDs (merges spelling variants of the same place within a city)
+    if resolve_places:
+        df = assign_place_ids(df)
+        print(f"Resolved {df['place_name'].nunique()} place names into {df['place_id'].nunique()} canonical places.")
     
     print("Post-cleaning steps complete.")
     
     return df
 
+# --- Multi-File Ingestion ---
+
+def process_raw_file(path, partition_file):
+    """
+    Worker: validates and cleans one raw drop and writes it as a clean-store partition.
+    Returns (manifest stats, quality summary); the caller records both.
+    """
+    raw_df, quality_summary = ingest_file(path, record=False)
+    print_summary(quality_summary)
+    cleaned_df = clean_and_process_data(raw_df, resolve_places=False)
+
+    os.makedirs(os.path.dirname(partition_file), exist_ok=True)
+    cleaned_df.to_csv(partition_file, index=False)
+    dates = cleaned_df['date'].dropna()
+    return {
+        'rows_read': quality_summary['rows_read'],
+        'rows_accepted': quality_summary['rows_accepted'],
+        'rows_quarantined': quality_summary['rows_quarantined'],
+        'min_date': dates.min() if not dates.empty else None,
+        'max_date': dates.max() if not dates.empty else None,
+    }, quality_summary
+
+
+def process_pending_files(manifest, pending, rules_version, workers=1):
+    """
+    Processes new/changed raw files (in parallel worker processes when workers > 1). Every file that
+    succeeded is recorded in the manifest and its quality summary appended to the log in one write
+    by this process. Returns {path: error} for the files that failed; they stay pending.
+    """
+    jobs = {path: os.path.join(CLEAN_STORE_DIR, f"part-{source_key(path)}.csv") for path in pending}
+    results, failures = {}, {}
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {path: pool.submit(process_raw_file, path, partition) for path, partition in jobs.items()}
+            for path, future in futures.items():
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    failures[path] = str(e)
+    else:
+        for path, partition in jobs.items():
+            try:
+                results[path] = process_raw_file(path, partition)
+            except Exception as e:
+                failures[path] = str(e)
+
+    for path, (stats, _) in results.items():
+        manifest.record(path, rules_version, jobs[path], stats)
+    manifest.save()
+    if results:
+        record_quality_summaries(summary for _, summary in results.values())
+    for path, error in failures.items():
+        print(f"[ERROR] Failed to process {path}: {error}")
+    return failures
+
+
+def materialize_clean_store(manifest):
+    """
+    Concatenates every clean-store partition, drops posts repeated across drops and resolves
+    canonical place ids over the whole history (the flat OUTPUT_FILE the other scripts read).
+    """
+    partitions = manifest.partitions()
+    df = pd.concat((pd.read_csv(p) for p in partitions), ignore_index=True)
+    duplicates = df['id'].duplicated()
+    if duplicates.any():
+        print(f"Dropped {int(duplicates.sum())} posts repeated across raw files.")
+        df = df[~duplicates].reset_index(drop=True)
+    df = assign_place_ids(df)
+    print(f"Resolved {df['place_name'].nunique()} place names into {df['place_id'].nunique()} canonical places.")
+    return df
+
+
+def publish_clean_data(cleaned_df):
+    """
+    Writes the flat OUTPUT_FILE, the city/month-partitioned post store the loaders read with filter
+    pushdown, and the place-id table that micro-batches resolve new names against.
+    """
+    print(f"\nExporting cleaned data to {OUTPUT_FILE}...")
+    cleaned_df.to_csv(OUTPUT_FILE, index=False)
+    written, unchanged = write_post_store(cleaned_df)
+    save_place_ids(cleaned_df)
+    print(f"Post store {STORE_DIR}: {written} partition file(s) written, {unchanged} unchanged.")
+
+
+def materialize_new_posts(manifest, paths):
+    """
+    Clean posts of just the raw files in `paths` (micro-batches): posts already in the post store are
+    dropped, looking only at the city/month partitions the new posts fall in, and place ids are
+    assigned against the stored place-id table instead of re-resolving the whole history.
+    """
+    df = pd.concat((pd.read_csv(manifest.files[path]['partition']) for path in paths), ignore_index=True)
+    df = df[~df['id'].duplicated()]
+    repeated = pd.Series(False, index=df.index)
+    if not df.empty:
+        months = df['date'].astype(str).str[:7]
+        stored = load_posts(columns=['id'], cities=set(df['city']), months=(months.min(), months.max()))
+        repeated = df['id'].isin(stored['id'])
+    if repeated.any():
+        print(f"Dropped {int(repeated.sum())} posts already in the post store.")
+    df = assign_known_place_ids(df[~repeated].reset_index(drop=True))
+    return df
+
+
+def publish_new_posts(new_df):
+    """Adds micro-batch posts to the post store; the flat OUTPUT_FILE is extended by add_coordinates."""
+    written = append_post_store(new_df)
+    print(f"Post store {STORE_DIR}: {len(new_df)} new post(s) written to {written} partition file(s).")
+
 # --- Main Execution Block ---
 def main():
+    parser = argparse.ArgumentParser(description="Validate, clean and store raw post drops.")
+    parser.add_argument('--input', default=None,
+                        help=f"Raw CSV file, directory or glob (default: {RAW_DIR}/ if it has CSVs, else {INPUT_FILE}).")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for new/changed files.")
+    parser.add_argument('--force', action='store_true', help="Reprocess every file, ignoring the manifest.")
+    parser.add_argument('--reprocess-range', default=None, metavar='START:END',
+                        help="Reprocess files holding posts dated in this ISO range, e.g. 2024-01-01:2024-03-31.")
+    args = parser.parse_args()
+
     setup_nltk()
-    
-    # Check if the input file exists (using the unclean file name)
-    if not os.path.exists(INPUT_FILE):
-        print(f"\nError: Input file '{INPUT_FILE}' not found.")
+
+    spec = args.input or (RAW_DIR if resolve_sources(RAW_DIR) else INPUT_FILE)
+    sources = resolve_sources(spec)
+    if not sources:
+        print(f"\nError: No raw CSV files found for '{spec}'.")
         print("Please ensure the file is in the correct directory.")
         return
 
-    print(f"\nLoading data from {INPUT_FILE}...")
-    try:
-        raw_df = pd.read_csv(INPUT_FILE)
-    except Exception as e:
-        print(f"Failed to load CSV: {e}")
+    date_range = tuple(args.reprocess_range.split(':', 1)) if args.reprocess_range else None
+    manifest = RawManifest()
+    rules_version = cleaning_rules_version()
+    pending = manifest.pending(sources, rules_version, force=args.force, date_range=date_range)
+    print(f"\n{len(sources)} raw file(s) under '{spec}': {len(pending)} new or changed, {len(sources) - len(pending)} unchanged.")
+
+    failures = process_pending_files(manifest, pending, rules_version, workers=args.workers)
+    if failures:
+        print(f"{len(failures)} file(s) failed and will be retried on the next run; continuing with the rest.")
+    if not manifest.partitions():
+        print("\nError: No raw file has been processed successfully.")
         return
 
-    cleaned_df = clean_and_process_data(raw_df.copy()) 
+    cleaned_df = materialize_clean_store(manifest)
     
     print("\n--- Final Data Check (Types and Sample) ---")
     print("New NaN Counts:")
@@ -133,10 +280,8 @@ def main():
     # Sort by city to show an imputed row easily, then reset
     print(cleaned_df[['city', 'place_name', 'cleaned_text', 'sentiment_score']].sort_values(by='city', ascending=False).head().to_markdown(index=False, numalign="left", stralign="left"))
     
-    print(f"\nExporting cleaned data to {OUTPUT_FILE}...")
-    cleaned_df.to_csv(OUTPUT_FILE, index=False)
-    
+    publish_clean_data(cleaned_df)
     print("Export complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
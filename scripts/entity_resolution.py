@@ -0,0 +1,315 @@
+import pandas as pd
+import re
+import os
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# --- Configuration ---
+CLEAN_FILE = 'turiscope_mp_tourism_clean_data.csv'
+ATTRACTIONS_FILE = 'data/attractions_raw.csv'
+REGISTRY_FILE = 'data/place_registry.csv'
+PLACE_IDS_FILE = 'data/place_ids.csv'   # (place_name, city) -> place id of the clean store; extended by micro-batches
+
+MISSING_PLACE = 'MISSING_PLACE'
+UNKNOWN_CITY = '*'
+MATCH_THRESHOLD = 0.86
+# Blocks larger than this are compared with a sorted-neighbourhood window instead of all pairs
+MAX_BLOCK_SIZE = 32
+NEIGHBOURHOOD_WINDOW = 8
+
+# --- Normalisation Lexicon ---
+# Spelling variants, transliterations and abbreviations seen across posts, OSM and travel sites
+TOKEN_SYNONYMS = {
+    'mandir': 'temple', 'mandi': 'market', 'bazar': 'bazaar', 'qila': 'fort', 'kila': 'fort',
+    'talab': 'lake', 'tal': 'lake', 'jheel': 'lake', 'np': 'national park', 'natl': 'national',
+    'nat': 'national', 'wls': 'wildlife sanctuary', 'mahadeva': 'mahadev', 'masjeed': 'masjid',
+    'jama': 'jami', 'jamia': 'jami', 'waterfalls': 'falls', 'waterfall': 'falls', 'cave': 'caves',
+    'ghats': 'ghat',
+    'shri': '', 'sri': '', 'shree': '', 'the': '', 'of': '', 'and': '',
+}
+# Tokens too common to discriminate places; they never form a blocking key on their own
+GENERIC_TOKENS = {
+    'temple', 'fort', 'lake', 'national', 'park', 'palace', 'mahal', 'museum', 'river', 'falls', 'caves',
+    'group', 'tomb', 'masjid', 'bazaar', 'market', 'sanctuary', 'wildlife', 'zone', 'point', 'complex',
+    'ghat', 'garden', 'safari', 'tiger', 'reserve', 'hill', 'view', 'gate',
+}
+
+
+def normalize_name(name):
+    """
+    Normalises a raw place name for matching: ASCII-folds, lowercases, strips punctuation and
+    parenthetical qualifiers, applies TOKEN_SYNONYMS and drops empty tokens.
+    Returns (normalised_string, parenthetical_qualifier_or_None).
+    """
+    if not isinstance(name, str):
+        return '', None
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    qualifier = None
+    match = re.search(r'\(([^)]*)\)', text)
+    if match:
+        qualifier = match.group(1).strip() or None
+        text = text[:match.start()] + text[match.end():]
+    text = re.sub(r'[^a-z0-9 ]+', ' ', text)
+    tokens = []
+    for token in text.split():
+        token = TOKEN_SYNONYMS.get(token, token)
+        tokens.extend(token.split())
+    return ' '.join(tokens), qualifier
+
+
+def soundex(token):
+    """Classic 4-character Soundex code, used as a phonetic blocking key for transliterated names."""
+    codes = {c: d for d, letters in {'1': 'bfpv', '2': 'cgjkqsxz', '3': 'dt', '4': 'l', '5': 'mn', '6': 'r'}.items() for c in letters}
+    if not token:
+        return ''
+    first, previous, digits = token[0].upper(), codes.get(token[0], ''), []
+    for char in token[1:]:
+        code = codes.get(char, '')
+        if code and code != previous:
+            digits.append(code)
+        if char not in 'hw':
+            previous = code
+    return (first + ''.join(digits) + '000')[:4]
+
+
+def blocking_keys(normalized, city):
+    """
+    Keys that put likely matches into the same block: informative-token prefixes within the city,
+    plus a cross-city phonetic key of the whole name for records whose city is unknown.
+    """
+    tokens = normalized.split()
+    informative = [t for t in tokens if t not in GENERIC_TOKENS] or tokens
+    keys = {f"{city}|{t[:4]}" for t in informative}
+    keys.add(UNKNOWN_CITY + '|' + '-'.join(soundex(t) for t in informative))
+    if city == UNKNOWN_CITY:
+        keys.update(f"{UNKNOWN_CITY}|{t[:4]}" for t in informative)
+    return keys
+
+
+def similarity(a, b):
+    """Blend of character-level ratio and token-set overlap on normalised names (0..1)."""
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b) if tokens_a | tokens_b else 0.0
+    sorted_matcher = SequenceMatcher(None, ' '.join(sorted(tokens_a)), ' '.join(sorted(tokens_b)))
+    ordered_matcher = SequenceMatcher(None, a, b)
+    # quick_ratio() is a cheap upper bound on ratio(); most block candidates are rejected here
+    sorted_bound = sorted_matcher.quick_ratio()
+    ordered_bound = 0.5 * jaccard + 0.5 * ordered_matcher.quick_ratio()
+    if max(sorted_bound, ordered_bound) < MATCH_THRESHOLD:
+        return max(sorted_bound, ordered_bound)
+    return max(sorted_matcher.ratio(), 0.5 * jaccard + 0.5 * ordered_matcher.ratio())
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def resolve_entities(records, name_col='name', city_col='city', weight_col=None):
+    """
+    Clusters spelling variants of the same place and assigns a canonical id and name.
+
+    `records` is any DataFrame with a name column and an optional city column (NaN/missing = unknown).
+    Names are resolved over distinct (name, city) pairs, blocked so that only plausible candidates are
+    compared, and merged with union-find when similarity >= MATCH_THRESHOLD. Same-city pairs are merged first;
+    a record with an unknown city then joins its best match, and no union may bring two different known
+    cities into one cluster. The canonical name is the variant with the most weight (row count by default).
+
+    Returns `records` with `place_id` and `canonical_name` columns added (the input is not modified).
+    """
+    df = records
+    cities = df[city_col] if city_col in df.columns else pd.Series(UNKNOWN_CITY, index=df.index)
+    cities = cities.where(cities.notna() & (cities != 'MISSING_CITY'), UNKNOWN_CITY).astype(str)
+    weights = df[weight_col] if weight_col else pd.Series(1, index=df.index)
+
+    pairs = pd.DataFrame({'name': df[name_col], 'city': cities, 'weight': weights})
+    distinct = pairs.groupby(['name', 'city'], dropna=False, sort=False)['weight'].sum().reset_index()
+
+    known_cities = {c.lower(): c for c in distinct['city'].unique() if c != UNKNOWN_CITY}
+    normalized, resolved_city = [], []
+    for name, city in zip(distinct['name'], distinct['city']):
+        norm, qualifier = normalize_name(name)
+        # "Upper Lake (Bhopal)" carries its city in the qualifier; "Upper Lake (Bhojtal)" does not
+        if city == UNKNOWN_CITY and qualifier in known_cities:
+            city = known_cities[qualifier]
+        normalized.append(norm)
+        resolved_city.append(city)
+    distinct['normalized'] = normalized
+    distinct['resolved_city'] = resolved_city
+
+    # --- Union-Find over distinct names ---
+    parent = list(range(len(distinct)))
+    root_city = list(resolved_city)  # known city of each root's cluster, UNKNOWN_CITY if none
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i == root_j:
+            return
+        city_i, city_j = root_city[root_i], root_city[root_j]
+        if city_i != city_j and UNKNOWN_CITY not in (city_i, city_j):
+            return  # would chain places of two different cities through an unknown-city record
+        root, child = min(root_i, root_j), max(root_i, root_j)
+        parent[child] = root
+        root_city[root] = city_i if city_i != UNKNOWN_CITY else city_j
+
+    blocks = defaultdict(list)
+    for i, (norm, city, name) in enumerate(zip(normalized, resolved_city, distinct['name'])):
+        if not norm or name == MISSING_PLACE:
+            continue
+        for key in blocking_keys(norm, city):
+            blocks[key].append(i)
+
+    compared, unknown_city_matches = set(), []
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) <= MAX_BLOCK_SIZE:
+            candidates = ((a, b) for idx, a in enumerate(members) for b in members[idx + 1:])
+        else:
+            ordered = sorted(members, key=lambda i: normalized[i])
+            candidates = (
+                (a, b) for idx, a in enumerate(ordered)
+                for b in ordered[idx + 1:idx + 1 + NEIGHBOURHOOD_WINDOW]
+            )
+        for a, b in candidates:
+            pair = (min(a, b), max(a, b))
+            if pair in compared or find(a) == find(b):
+                continue
+            compared.add(pair)
+            city_a, city_b = resolved_city[a], resolved_city[b]
+            if city_a != city_b and UNKNOWN_CITY not in (city_a, city_b):
+                continue
+            score = similarity(normalized[a], normalized[b])
+            if score < MATCH_THRESHOLD:
+                continue
+            if city_a == city_b:
+                union(a, b)
+            else:
+                unknown_city_matches.append((score, a, b))
+
+    # Unknown-city records join their best match once the same-city clusters are complete
+    for score, a, b in sorted(unknown_city_matches, key=lambda match: -match[0]):
+        union(a, b)
+
+    # --- Canonical name and id per cluster ---
+    distinct['cluster'] = [find(i) for i in range(len(distinct))]
+    ranked = distinct.assign(name_len=distinct['name'].astype(str).str.len()).sort_values(
+        ['cluster', 'weight', 'name_len', 'name'], ascending=[True, False, True, True]
+    )
+    canonical = ranked.drop_duplicates('cluster').set_index('cluster')
+    # A cluster's city is the city of its heaviest variant that has one
+    known_city = (
+        ranked[ranked['resolved_city'] != UNKNOWN_CITY]
+        .drop_duplicates('cluster').set_index('cluster')['resolved_city']
+    )
+
+    def place_id(cluster):
+        name = canonical.at[cluster, 'name']
+        if name == MISSING_PLACE:
+            return MISSING_PLACE
+        city = known_city.get(cluster, UNKNOWN_CITY)
+        name_slug = _slug(normalize_name(name)[0])
+        return f"{_slug(city)}:{name_slug}" if city != UNKNOWN_CITY else f"any:{name_slug}"
+
+    clusters = distinct['cluster'].unique()
+    cluster_ids = {c: place_id(c) for c in clusters}
+    distinct['place_id'] = distinct['cluster'].map(cluster_ids)
+    distinct['canonical_name'] = distinct['cluster'].map(canonical['name'])
+
+    lookup = distinct.set_index(['name', 'city'])[['place_id', 'canonical_name']]
+    keys = pd.MultiIndex.from_arrays([df[name_col], cities])
+    return df.assign(
+        place_id=lookup['place_id'].reindex(keys).to_numpy(),
+        canonical_name=lookup['canonical_name'].reindex(keys).to_numpy(),
+    )
+
+
+def assign_place_ids(df):
+    """Adds `place_id` and `canonical_place_name` to cleaned posts (place_name/city columns)."""
+    resolved = resolve_entities(df, name_col='place_name', city_col='city')
+    df['place_id'] = resolved['place_id']
+    df['canonical_place_name'] = resolved['canonical_name']
+    return df
+
+
+def save_place_ids(df, place_ids_file=PLACE_IDS_FILE):
+    """Writes the (place_name, city) -> place_id/canonical_place_name table of resolved posts."""
+    table = df[['place_name', 'city', 'place_id', 'canonical_place_name']].drop_duplicates(['place_name', 'city'])
+    os.makedirs(os.path.dirname(place_ids_file), exist_ok=True)
+    table.sort_values(['place_id', 'place_name']).to_csv(place_ids_file, index=False)
+
+
+def assign_known_place_ids(df, place_ids_file=PLACE_IDS_FILE):
+    """
+    Adds `place_id` and `canonical_place_name` to new posts without re-resolving the history.
+
+    Names already in the place-id table keep their id. New names are resolved together with the
+    table's names only (one row per distinct name, not per post): a new name that joins an existing
+    cluster takes that cluster's id, otherwise it gets a new one. The table is then extended.
+    """
+    known = pd.read_csv(place_ids_file)
+    keys = pd.MultiIndex.from_arrays([df['place_name'], df['city']])
+    lookup = known.set_index(['place_name', 'city'])[['place_id', 'canonical_place_name']]
+    found = lookup.reindex(keys)
+
+    new = df.loc[found['place_id'].isna().to_numpy(), ['place_name', 'city']].drop_duplicates()
+    if not new.empty:
+        candidates = pd.concat([known[['place_name', 'city']], new], ignore_index=True)
+        resolved = resolve_entities(candidates, name_col='place_name', city_col='city')
+        existing = resolved.iloc[:len(known)].assign(
+            known_id=known['place_id'].to_numpy(), known_name=known['canonical_place_name'].to_numpy()
+        ).drop_duplicates('place_id').set_index('place_id')
+        added = resolved.iloc[len(known):]
+        new = new.assign(
+            place_id=added['place_id'].map(existing['known_id']).fillna(added['place_id']).to_numpy(),
+            canonical_place_name=added['place_id'].map(existing['known_name']).fillna(added['canonical_name']).to_numpy(),
+        )
+        known = pd.concat([known, new], ignore_index=True)
+        known.sort_values(['place_id', 'place_name']).to_csv(place_ids_file, index=False)
+        lookup = known.set_index(['place_name', 'city'])[['place_id', 'canonical_place_name']]
+        found = lookup.reindex(keys)
+        print(f"Resolved {len(new)} new place name(s) against {len(candidates) - len(new)} known ones.")
+
+    return df.assign(
+        place_id=found['place_id'].to_numpy(),
+        canonical_place_name=found['canonical_place_name'].to_numpy(),
+    )
+
+# --- Main Execution Block ---
+
+def main():
+    """Rebuilds the place registry from the cleaned posts plus any scraped attraction list."""
+    if not os.path.exists(CLEAN_FILE):
+        print(f"Error: Clean data file not found at {CLEAN_FILE}. Please run data_cleaner.py first.")
+        return
+
+    posts = pd.read_csv(CLEAN_FILE)
+    frames = [posts[['place_name', 'city']].rename(columns={'place_name': 'name'}).assign(source='posts')]
+    if os.path.exists(ATTRACTIONS_FILE):
+        attractions = pd.read_csv(ATTRACTIONS_FILE)
+        frames.append(attractions[['name']].assign(city=None, source=attractions.get('source', 'attractions')))
+
+    combined = pd.concat(frames, ignore_index=True)
+    resolved = resolve_entities(combined, name_col='name', city_col='city')
+    registry = resolved[['place_id', 'canonical_name', 'name', 'city', 'source']].rename(columns={'name': 'variant'})
+    registry = registry.drop_duplicates().sort_values(['place_id', 'variant'])
+
+    os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
+    registry.to_csv(REGISTRY_FILE, index=False)
+
+    merged = registry.groupby('place_id')['variant'].nunique()
+    print(f"Resolved {registry['variant'].nunique()} distinct names into {len(merged)} canonical places "
+          f"({int((merged > 1).sum())} with multiple spellings).")
+    print(f"[SUCCESS] Place registry saved to {REGISTRY_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
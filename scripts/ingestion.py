@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+import time
+from datetime import datetime
+
+# --- Configuration ---
+INPUT_FILE = 'turiscope_mp_tourism_sentiment_dataset_unclean.csv'
+QUARANTINE_DIR = 'data/quarantine'
+QUALITY_FILE = 'data/ingestion_quality.json'
+MAX_QUALITY_BATCHES = 100        # batch summaries kept in QUALITY_FILE
+
+# --- Raw Schema ---
+# Every column is read once by the C parser as a typed string column; numeric columns are converted
+# in one vectorized pass afterwards so unparseable cells can be reported instead of silently lost.
+TEXT_COLUMNS = ['id', 'platform', 'city', 'place_name', 'username', 'text', 'sentiment', 'date', 'tags']
+NUMERIC_COLUMNS = {'sentiment_score': 'float64', 'likes': 'Int64', 'comments': 'Int64'}
+RAW_SCHEMA = {**{col: 'string' for col in TEXT_COLUMNS}, **{col: 'string' for col in NUMERIC_COLUMNS}}
+NULL_TOKENS = ['', 'NA', 'N/A', 'NaN', 'nan', 'null', 'None']
+
+VALID_PLATFORMS = {'Twitter', 'Instagram', 'Reddit'}
+VALID_SENTIMENTS = {'positive', 'neutral', 'negative'}
+SCORE_RANGE = (0.0, 1.0)
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y']
+
+# --- Validation Rules ---
+# Rejected rows go to the quarantine file; repaired rows stay, with the bad value left as NA for the
+# cleaner's imputation policy. Both are counted per reason code in the batch summary.
+REJECT_CODES = [
+    'missing_id', 'duplicate_id', 'missing_text', 'invalid_platform', 'invalid_sentiment_label',
+    'invalid_date', 'future_date', 'score_out_of_range', 'negative_count',
+]
+REPAIR_CODES = ['invalid_sentiment_score', 'invalid_likes', 'invalid_comments']
+
+
+def read_raw_posts(path):
+    """Single typed parse of a raw post CSV (C engine, explicit dtypes, declared null tokens)."""
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [col for col in RAW_SCHEMA if col not in header]
+    if missing:
+        raise ValueError(f"{path} is missing required column(s): {', '.join(missing)}")
+    return pd.read_csv(
+        path, engine='c', usecols=list(RAW_SCHEMA), dtype=RAW_SCHEMA,
+        na_values=NULL_TOKENS, keep_default_na=False,
+    )
+
+
+def parse_dates(values):
+    """Parses the accepted date formats in turn; returns datetimes (NaT where none match)."""
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for fmt in DATE_FORMATS:
+        pending = parsed.isna() & values.notna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(values[pending], format=fmt, errors='coerce')
+    return parsed
+
+
+def validate_posts(raw, today=None):
+    """
+    Converts and validates a raw batch with vectorized rule masks.
+    Returns (accepted_df, quarantine_df, reason_counts). Accepted rows have typed numeric columns
+    and ISO dates; quarantined rows keep their raw values plus a '|'-joined `reason_codes` column.
+    Exact duplicate rows are dropped and counted as 'duplicate_row'.
+    """
+    today = pd.Timestamp(today or datetime.now().date())
+    duplicate_rows = raw.duplicated()
+    raw = raw[~duplicate_rows].reset_index(drop=True)
+
+    numeric = {col: pd.to_numeric(raw[col], errors='coerce').astype(dtype) for col, dtype in NUMERIC_COLUMNS.items()}
+    platform = raw['platform'].str.strip().str.title()
+    sentiment = raw['sentiment'].str.strip().str.lower()
+    dates = parse_dates(raw['date'].str.strip())
+    score = numeric['sentiment_score']
+
+    rules = {
+        'missing_id': raw['id'].isna(),
+        'duplicate_id': raw['id'].notna() & raw['id'].duplicated(),
+        'missing_text': raw['text'].fillna('').str.strip().eq(''),
+        'invalid_platform': ~platform.isin(VALID_PLATFORMS),
+        'invalid_sentiment_label': ~sentiment.isin(VALID_SENTIMENTS),
+        'invalid_date': dates.isna(),
+        'future_date': dates > today,
+        'score_out_of_range': score.notna() & ~score.between(*SCORE_RANGE),
+        'negative_count': (numeric['likes'] < 0).fillna(False) | (numeric['comments'] < 0).fillna(False),
+        'invalid_sentiment_score': raw['sentiment_score'].notna() & score.isna(),
+        'invalid_likes': raw['likes'].notna() & numeric['likes'].isna(),
+        'invalid_comments': raw['comments'].notna() & numeric['comments'].isna(),
+    }
+    masks = pd.DataFrame({code: mask.to_numpy(dtype=bool) for code, mask in rules.items()})
+    rejected = masks[REJECT_CODES].any(axis=1).to_numpy()
+
+    reason_counts = {code: int(masks[code].sum()) for code in REJECT_CODES + REPAIR_CODES}
+    reason_counts['duplicate_row'] = int(duplicate_rows.sum())
+
+    # '|'-joined reason codes per rejected row, built column-wise rather than row by row
+    labels = np.array([f"{code}|" for code in masks.columns], dtype=object)
+    codes = np.where(masks[rejected].to_numpy(), labels, '').sum(axis=1)
+    quarantine = raw[rejected].assign(reason_codes=pd.Series(codes, dtype=object).str.rstrip('|').to_numpy())
+
+    accepted = raw.assign(
+        platform=platform, sentiment=sentiment, date=dates.dt.strftime('%Y-%m-%d'), **numeric
+    )[~rejected].reset_index(drop=True)
+    return accepted, quarantine.reset_index(drop=True), reason_counts
+
+
+def summarize_batch(batch_id, source, raw, accepted, quarantine, reason_counts, seconds):
+    """Per-batch data-quality summary (row counts, reason-code counts, null rates of accepted rows)."""
+    repaired = sum(reason_counts[code] for code in REPAIR_CODES)
+    return {
+        'batch_id': batch_id,
+        'source': source,
+        'ingested_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'rows_read': int(len(raw)),
+        'rows_accepted': int(len(accepted)),
+        'rows_quarantined': int(len(quarantine)),
+        'values_repaired': int(repaired),
+        'reason_counts': reason_counts,
+        'null_rates': {col: round(float(rate), 4) for col, rate in accepted.isna().mean().items()},
+        'seconds': round(seconds, 3),
+    }
+
+
+def record_quality_summaries(summaries, quality_file=QUALITY_FILE):
+    """
+    Appends batch summaries to the quality log, keeping the most recent MAX_QUALITY_BATCHES.
+    The log is replaced atomically, so a concurrent reader never sees a truncated file.
+    """
+    history = []
+    if os.path.exists(quality_file):
+        with open(quality_file, 'r') as f:
+            history = json.load(f)
+    history = (history + list(summaries))[-MAX_QUALITY_BATCHES:]
+    os.makedirs(os.path.dirname(quality_file), exist_ok=True)
+    tmp_file = f"{quality_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(history, f, indent=4)
+    os.replace(tmp_file, quality_file)
+
+
+def record_quality_summary(summary, quality_file=QUALITY_FILE):
+    record_quality_summaries([summary], quality_file)
+
+
+def ingest_file(path, batch_id=None, record=True):
+    """
+    Typed parse + validation of one raw drop. Writes rejected rows to QUARANTINE_DIR, appends the
+    batch summary to QUALITY_FILE (unless record=False, e.g. in worker processes whose parent
+    appends every summary in one write) and returns (accepted_df, summary).
+    """
+    started = time.perf_counter()
+    batch_id = batch_id or f"{os.path.splitext(os.path.basename(path))[0]}_{datetime.now():%Y%m%d%H%M%S}"
+
+    raw = read_raw_posts(path)
+    accepted, quarantine, reason_counts = validate_posts(raw)
+    summary = summarize_batch(batch_id, path, raw, accepted, quarantine, reason_counts, time.perf_counter() - started)
+
+    if not quarantine.empty:
+        os.makedirs(QUARANTINE_DIR, exist_ok=True)
+        quarantine_file = os.path.join(QUARANTINE_DIR, f"{batch_id}.csv")
+        quarantine.assign(batch_id=batch_id).to_csv(quarantine_file, index=False)
+        summary['quarantine_file'] = quarantine_file
+    if record:
+        record_quality_summary(summary)
+    return accepted, summary
+
+
+def print_summary(summary):
+    print(f"Batch {summary['batch_id']}: read {summary['rows_read']}, accepted {summary['rows_accepted']}, "
+          f"quarantined {summary['rows_quarantined']}, repaired {summary['values_repaired']} value(s) "
+          f"in {summary['seconds']}s.")
+    issues = {code: n for code, n in summary['reason_counts'].items() if n}
+    if issues:
+        print(f"Reason codes: {issues}")
+
+# --- Main Execution Block ---
+
+def main():
+    if not os.path.exists(INPUT_FILE):
+        print(f"\nError: Input file '{INPUT_FILE}' not found.")
+        return
+
+    _, summary = ingest_file(INPUT_FILE)
+    print_summary(summary)
+    print(f"[SUCCESS] Quality summary appended to {QUALITY_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# --- Configuration ---
+DEFAULT_URL = 'http://127.0.0.1:8502'
+# Mix of the polling patterns our downstream dashboards use
+REQUEST_MIX = [
+    '/v1/metrics',
+    '/v1/places?page=1&page_size=25',
+    '/v1/places?fields=place_name,Sentiment%20Index&page_size=100',
+    '/v1/map',
+    '/v1/civic',
+    '/v1/rollups?fields=city,avg_sentiment,inferred_complaints',
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_worker(base_url, deadline, conditional, results, lock, seed):
+    """Issues requests until the deadline, replaying ETags like a well-behaved poller when conditional=True."""
+    rng = random.Random(seed)
+    etags = {}
+    local = []
+    while time.perf_counter() < deadline:
+        path = rng.choice(REQUEST_MIX)
+        request = urllib.request.Request(base_url + path, headers={'Accept-Encoding': 'gzip'})
+        if conditional and path in etags:
+            request.add_header('If-None-Match', etags[path])
+
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+                status = response.status
+                etags[path] = response.headers.get('ETag', '')
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        local.append((status, time.perf_counter() - start))
+
+    with lock:
+        results.extend(local)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the Touriscope metrics API (api.py).")
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument('--no-conditional', action='store_true', help="Do not send If-None-Match.")
+    args = parser.parse_args()
+
+    print(f"Load testing {args.url} with {args.concurrency} workers for {args.duration:.0f}s...")
+    results, lock = [], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    workers = [
+        threading.Thread(target=run_worker, args=(args.url, deadline, not args.no_conditional, results, lock, i))
+        for i in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print("\n--- Results ---")
+    print(f"Requests:    {len(results)}")
+    print(f"Throughput:  {len(results) / elapsed:.1f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"Latency p95: {percentile(latencies, 95) * 1000:.2f} ms")
+    print(f"Latency p99: {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"Statuses:    {dict(sorted(statuses.items()))}  (0 = connection error)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+import types
+from datetime import datetime
+from benchmark_startup import VIEWS
+from load_test_api import percentile
+
+# --- Configuration ---
+APP_FILE = 'app.py'
+OUTPUT_FILE = 'benchmarks/app_load_test.json'
+VIEW_LABELS = dict(zip(VIEWS, ('tourism', 'civic', 'chatbot')))
+CHAT_VIEW = VIEWS[2]
+CHAT_SHARE = 0.4            # share of session actions that are chat prompts; the rest switch views
+RUN_TIMEOUT_S = 120         # per script run, generous because runs queue behind each other under load
+CHAT_PROMPTS = [
+    "Tell me about Upper Lake.",
+    "What are the timings of Mahakaleshwar Temple?",
+    "Is Khajuraho crowded in December?",
+    "Where can I eat at night in Indore?",
+    "The ghats near Ram Ghat are very dirty today.",
+    "What is trending in Madhya Pradesh right now?",
+]
+STUB_REPLY = "Here is what Touriscope knows about that. " + "It is a popular stop in Madhya Pradesh. " * 10
+
+
+class StubResponse:
+    candidates = ()     # no function call parts, so get_gemini_response returns .text
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Stands in for genai.GenerativeModel: sleeps latency_s +/- jitter_s per call, no network."""
+
+    latency_s = 1.0
+    jitter_s = 0.0
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        pass
+
+    def generate_content(self, contents=None, **kwargs):
+        with StubGenerativeModel._lock:
+            StubGenerativeModel.calls += 1
+        time.sleep(max(0.0, random.uniform(self.latency_s - self.jitter_s, self.latency_s + self.jitter_s)))
+        return StubResponse(STUB_REPLY)
+
+
+def install_gemini_stub(latency_s, jitter_s):
+    """
+    Puts a stub `google.generativeai` in sys.modules, so app.py's own get_gemini_response (context
+    budgeting, metrics) runs unchanged and only the model call itself is simulated.
+    """
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType('google')
+        google.__path__ = []
+        sys.modules['google'] = google
+    genai = types.ModuleType('google.generativeai')
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = StubGenerativeModel
+    sys.modules['google.generativeai'] = genai
+    google.generativeai = genai
+    StubGenerativeModel.latency_s = latency_s
+    StubGenerativeModel.jitter_s = jitter_s
+
+
+def allow_overlapping_runs():
+    """
+    Makes AppTest behave like one server process serving many sessions:
+    - AppTest installs a mock Runtime singleton per script run and clears it when the run ends, which
+      crashes runs still in flight in other threads; fall back to the most recent mock instead.
+    - AppTest compiles app.py on every run; a server compiles it once. Share one compiled copy, which
+      also keeps concurrent runs from compiling in parallel (unsafe on some CPython 3.11 builds).
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    last = {}
+    bytecode, bytecode_lock = {}, threading.Lock()
+    compile_script = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        with bytecode_lock:
+            if script_path not in bytecode:
+                bytecode[script_path] = compile_script(self, script_path)
+            return bytecode[script_path]
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+        if 'runtime' not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return cls._instance or last['runtime']
+
+    ScriptCache.get_bytecode = get_bytecode
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or 'runtime' in last)
+    # Each run patches and restores this option; set it up front so a finishing run never unsets it
+    config.set_option('global.appTest', True)
+
+
+def current_rss_mb():
+    """Resident set size of this process (Linux); elsewhere the peak RSS, which only ever grows."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def retained_mb(roots, skip_types=()):
+    """
+    Deep size of everything reachable from `roots`. Code (modules, classes, functions) is shared by all
+    sessions and not counted; protobuf messages count their serialized size.
+    """
+    shared = (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType, types.MethodType) + tuple(skip_types)
+    seen, stack, total = set(), list(roots), 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, shared):
+            continue
+        seen.add(id(obj))
+        if hasattr(obj, 'ByteSize') and hasattr(obj, 'SerializeToString'):
+            total += sys.getsizeof(obj) + obj.ByteSize()
+            continue
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total / 2**20
+
+
+class Session:
+    """One simulated browser tab: an AppTest instance with its own session state."""
+
+    def __init__(self, app_file, seed):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(app_file, default_timeout=RUN_TIMEOUT_S)
+        self.app.secrets['gemini'] = {'api_key': 'stub'}
+        self.rng = random.Random(seed)
+        self.view = VIEWS[0]
+        self.samples = []       # (action, latency_s, ok)
+        self.errors = []
+
+    def _timed(self, action, step):
+        started = time.perf_counter()
+        try:
+            step()
+            failed = [str(e.message) for e in self.app.exception]
+        except Exception as e:  # run timeouts, missing widgets
+            failed = [f"{type(e).__name__}: {e}"]
+        self.samples.append((action, time.perf_counter() - started, not failed))
+        self.errors.extend(failed)
+
+    def memory_mb(self):
+        """Session state plus the last rendered element tree: what a server keeps per connected tab."""
+        from streamlit.testing.v1 import AppTest
+        return retained_mb([self.app.session_state, self.app._tree], skip_types=(AppTest,))
+
+    def open(self):
+        self._timed('first_render', self.app.run)
+
+    def switch_view(self, view):
+        self.view = view
+        self._timed(f"view:{VIEW_LABELS[view]}", lambda: self.app.sidebar.radio[0].set_value(view).run())
+
+    def send_chat(self):
+        if self.view != CHAT_VIEW:
+            self.switch_view(CHAT_VIEW)
+        prompt = self.rng.choice(CHAT_PROMPTS)
+        self._timed('chat', lambda: self.app.chat_input[0].set_value(prompt).run())
+
+    def run_until(self, deadline, think_time):
+        """Opens the app, then alternates view switches and chat prompts with random think time."""
+        self.open()
+        while time.perf_counter() < deadline:
+            time.sleep(self.rng.uniform(0, 2 * think_time))
+            if self.rng.random() < CHAT_SHARE:
+                self.send_chat()
+            else:
+                self.switch_view(self.rng.choice([v for v in VIEWS if v != self.view]))
+
+
+def warm_up(app_file):
+    """Cold start plus one pass over every view, so shared caches are loaded before measuring."""
+    session = Session(app_file, seed=-1)
+    started = time.perf_counter()
+    session.open()
+    cold_start = time.perf_counter() - started
+    for view in VIEWS[1:] + VIEWS[:1]:
+        session.switch_view(view)
+    return round(cold_start, 3), session.errors
+
+
+def run_level(app_file, n_sessions, duration, think_time, ramp, seed):
+    """Runs n_sessions concurrent sessions for `duration` seconds and summarizes them."""
+    gc.collect()
+    rss_before = current_rss_mb()
+    calls_before = StubGenerativeModel.calls
+
+    sessions = [Session(app_file, seed=seed + i) for i in range(n_sessions)]
+    deadline = time.perf_counter() + ramp + duration
+    threads = [threading.Thread(target=s.run_until, args=(deadline, think_time)) for s in sessions]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        time.sleep(ramp / n_sessions)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Sessions are still referenced here, so their state counts towards the RSS
+    gc.collect()
+    rss_during = current_rss_mb()
+    retained = sorted(s.memory_mb() for s in sessions)
+
+    samples = [sample for s in sessions for sample in s.samples]
+    errors = [error for s in sessions for error in s.errors]
+    by_action = {}
+    for action, latency, _ in samples:
+        by_action.setdefault(action, []).append(latency)
+    by_action['all'] = [latency for _, latency, _ in samples]
+
+    return {
+        'sessions': n_sessions,
+        'elapsed_s': round(elapsed, 3),
+        'script_runs': len(samples),
+        'throughput_runs_per_s': round(len(samples) / elapsed, 2),
+        'chat_prompts': len(by_action.get('chat', [])),
+        'llm_calls': StubGenerativeModel.calls - calls_before,
+        'failed_runs': sum(1 for _, _, ok in samples if not ok),
+        'error_examples': sorted(set(errors))[:5],
+        'latency_ms': {
+            action: {
+                'count': len(values),
+                'p50': round(percentile(sorted(values), 50) * 1000, 1),
+                'p95': round(percentile(sorted(values), 95) * 1000, 1),
+                'p99': round(percentile(sorted(values), 99) * 1000, 1),
+                'max': round(max(values) * 1000, 1),
+            }
+            for action, values in sorted(by_action.items()) if values
+        },
+        'memory_mb': {
+            'per_session_median': round(retained[len(retained) // 2], 3),
+            'per_session_max': round(retained[-1], 3),
+            # Process-level view; freed memory from earlier levels gets reused, so the delta is noisy
+            'rss_before': round(rss_before, 1) if rss_before is not None else None,
+            'rss_with_sessions': round(rss_during, 1) if rss_during is not None else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of app.py with Streamlit's AppTest.")
+    parser.add_argument('--app', default=APP_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--sessions', default='1,4,8,16', help="Comma-separated concurrency levels to run in turn.")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds each level runs after ramp-up.")
+    parser.add_argument('--ramp', type=float, default=2.0, help="Seconds over which a level's sessions start.")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Mean pause between a session's actions.")
+    parser.add_argument('--llm-latency', type=float, default=1.5, help="Stub Gemini latency per call (s).")
+    parser.add_argument('--llm-jitter', type=float, default=0.5, help="Uniform +/- jitter on the stub latency (s).")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.sessions.split(',') if n.strip()]
+    app_file = os.path.abspath(args.app)   # AppTest resolves relative paths against this script
+    install_gemini_stub(args.llm_latency, args.llm_jitter)
+    allow_overlapping_runs()
+
+    print(f"Warming up {args.app} (cold start + every view)...")
+    cold_start, warm_up_errors = warm_up(app_file)
+    if warm_up_errors:
+        print(f"[WARNING] Warm-up raised: {warm_up_errors[0]}")
+
+    results = []
+    for n_sessions in levels:
+        print(f"Running {n_sessions} concurrent session(s) for {args.duration:.0f}s...")
+        results.append(run_level(app_file, n_sessions, args.duration, args.think_time, args.ramp, args.seed))
+
+    report = {
+        'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'settings': {
+            'duration_s': args.duration, 'ramp_s': args.ramp, 'think_time_s': args.think_time,
+            'llm_latency_s': args.llm_latency, 'llm_jitter_s': args.llm_jitter, 'chat_share': CHAT_SHARE,
+        },
+        'cold_first_render_s': cold_start,
+        'warm_up_errors': warm_up_errors[:5],
+        'levels': results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"\nCold first render: {cold_start}s")
+    print(f"\n{'sessions':>8} {'runs/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'chat p95':>9} {'failed':>7} {'max MB/sess':>11}")
+    for level in results:
+        overall, chat = level['latency_ms']['all'], level['latency_ms'].get('chat', {})
+        per_session = level['memory_mb']['per_session_max']
+        print(f"{level['sessions']:>8} {level['throughput_runs_per_s']:>8} {overall['p50']:>8} {overall['p95']:>8} "
+              f"{overall['p99']:>8} {chat.get('p95', '-'):>9} {level['failed_runs']:>7} "
+              f"{per_session:>11}")
+    print(f"[SUCCESS] App load test saved to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# --- Configuration ---
+NAMESPACE = 'touriscope'
+MAX_SAMPLES = 1024              # most recent observations kept per timer for the quantiles
+QUANTILES = (0.5, 0.9, 0.99)
+DUMP_JSON_FILE = 'data/perf_metrics.json'
+DUMP_PROM_FILE = 'data/perf_metrics.prom'   # Prometheus text format (served by api.py at /metrics)
+DUMP_INTERVAL_SECONDS = 60
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _quantile(sorted_samples, q):
+    """Nearest-rank quantile of an already sorted list."""
+    if not sorted_samples:
+        return None
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class _Timer:
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, in-process counters and timers with labels.
+
+    Timers keep an exact count/sum/max plus the last MAX_SAMPLES observations for p50/p90/p99, so
+    memory stays bounded however long the app runs. The registry can be read as a dict (for the
+    admin page and the JSON dump) or as Prometheus text exposition (counters become `<name>_total`,
+    timers become summaries).
+    """
+
+    def __init__(self, namespace=NAMESPACE):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+        self.started_at = time.time()
+        self._last_dump = time.monotonic()
+
+    # --- Recording ---
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = _Timer()
+            timer.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Times the block (also when it raises) into the `name` timer."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+            self.started_at = time.time()
+
+    # --- Reading ---
+
+    def snapshot(self):
+        """Plain-dict copy of every counter and timer summary, sorted by name then labels."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = [(key, timer.count, timer.total, timer.max, sorted(timer.samples))
+                      for key, timer in sorted(self._timers.items())]
+            started_at = self.started_at
+
+        return {
+            'namespace': self.namespace,
+            'started_at': started_at,
+            'uptime_seconds': round(time.time() - started_at, 3),
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in counters
+            ],
+            'timers': [
+                {
+                    'name': name, 'labels': dict(labels), 'count': count, 'sum': round(total, 6),
+                    'mean': round(total / count, 6) if count else None, 'max': round(maximum, 6),
+                    **{f"p{int(q * 100)}": round(_quantile(samples, q), 6) for q in QUANTILES if samples},
+                }
+                for (name, labels), count, total, maximum, samples in timers
+            ],
+        }
+
+    def to_prometheus(self, snapshot=None):
+        """Prometheus text exposition format (version 0.0.4) of the current values."""
+        snapshot = snapshot or self.snapshot()
+        lines = []
+        typed = set()
+
+        for counter in snapshot['counters']:
+            metric = f"{self.namespace}_{counter['name']}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_format_labels(sorted(counter['labels'].items()))} {counter['value']}")
+
+        for timer in snapshot['timers']:
+            metric = f"{self.namespace}_{timer['name']}"
+            labels = sorted(timer['labels'].items())
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} summary")
+                typed.add(metric)
+            for q in QUANTILES:
+                value = timer.get(f"p{int(q * 100)}")
+                if value is not None:
+                    lines.append(f"{metric}{_format_labels(labels, [('quantile', str(q))])} {value}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {timer['sum']}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {timer['count']}")
+
+        uptime = f"{self.namespace}_uptime_seconds"
+        lines += [f"# TYPE {uptime} gauge", f"{uptime} {snapshot['uptime_seconds']}"]
+        return '\n'.join(lines) + '\n'
+
+    # --- Export ---
+
+    def dump(self, json_file=DUMP_JSON_FILE, prom_file=DUMP_PROM_FILE):
+        """Writes the JSON snapshot and the Prometheus text atomically (readers never see half a file)."""
+        snapshot = self.snapshot()
+        snapshot['dumped_at'] = time.time()
+        for path, text in ((json_file, json.dumps(snapshot, indent=4)), (prom_file, self.to_prometheus(snapshot))):
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_file = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                f.write(text)
+            os.replace(tmp_file, path)
+        return snapshot
+
+    def maybe_dump(self, interval=DUMP_INTERVAL_SECONDS, **paths):
+        """Dumps at most once per `interval` seconds; cheap enough to call on every script run."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump < interval:
+                return False
+            self._last_dump = now
+        self.dump(**paths)
+        return True
@@ -0,0 +1,200 @@
+import pandas as pd
+import json
+import os
+import shutil
+from urllib.parse import quote
+
+# --- Configuration ---
+STORE_DIR = 'data/post_store'
+STATS_FILE = os.path.join(STORE_DIR, '_stats.json')
+FLAT_FILE = 'turiscope_mp_tourism_clean_data.csv'   # fallback when the store has not been built
+ROW_GROUP_SIZE = 50_000
+STATS_COLUMNS = ['date', 'sentiment_score', 'likes', 'comments']
+
+# Layout: STORE_DIR/city=<City>/month=<YYYY-MM>/part-0.parquet (Hive-style, values URI-encoded).
+# Rows inside a file are sorted by sentiment_score so row-group statistics prune score filters too.
+# _stats.json holds per-file row counts and min/max of STATS_COLUMNS, checked before any file is opened.
+
+
+def _partition_path(city, month):
+    return os.path.join(f"city={quote(str(city), safe='')}", f"month={quote(str(month), safe='')}", 'part-0.parquet')
+
+
+def _content_hash(df):
+    return str(int(pd.util.hash_pandas_object(df, index=False).sum()) & 0xFFFFFFFFFFFFFFFF)
+
+
+def load_store_stats(stats_file=STATS_FILE):
+    """Per-file statistics of the store ({} when it has not been built)."""
+    if not os.path.exists(stats_file):
+        return {}
+    with open(stats_file, 'r') as f:
+        return json.load(f)['files']
+
+
+def _partition_entry(part, city, month):
+    """_stats.json entry of one partition: row count, content hash and min/max of STATS_COLUMNS."""
+    entry = {'city': city, 'month': month, 'rows': int(len(part)), 'content_hash': _content_hash(part)}
+    for col in STATS_COLUMNS:
+        if col in part.columns and part[col].notna().any():
+            entry[f'{col}_min'], entry[f'{col}_max'] = part[col].min(), part[col].max()
+    return {k: (v.item() if hasattr(v, 'item') else v) for k, v in entry.items()}
+
+
+def write_post_store(df, store_dir=STORE_DIR):
+    """
+    Writes cleaned posts as one Parquet file per (city, year-month). Partitions whose content is
+    unchanged since the last write are left alone, and partitions that no longer have posts are
+    removed. Returns (files_written, files_unchanged).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.assign(month=df['date'].astype(str).str[:7])
+    schema = pa.Schema.from_pandas(df.drop(columns=['city', 'month']).iloc[:0], preserve_index=False)
+    previous = load_store_stats(os.path.join(store_dir, '_stats.json'))
+
+    stats, written, unchanged = {}, 0, 0
+    for (city, month), part in df.groupby(['city', 'month'], sort=True):
+        part = part.drop(columns=['city', 'month']).sort_values('sentiment_score', kind='stable').reset_index(drop=True)
+        rel_path = _partition_path(city, month)
+        stats[rel_path] = _partition_entry(part, city, month)
+
+        full_path = os.path.join(store_dir, rel_path)
+        if previous.get(rel_path, {}).get('content_hash') == stats[rel_path]['content_hash'] and os.path.exists(full_path):
+            unchanged += 1
+            continue
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+        pq.write_table(table, full_path, row_group_size=ROW_GROUP_SIZE)
+        written += 1
+
+    for rel_path in set(previous) - set(stats):
+        month_dir = os.path.dirname(os.path.join(store_dir, rel_path))
+        shutil.rmtree(month_dir, ignore_errors=True)
+        if os.path.isdir(os.path.dirname(month_dir)) and not os.listdir(os.path.dirname(month_dir)):
+            os.rmdir(os.path.dirname(month_dir))
+
+    with open(os.path.join(store_dir, '_stats.json'), 'w') as f:
+        json.dump({'files': stats}, f, indent=4, sort_keys=True)
+    return written, unchanged
+
+
+def append_post_store(df, store_dir=STORE_DIR):
+    """
+    Adds new posts to an existing store, rewriting only the (city, year-month) partitions they fall
+    in; every other file and its statistics are left alone. Returns the number of files written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.assign(month=df['date'].astype(str).str[:7])
+    stats_file = os.path.join(store_dir, '_stats.json')
+    stats = load_store_stats(stats_file)
+    # New partitions are written with the schema of the existing files, so the dataset stays uniform
+    schema = next((pq.read_schema(os.path.join(store_dir, rel_path)) for rel_path in sorted(stats)
+                   if os.path.exists(os.path.join(store_dir, rel_path))), None)
+
+    written = 0
+    for (city, month), part in df.groupby(['city', 'month'], sort=True):
+        rel_path = _partition_path(city, month)
+        full_path = os.path.join(store_dir, rel_path)
+        part = part.drop(columns=['city', 'month'])
+        if os.path.exists(full_path):
+            part = pd.concat([pq.ParquetFile(full_path).read().to_pandas(), part], ignore_index=True)
+        part = part.sort_values('sentiment_score', kind='stable').reset_index(drop=True)
+        stats[rel_path] = _partition_entry(part, city, month)
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(part, schema=schema, preserve_index=False), full_path, row_group_size=ROW_GROUP_SIZE)
+        written += 1
+
+    with open(stats_file, 'w') as f:
+        json.dump({'files': stats}, f, indent=4, sort_keys=True)
+    return written
+
+
+_OPS = {
+    '<': lambda lo, hi, v: lo < v, '<=': lambda lo, hi, v: lo <= v,
+    '>': lambda lo, hi, v: hi > v, '>=': lambda lo, hi, v: hi >= v,
+    '==': lambda lo, hi, v: lo <= v <= hi,
+}
+
+
+def _file_may_match(entry, cities, months, filters):
+    """Prunes a file from its partition values and min/max statistics alone."""
+    if cities is not None and entry['city'] not in cities:
+        return False
+    if months is not None and not (months[0] <= entry['month'] <= months[1]):
+        return False
+    for col, op, value in filters:
+        lo, hi = entry.get(f'{col}_min'), entry.get(f'{col}_max')
+        if op in _OPS and lo is not None and hi is not None and not _OPS[op](lo, hi, value):
+            return False
+    return True
+
+
+def select_files(cities=None, months=None, filters=(), store_dir=STORE_DIR):
+    """Store files that can hold matching rows. `months` is an inclusive ('YYYY-MM', 'YYYY-MM') range."""
+    stats = load_store_stats(os.path.join(store_dir, '_stats.json'))
+    cities = set(cities) if cities is not None else None
+    return [
+        os.path.join(store_dir, rel_path) for rel_path, entry in sorted(stats.items())
+        if _file_may_match(entry, cities, months, filters)
+    ]
+
+
+def load_posts(columns=None, cities=None, months=None, filters=(), store_dir=STORE_DIR):
+    """
+    Reads cleaned posts with the filters pushed down: partitions are pruned by city/month and by
+    per-file min/max statistics, then Parquet row groups are pruned by their own statistics and only
+    `columns` are decoded. `filters` are (column, op, value) tuples with op in <, <=, >, >=, ==, !=, in.
+    Without a store, the flat clean CSV is read and filtered in memory instead.
+    """
+    if not os.path.exists(os.path.join(store_dir, '_stats.json')):
+        return _load_flat(columns, cities, months, filters)
+
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    files = select_files(cities, months, filters, store_dir)
+    matched = bool(files)
+    if not matched:
+        # Nothing can match: read the schema from any one file so callers still get the expected columns
+        files = [os.path.join(store_dir, rel_path) for rel_path in sorted(load_store_stats(os.path.join(store_dir, '_stats.json')))][:1]
+        if not files:
+            return pd.DataFrame(columns=columns or [])
+    dataset = ds.dataset(files, format='parquet', partitioning='hive', partition_base_dir=store_dir)
+    expression = None
+    conditions = list(filters)
+    if cities is not None:
+        conditions.append(('city', 'in', list(cities)))
+    if months is not None:
+        conditions += [('month', '>=', months[0]), ('month', '<=', months[1])]
+    if conditions:
+        expression = pq.filters_to_expression(conditions)
+    table = dataset.to_table(columns=columns, filter=expression)
+    if not matched:
+        table = table.slice(0, 0)
+    df = table.to_pandas()
+    # Hive partitioning has already URI-decoded the partition values; decoding again would alter a literal '%'
+    for col in ('city', 'month'):
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    return df
+
+
+def _load_flat(columns, cities, months, filters):
+    """Compatibility path over the flat clean CSV, with the same filter semantics as load_posts."""
+    df = pd.read_csv(FLAT_FILE)
+    df['month'] = df['date'].astype(str).str[:7]
+    mask = pd.Series(True, index=df.index)
+    if cities is not None:
+        mask &= df['city'].isin(list(cities))
+    if months is not None:
+        mask &= df['month'].between(*months)
+    ops = {'<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge', '==': 'eq', '!=': 'ne'}
+    for col, op, value in filters:
+        mask &= df[col].isin(value) if op == 'in' else getattr(df[col], ops[op])(value)
+    df = df[mask].reset_index(drop=True)
+    return df[columns] if columns is not None else df
@@ -0,0 +1,101 @@
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# --- Configuration ---
+RAW_DIR = 'data/raw'
+MANIFEST_FILE = 'data/raw_manifest.json'
+CLEAN_STORE_DIR = 'data/clean'
+
+
+def resolve_sources(spec):
+    """Expands a raw-input spec (a CSV file, a directory of CSVs or a glob) into sorted file paths."""
+    if os.path.isdir(spec):
+        paths = glob.glob(os.path.join(spec, '**', '*.csv'), recursive=True)
+    elif any(ch in spec for ch in '*?['):
+        paths = glob.glob(spec, recursive=True)
+    else:
+        paths = [spec] if os.path.exists(spec) else []
+    return sorted(os.path.normpath(p) for p in paths)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(path):
+    """Stable, filesystem-safe id for a raw file; names its partition in the clean store."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{hashlib.sha1(os.path.normpath(path).encode()).hexdigest()[:8]}"
+
+
+def _overlaps(entry, date_range):
+    start, end = date_range
+    if entry.get('min_date') is None or entry.get('max_date') is None:
+        return False
+    return entry['min_date'] <= end and entry['max_date'] >= start
+
+
+class RawManifest:
+    """
+    Record of every processed raw file: size, mtime, SHA-256, row counts, post-date range, the
+    cleaning-rules version it was processed under and its clean-store partition.
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.files = json.load(f).get('files', {})
+
+    def pending(self, sources, rules_version, force=False, date_range=None):
+        """
+        Returns the sources that need (re)processing: new files, files whose content changed, files
+        processed under other cleaning rules, and with `date_range` (ISO start, end) every file whose
+        posts overlap it. Files whose mtime changed but whose hash did not are only re-stamped.
+        """
+        pending = []
+        for path in sources:
+            entry = self.files.get(path)
+            if force or entry is None or entry.get('rules_version') != rules_version:
+                pending.append(path)
+                continue
+            if date_range and _overlaps(entry, date_range):
+                pending.append(path)
+                continue
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) == (entry['size'], entry['mtime_ns']):
+                continue
+            if stat.st_size == entry['size'] and file_sha256(path) == entry['sha256']:
+                entry['mtime_ns'] = stat.st_mtime_ns
+                continue
+            pending.append(path)
+        return pending
+
+    def record(self, path, rules_version, partition_file, stats):
+        """Stores the fingerprint and processing stats of one successfully processed file."""
+        stat = os.stat(path)
+        self.files[path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(path),
+            'rules_version': rules_version,
+            'partition': partition_file,
+            'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            **stats,
+        }
+
+    def partitions(self):
+        return [entry['partition'] for entry in self.files.values() if os.path.exists(entry['partition'])]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({'files': self.files}, f, indent=4, sort_keys=True)
@@ -2,6 +2,7 @@ import requests
 import pandas as pd
 from bs4 import BeautifulSoup 
 import os 
+from entity_resolution import resolve_entities
 
 def fetch_osm_attractions():
     """Fetches attractions from OpenStreetMap using the Overpass API, covering Madhya Pradesh."""
@@ -97,8 +98,11 @@ def fetch_all_attractions():
         print("\nNo attractions data was successfully fetched from any source.")
         return
 
-    # Clean and deduplicate by name
-    df = all_attractions_df.drop_duplicates(subset=["name"])
+    # Resolve spelling variants across sources (e.g. "Upper Lake (Bhojtal)" vs "Upper Lake") and keep
+    # one row per canonical place, preferring rows that carry coordinates
+    resolved = resolve_entities(all_attractions_df, name_col="name", city_col="city")
+    resolved = resolved.sort_values(by="latitude", key=lambda lat: lat.isna(), kind="stable")
+    df = resolved.drop_duplicates(subset=["place_id"]).drop(columns=["canonical_name"])
     
     # Ensure the directory exists before saving (assuming 'data' directory structure)
     os.makedirs(os.path.dirname("data/attractions_raw.csv"), exist_ok=True)
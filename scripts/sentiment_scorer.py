@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from text_normalizer import HINGLISH_LEXICON
+
+# --- Configuration ---
+REPORT_FILE = 'data/sentiment_agreement.json'
+BATCH_SIZE = 100_000           # posts per vectorized batch (and per worker task)
+NEGATION_WINDOW = 3            # a negator flips valence words up to this many tokens later
+NEGATION_SCALAR = -0.74        # VADER's damped flip: "not good" is milder than "bad"
+BUT_BEFORE, BUT_AFTER = 0.5, 1.5   # "X but Y": the clause after 'but' dominates
+EXCLAMATION_BOOST = 0.292      # per '!' (up to 4), added in the direction of the post's sentiment
+COMPOUND_ALPHA = 15            # normalisation constant of the compound score
+LABEL_THRESHOLD = 0.05         # |compound| below this is neutral
+TOP_DISAGREEMENTS = 25
+
+# --- Lexicon ---
+# Valences on VADER's -4..+4 scale, tuned for travel posts. Scoring runs on the raw text because the
+# cleaner's stopword filter removes exactly the words this needs (not, no, very, too, but, nahi, bahut).
+VALENCE = {
+    # positive
+    'good': 1.9, 'great': 3.1, 'excellent': 3.2, 'amazing': 2.8, 'awesome': 3.1, 'beautiful': 2.9,
+    'stunning': 3.0, 'breathtaking': 3.0, 'peaceful': 2.2, 'serene': 2.3, 'gem': 2.2, 'recommend': 1.8,
+    'recommended': 1.8, 'love': 3.2, 'loved': 2.9, 'lovely': 2.8, 'wonderful': 2.7, 'fantastic': 2.6,
+    'nice': 1.8, 'clean': 1.7, 'worth': 1.4, 'enjoyed': 2.1, 'enjoy': 2.2, 'fun': 2.3, 'happy': 2.7,
+    'decent': 1.2, 'okay': 0.9, 'ok': 0.9, 'fine': 0.8, 'majestic': 2.6, 'magnificent': 2.9,
+    'spectacular': 2.8, 'impressive': 2.1, 'pleasant': 2.0, 'friendly': 2.2, 'helpful': 1.9,
+    'best': 3.2, 'perfect': 2.7, 'calm': 1.3, 'cheap': 0.6, 'extraordinary': 2.2, 'divine': 2.4,
+    'mustvisit': 2.2, 'wow': 2.8,
+    # negative
+    'bad': -2.5, 'poor': -2.1, 'terrible': -2.1, 'horrible': -2.5, 'awful': -2.0, 'worst': -3.1,
+    'dirty': -1.9, 'dirt': -1.4, 'garbage': -1.9, 'trash': -1.8, 'litter': -1.5, 'filthy': -2.4,
+    'smell': -1.0, 'stink': -2.1, 'crowded': -1.3, 'chaotic': -1.6, 'overhyped': -1.8, 'neglected': -2.4,
+    'disappointed': -1.9, 'disappointing': -2.2, 'disappointment': -2.3, 'boring': -1.3, 'waste': -1.8,
+    'expensive': -1.0, 'overpriced': -1.9, 'pushy': -1.6, 'rude': -2.0, 'unsafe': -2.4, 'scam': -2.6,
+    'broken': -1.8, 'commercialization': -0.8, 'killing': -2.5, 'mess': -1.5, 'noisy': -1.4,
+    'avoid': -1.2, 'unclean': -2.0, 'unhygienic': -2.4, 'problem': -1.7, 'worse': -2.1, 'hate': -2.7,
+    # emoji
+    '😍': 2.9, '👍': 1.9, '😊': 2.2, '❤': 2.8, '😞': -2.2, '🙄': -1.2, '😡': -2.8, '👎': -1.9, '🤮': -2.8,
+}
+# Hinglish slang inherits the valence of its English translation in the shared normaliser lexicon
+VALENCE.update({slang: VALENCE[english] for slang, english in HINGLISH_LEXICON.items() if english in VALENCE})
+VALENCE.update({'bakwas': -2.3, 'faltu': -1.8, 'kharab': -2.1, 'bura': -2.0, 'ghatiya': -2.6, 'shaandaar': 3.0})
+
+NEGATORS = {
+    'not', 'no', 'never', 'nothing', 'none', 'nobody', 'nowhere', 'neither', 'nor', 'without', 'hardly',
+    "don't", 'dont', "doesn't", 'doesnt', "didn't", 'didnt', "isn't", 'isnt', "wasn't", 'wasnt',
+    "aren't", 'arent', "weren't", "won't", 'wont', "can't", 'cant', 'cannot', "couldn't", "shouldn't",
+    'nahi', 'nahin', 'nai', 'na', 'mat', 'bina',
+}
+# Hindi usually puts the negator after the word it negates ("accha nahi tha"), so these also look one token back
+POSTPOSED_NEGATORS = {'nahi', 'nahin', 'nai'}
+# Intensifiers (+) and dampeners (-), added to the next valence word in its own direction
+BOOSTERS = {
+    'very': 0.293, 'extremely': 0.293, 'absolutely': 0.293, 'highly': 0.293, 'really': 0.293, 'so': 0.293,
+    'totally': 0.293, 'completely': 0.293, 'super': 0.293, 'incredibly': 0.293, 'too': 0.293, 'most': 0.293,
+    'bahut': 0.293, 'bohot': 0.293, 'bahot': 0.293, 'ekdum': 0.293, 'bilkul': 0.293, 'zyada': 0.293, 'ati': 0.293,
+    'slightly': -0.293, 'somewhat': -0.293, 'kinda': -0.293, 'fairly': -0.293, 'barely': -0.293, 'thoda': -0.293,
+}
+CONTRASTS = {'but', 'however', 'lekin', 'par', 'magar'}
+
+TOKEN_PATTERN = r"[a-z]+(?:'[a-z]+)?|[☀-➿\U0001f300-\U0001faff]"
+
+# Token -> id lookup tables, built once per process (workers inherit them on import)
+VOCABULARY = pd.Index(sorted(set(VALENCE) | NEGATORS | set(BOOSTERS) | CONTRASTS))
+_VALENCE = VOCABULARY.map(lambda w: VALENCE.get(w, 0.0)).to_numpy(dtype=float)
+_IS_NEGATOR = VOCABULARY.isin(NEGATORS)
+_IS_POSTPOSED_NEGATOR = VOCABULARY.isin(POSTPOSED_NEGATORS)
+_BOOST = VOCABULARY.map(lambda w: BOOSTERS.get(w, 0.0)).to_numpy(dtype=float)
+_IS_CONTRAST = VOCABULARY.isin(CONTRASTS)
+
+
+def _lookup(table, codes, fill):
+    """table[codes] with `fill` for out-of-vocabulary tokens (code -1)."""
+    return np.where(codes >= 0, table[np.maximum(codes, 0)], fill)
+
+
+def score_batch(texts):
+    """
+    Lexicon compound score of every post in `texts`, computed on one flat token stream.
+
+    Posts are tokenized and exploded into a single array of vocabulary codes with a post id per
+    token; negation, boosters and 'but' weighting are applied with shifted-array comparisons
+    (a shift only counts within the same post) and scores are summed per post with bincount.
+    Returns compound scores in [-1, 1].
+    """
+    texts = pd.Series(np.asarray(texts, dtype=object)).fillna('').astype(str).str.lower()
+    n = len(texts)
+    tokens = texts.str.findall(TOKEN_PATTERN).explode().dropna()
+    if tokens.empty:
+        return np.zeros(n)
+    doc = tokens.index.to_numpy(dtype=np.int64)
+    codes = VOCABULARY.get_indexer(tokens.to_numpy())
+
+    valence = _lookup(_VALENCE, codes, 0.0)
+    negator = _lookup(_IS_NEGATOR, codes, False)
+    postposed_negator = _lookup(_IS_POSTPOSED_NEGATOR, codes, False)
+    boost = _lookup(_BOOST, codes, 0.0)
+    contrast = _lookup(_IS_CONTRAST, codes, False)
+
+    # Negation and boosters look back at the previous NEGATION_WINDOW tokens of the same post
+    negated = np.zeros(len(codes), dtype=bool)
+    boosted = np.zeros(len(codes))
+    for k in range(1, NEGATION_WINDOW + 1):
+        same_post = np.zeros(len(codes), dtype=bool)
+        same_post[k:] = doc[k:] == doc[:-k]
+        negated[k:] |= same_post[k:] & negator[:-k]
+        boosted[k:] += np.where(same_post[k:], boost[:-k], 0.0) * (1 - 0.05 * (k - 1))
+    negated[:-1] |= (doc[:-1] == doc[1:]) & postposed_negator[1:]
+    valence = np.where(valence != 0, valence + np.sign(valence) * boosted, 0.0)
+    valence = np.where(negated, valence * NEGATION_SCALAR, valence)
+
+    # 'but' weighting: tokens before the first contrast word of a post are damped, later ones stressed
+    post_start = np.r_[0, np.flatnonzero(np.diff(doc)) + 1]
+    contrasts_so_far = np.cumsum(contrast)
+    contrasts_so_far -= np.repeat(contrasts_so_far[post_start] - contrast[post_start], np.diff(np.r_[post_start, len(doc)]))
+    has_contrast = np.bincount(doc, weights=contrast, minlength=n)[doc] > 0
+    weight = np.where(has_contrast, np.where(contrasts_so_far > 0, BUT_AFTER, BUT_BEFORE), 1.0)
+
+    total = np.bincount(doc, weights=valence * weight, minlength=n)
+    exclamations = np.minimum(texts.str.count('!').to_numpy(), 4) * EXCLAMATION_BOOST
+    total = total + np.sign(total) * exclamations
+    return total / np.sqrt(total * total + COMPOUND_ALPHA)
+
+
+def compound_to_score(compound):
+    """Maps compound scores to the [0, 1] scale of `sentiment_score`."""
+    return np.round((np.asarray(compound) + 1) / 2, 3)
+
+
+def compound_to_label(compound):
+    compound = np.asarray(compound)
+    return np.where(compound >= LABEL_THRESHOLD, 'positive', np.where(compound <= -LABEL_THRESHOLD, 'negative', 'neutral'))
+
+
+def score_texts(texts, workers=1, batch_size=BATCH_SIZE):
+    """Compound scores for any number of posts: BATCH_SIZE batches, spread over worker processes when workers > 1."""
+    texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+    batches = [texts.iloc[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    if not batches:
+        return np.array([])
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return np.concatenate(list(pool.map(score_batch, batches)))
+    return np.concatenate([score_batch(batch) for batch in batches])
+
+
+def add_lexicon_scores(df, text_column='text', workers=1):
+    """Adds `lexicon_score` ([0, 1], same scale as sentiment_score) and `lexicon_label` next to the source score."""
+    compound = score_texts(df[text_column], workers=workers)
+    return df.assign(lexicon_score=compound_to_score(compound), lexicon_label=compound_to_label(compound))
+
+
+def agreement_report(df):
+    """Compares the lexicon output with the source score and label."""
+    scored = df.dropna(subset=['sentiment_score'])
+    label_match = scored['lexicon_label'] == scored['sentiment']
+    # The source's own consistency: does its score fall on the side its label claims?
+    source_side = np.where(scored['sentiment_score'] >= 0.55, 'positive', np.where(scored['sentiment_score'] <= 0.45, 'negative', 'neutral'))
+    diff = (scored['lexicon_score'] - scored['sentiment_score']).abs()
+    disagreements = scored.assign(score_gap=diff.round(3)).sort_values('score_gap', ascending=False)
+
+    report = {
+        'posts': int(len(df)),
+        'posts_with_source_score': int(len(scored)),
+        'label_agreement': round(float(label_match.mean()), 4) if len(scored) else None,
+        'source_score_label_consistency': round(float((source_side == scored['sentiment']).mean()), 4) if len(scored) else None,
+        'pearson': round(float(scored['lexicon_score'].corr(scored['sentiment_score'])), 4) if len(scored) > 1 else None,
+        'spearman': round(float(scored['lexicon_score'].corr(scored['sentiment_score'], method='spearman')), 4) if len(scored) > 1 else None,
+        'mean_absolute_difference': round(float(diff.mean()), 4) if len(scored) else None,
+        'confusion': pd.crosstab(scored['sentiment'], scored['lexicon_label']).to_dict('index'),
+        'top_disagreements': disagreements[
+            ['id', 'text', 'sentiment', 'sentiment_score', 'lexicon_label', 'lexicon_score', 'score_gap']
+        ].head(TOP_DISAGREEMENTS).to_dict('records'),
+    }
+    if 'platform' in scored.columns:
+        report['label_agreement_by_platform'] = label_match.groupby(scored['platform']).mean().round(4).to_dict()
+    return report
+
+# --- Main Execution Block ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score clean posts with the local sentiment lexicon and report agreement.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (one BATCH_SIZE batch each).")
+    args = parser.parse_args()
+
+    from post_store import load_posts
+    df = load_posts(columns=['id', 'platform', 'text', 'sentiment', 'sentiment_score'])
+    print(f"Loaded {len(df):,} clean posts.")
+
+    started = time.perf_counter()
+    df = add_lexicon_scores(df, workers=args.workers)
+    seconds = time.perf_counter() - started
+    throughput = len(df) / seconds * 60 if seconds else 0.0
+    print(f"Scored {len(df):,} posts in {seconds:.2f}s ({throughput:,.0f} posts/min, {args.workers} worker(s)).")
+
+    report = {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'posts_per_minute': round(throughput),
+        **agreement_report(df),
+    }
+    os.makedirs(os.path.dirname(REPORT_FILE), exist_ok=True)
+    with open(REPORT_FILE, 'w') as f:
+        json.dump(report, f, indent=4, default=str)
+
+    print(f"Label agreement with the source: {report['label_agreement']:.1%} | "
+          f"Source score/label consistency: {report['source_score_label_consistency']:.1%}")
+    print(f"[SUCCESS] Agreement report saved to {REPORT_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import numpy as np
+import pandas as pd
+import base64
+
+# --- Sketch Configuration ---
+HLL_PRECISION = 12            # 4096 registers, ~1.6% standard error
+KEYED_HLL_PRECISION = 10      # per-city/per-place counters: 1 KB each, ~3.3% standard error
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+HEAVY_HITTER_CAPACITY = 64    # candidate keys tracked alongside the Count-Min table
+TDIGEST_COMPRESSION = 100
+
+# pd.util.hash_array takes a 16-character key; one per independent hash function
+_HASH_KEYS = ['touriscope-hll-0', 'touriscope-cms-0', 'touriscope-cms-1', 'touriscope-cms-2',
+              'touriscope-cms-3', 'touriscope-cms-4', 'touriscope-cms-5', 'touriscope-cms-6']
+
+
+def hash_values(values, seed=0):
+    """Vectorized 64-bit hashes of an array of keys (strings or numbers)."""
+    return pd.util.hash_array(np.asarray(values, dtype=object), hash_key=_HASH_KEYS[seed], categorize=True)
+
+
+def _encode(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def _decode(text, dtype, shape=None):
+    array = np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+    return array.reshape(shape) if shape is not None else array
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter. `add` takes a whole array of keys; registers are updated with
+    np.maximum.at, so a batch costs one hashing pass. Two sketches merge by element-wise max.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        if len(values) == 0:
+            return self
+        hashes = hash_values(values, seed=0)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remainder = (hashes << np.uint64(self.precision)) | np.uint64((1 << self.precision) - 1)
+        # Rank = leading zeros of the remaining bits + 1 (the OR'd low bits bound it at 64 - p + 1)
+        rank = (64 - np.floor(np.log2(remainder.astype(np.float64))).astype(np.int64)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+    def to_dict(self):
+        return {'type': 'hll', 'precision': self.precision, 'registers': _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['precision'])
+        sketch.registers = _decode(data['registers'], np.uint8)
+        return sketch
+
+
+class CountMinSketch:
+    """
+    Count-Min frequency sketch with a bounded heavy-hitter candidate set. Counts are over-estimates
+    by at most ~e/width of the stream total with high probability. Merge = table sum.
+    """
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, capacity=HEAVY_HITTER_CAPACITY):
+        self.width, self.depth, self.capacity = width, depth, capacity
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.candidates = {}
+
+    def _columns(self, keys):
+        return np.stack([(hash_values(keys, seed=1 + row) % np.uint64(self.width)).astype(np.int64)
+                         for row in range(self.depth)])
+
+    def add(self, values, weights=None):
+        if len(values) == 0:
+            return self
+        # Pre-aggregate the batch so each distinct key is hashed once
+        counts = pd.Series(1 if weights is None else weights, index=pd.Index(values)).groupby(level=0).sum()
+        keys, amounts = counts.index.to_numpy(dtype=object), counts.to_numpy(dtype=np.int64)
+        columns = self._columns(keys)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], amounts)
+        self.total += int(amounts.sum())
+        self._refresh_candidates(keys, columns)
+        return self
+
+    def _refresh_candidates(self, keys, columns=None):
+        if columns is None:
+            columns = self._columns(keys)
+        estimates = self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+        merged = dict(self.candidates)
+        merged.update(zip(keys.tolist(), estimates.tolist()))
+        if len(merged) > self.capacity:
+            merged = dict(sorted(merged.items(), key=lambda item: item[1], reverse=True)[:self.capacity])
+        self.candidates = merged
+
+    def estimate(self, values):
+        keys = np.asarray(values, dtype=object)
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other):
+        self.table += other.table
+        self.total += other.total
+        keys = np.array(list(set(self.candidates) | set(other.candidates)), dtype=object)
+        self.candidates = {}
+        if len(keys):
+            self._refresh_candidates(keys)
+        return self
+
+    def heavy_hitters(self, k=10):
+        """Top-k keys by estimated count (re-estimated against the current table)."""
+        if not self.candidates:
+            return {}
+        keys = np.array(list(self.candidates), dtype=object)
+        estimates = self.estimate(keys)
+        order = np.argsort(-estimates, kind='stable')[:k]
+        return {keys[i]: int(estimates[i]) for i in order}
+
+    def to_dict(self):
+        return {
+            'type': 'cms', 'width': self.width, 'depth': self.depth, 'capacity': self.capacity,
+            'total': self.total, 'table': _encode(self.table), 'candidates': self.candidates,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['width'], data['depth'], data['capacity'])
+        sketch.table = _decode(data['table'], np.int64, (data['depth'], data['width']))
+        sketch.total = data['total']
+        sketch.candidates = dict(data['candidates'])
+        return sketch
+
+
+class TDigest:
+    """
+    Merging t-digest for streaming quantiles. Batches are sorted and compressed with the k1 scale
+    function, so memory stays O(compression) regardless of stream length. Merge = re-compress.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values):
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # k1 scale: k(q) = δ/(2π)·asin(2q − 1); a centroid may span at most one unit of k
+        q_right = np.cumsum(weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q_right - 1, -1, 1))
+        groups = np.floor(k - k[0]).astype(np.int64)
+        _, starts = np.unique(groups, return_index=True)
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def merge(self, other):
+        if len(other.means):
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        if not len(self.means):
+            return None
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), cumulative, self.means))
+
+    def count(self):
+        return int(self.weights.sum())
+
+    def to_dict(self):
+        return {'type': 'tdigest', 'compression': self.compression,
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['compression'])
+        sketch.means = np.asarray(data['means'], dtype=np.float64)
+        sketch.weights = np.asarray(data['weights'], dtype=np.float64)
+        return sketch
+
+
+SKETCH_TYPES = {'hll': HyperLogLog, 'cms': CountMinSketch, 'tdigest': TDigest}
+
+
+def sketch_from_dict(data):
+    return SKETCH_TYPES[data['type']].from_dict(data)
+
+
+class StreamingMetrics:
+    """
+    Fixed-memory reach and engagement metrics over an unbounded post stream:
+    distinct authors overall, per city and per place (HyperLogLog), top discussed places and
+    tags (Count-Min + heavy hitters), and sentiment-score percentiles (t-digest).
+    Instances are serialisable (to_dict/from_dict) and mergeable across batches and workers.
+    """
+
+    def __init__(self):
+        self.posts = 0
+        self.authors = HyperLogLog()
+        self.authors_by_city = {}
+        self.authors_by_place = {}
+        self.places = CountMinSketch()
+        self.tags = CountMinSketch()
+        self.sentiment = TDigest()
+        self.sources = {}       # input file -> {'bytes', 'sha1', 'rows'} already folded in
+
+    def update(self, batch):
+        """Folds one DataFrame batch of posts (username, city, place/place_id, tags, sentiment_score) in."""
+        self.posts += len(batch)
+        self.authors.add(batch['username'].to_numpy(dtype=object))
+
+        place_col = 'place_id' if 'place_id' in batch.columns else 'place_name'
+        for key_col, target in (('city', self.authors_by_city), (place_col, self.authors_by_place)):
+            for key, authors in batch.groupby(key_col, sort=False)['username']:
+                target.setdefault(key, HyperLogLog(KEYED_HLL_PRECISION)).add(authors.to_numpy(dtype=object))
+
+        places = batch.loc[batch[place_col] != 'MISSING_PLACE', place_col]
+        self.places.add(places.to_numpy(dtype=object))
+
+        if 'tags' in batch.columns:
+            tags = (batch['tags'].dropna().astype(str).str.lower()
+                    .str.replace(',', ' ', regex=False).str.split().explode())
+            tags = tags[tags.str.startswith('#') & (tags.str.len() > 1)]
+            self.tags.add(tags.to_numpy(dtype=object))
+
+        self.sentiment.add(batch['sentiment_score'].to_numpy(dtype=np.float64))
+        return self
+
+    def merge(self, other):
+        self.posts += other.posts
+        self.authors.merge(other.authors)
+        for mine, theirs in ((self.authors_by_city, other.authors_by_city),
+                             (self.authors_by_place, other.authors_by_place)):
+            for key, sketch in theirs.items():
+                if key in mine:
+                    mine[key].merge(sketch)
+                else:
+                    mine[key] = HyperLogLog.from_dict(sketch.to_dict())
+        self.places.merge(other.places)
+        self.tags.merge(other.tags)
+        self.sentiment.merge(other.sentiment)
+        self.sources.update(other.sources)
+        return self
+
+    def summary(self, top_k=10):
+        """Plain-JSON metrics derived from the sketches."""
+        return {
+            'total_posts': self.posts,
+            'distinct_authors': self.authors.count(),
+            'distinct_authors_by_city': {k: v.count() for k, v in sorted(self.authors_by_city.items())},
+            'distinct_authors_by_place': {k: v.count() for k, v in sorted(self.authors_by_place.items())},
+            'top_places': self.places.heavy_hitters(top_k),
+            'top_tags': self.tags.heavy_hitters(top_k),
+            'sentiment_percentiles': {
+                f"p{int(q * 100)}": self.sentiment.quantile(q) for q in (0.05, 0.25, 0.5, 0.75, 0.95)
+            },
+        }
+
+    def to_dict(self):
+        return {
+            'posts': self.posts,
+            'authors': self.authors.to_dict(),
+            'authors_by_city': {k: v.to_dict() for k, v in self.authors_by_city.items()},
+            'authors_by_place': {k: v.to_dict() for k, v in self.authors_by_place.items()},
+            'places': self.places.to_dict(),
+            'tags': self.tags.to_dict(),
+            'sentiment': self.sentiment.to_dict(),
+            'sources': self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls()
+        metrics.posts = data['posts']
+        metrics.authors = HyperLogLog.from_dict(data['authors'])
+        metrics.authors_by_city = {k: HyperLogLog.from_dict(v) for k, v in data['authors_by_city'].items()}
+        metrics.authors_by_place = {k: HyperLogLog.from_dict(v) for k, v in data['authors_by_place'].items()}
+        metrics.places = CountMinSketch.from_dict(data['places'])
+        metrics.tags = CountMinSketch.from_dict(data['tags'])
+        metrics.sentiment = TDigest.from_dict(data['sentiment'])
+        metrics.sources = data.get('sources', {})
+        return metrics
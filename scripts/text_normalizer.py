@@ -0,0 +1,221 @@
+import pandas as pd
+import math
+import re
+import os
+from collections import Counter
+from functools import lru_cache
+
+# --- Configuration ---
+CLEAN_FILE = 'turiscope_mp_tourism_clean_data.csv'
+SEGMENT_CACHE_SIZE = 100_000   # distinct hashtags remembered by the LRU memo
+MAX_WORD_LENGTH = 20           # longest dictionary word the segmenter will try
+SEED_WORD_COUNT = 50           # pseudo-count given to every seed word
+
+# --- Segmentation Vocabulary ---
+# General hashtag vocabulary; GAZETTEER adds the place names
+SEED_WORDS = """
+    visit visited travel traveller tourism tourist tour trip tips explore discover incredible india indian
+    heart of in the and madhya pradesh mp must see highly recommend heritage history nature wildlife
+    wanderlust paradise amazing beautiful breathtaking stunning peaceful serene hidden gem overrated
+    disappointed disappointing need improvement trap crowded dirty poor maintenance worth weekend getaway
+    national park temple fort palace lake museum caves falls ghat tiger safari reserve sanctuary
+    monsoon sunset sunrise photography food street spiritual pilgrimage culture architecture
+""".split()
+
+# Cities and attractions of MP. With SEED_WORDS this is the whole vocabulary the cleaner segments with:
+# it never comes from the batch being cleaned, so a text segments the same way in every file and worker
+GAZETTEER = [
+    'Madhya Pradesh', 'Bhopal', 'Gwalior', 'Indore', 'Jabalpur', 'Khajuraho', 'Mandu', 'Omkareshwar',
+    'Orchha', 'Pachmarhi', 'Sanchi', 'Ujjain', 'Bhedaghat', 'Kanha National Park', 'Pench National Park',
+    'Panna National Park', 'Satpura National Park', 'Van Vihar National Park',
+    '24 Avatars', 'Apsara Vihar', 'Archaeological Museum', 'Ashoka Pillar', 'Bamni Dadar Sunset Point',
+    'Baz Bahadur Palace', 'Bee Falls', 'Betwa River', 'Bharat Bhavan', 'Bird Watching', 'Buddhist Vihara',
+    'Buffer Zone', 'Chaturbhuj Temple', 'Chauragarh Temple', 'Chausath Yogini Temple', 'Core Zone',
+    'Dhoopgarh', 'Dhuandhar Falls', 'Gohar Mahal', 'Gopachal Parvat', 'Great Bowl', 'Gwalior Fort',
+    'Harsiddhi Temple', 'Hindola Mahal', 'Hoshang Shah Tomb', 'Jahaz Mahal', 'Jai Vilas Palace', 'Jami Masjid',
+    'Jata Shankar', 'Jehangir Mahal', 'Jungle Safari', 'Kajal Rani Cave', 'Kal Bhairav Temple',
+    'Kandariya Mahadev Temple', 'Kanha Museum', 'Khajrana Ganesh Temple', 'Lakshmana Temple', 'Lal Bagh Palace',
+    'Light and Sound Show', 'Lower Lake', 'Madan Mahal Fort', 'Mahakaleshwar Temple', 'Marble Rocks',
+    'Mowgli Land', 'Narmada Parikrama', 'Nature Trails', 'Omkareshwar Temple', 'Orchha Fort Complex',
+    'Pandav Caves', 'Patalpani Waterfall', 'Raj Mahal', 'Rajwada Palace', 'Ralamandal Wildlife Sanctuary',
+    'Ram Ghat', 'Ram Raja Temple', 'Rani Durgavati Museum', 'Rani Roopmati Pavilion', 'Sanchi Stupa',
+    'Sandipani Ashram', 'Sarafa Bazaar', 'Sas Bahu Temple', 'Siddhanath Temple', 'Sun Temple', 'Taj-ul-Masajid',
+    'Tansen Tomb', 'Tiger Reserve', 'Tiger Safari', 'Tribal Museum', 'Upper Lake', 'Vedh Shala Observatory',
+    'Vishvanatha Temple', 'Western Group Temples',
+]
+
+# Fixed splits that always win over the segmenter (hashtags or run-together words)
+SPLIT_PHRASES = {
+    'mustvisit': 'must visit',
+    'highlyrecommend': 'highly recommend',
+    'traveltips': 'travel tips',
+    'exploremp': 'explore mp',
+}
+
+# --- Hinglish Lexicon ---
+# Romanised Hindi seen in posts, with spelling variants. Fillers and auxiliaries map to '' and are
+# dropped; sentiment-bearing words map to an English equivalent so they survive into the text features.
+HINGLISH_LEXICON = {
+    # fillers, auxiliaries, particles
+    'tha': '', 'thi': '', 'hai': '', 'hain': '', 'ho': '', 'gaya': '', 'gayi': '', 'gaye': '',
+    'bhi': '', 'kya': '', 'toh': '', 'hi': '', 'ka': '', 'ki': '', 'ke': '', 'mein': '', 'yaar': '',
+    'ekdum': '', 'bahut': '', 'bohot': '', 'bahot': '', 'nahi': '', 'nahin': '', 'thak': '', 'thaak': '',
+    # sentiment-bearing
+    'mast': 'awesome', 'zabardast': 'awesome', 'jhakaas': 'awesome',
+    'badhiya': 'great', 'badiya': 'great', 'shandar': 'excellent', 'shaandar': 'excellent',
+    'accha': 'good', 'acha': 'good', 'achha': 'good', 'sundar': 'beautiful', 'khoobsurat': 'beautiful',
+    'thik': 'okay', 'theek': 'okay',
+    'maja': 'fun', 'maza': 'fun', 'mazaa': 'fun', 'majja': 'fun',
+    'bekar': 'bad', 'bekaar': 'bad', 'ganda': 'dirty', 'gandagi': 'dirt', 'bheed': 'crowded', 'bhid': 'crowded',
+    'mehenga': 'expensive', 'mehnga': 'expensive', 'sasta': 'cheap',
+}
+
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+CAMEL_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+WORD_PATTERN = re.compile(r'[a-z]+')
+TAG_SEPARATORS = re.compile(r'[#,\s]+')
+
+
+def build_vocabulary(texts, extra_phrases=()):
+    """
+    Word frequencies for the segmenter: every alphabetic word in `texts` (hashtags excluded, so
+    concatenations like 'mustvisit' never become dictionary words), plus `extra_phrases` such as
+    place and city names, plus SEED_WORDS. Single letters are left out to avoid 'a'-splits.
+    """
+    texts = pd.Series(texts, dtype=object).dropna().astype(str).str.lower()
+    words = texts.str.replace(HASHTAG_PATTERN, ' ', regex=True).str.findall(WORD_PATTERN).explode()
+    vocabulary = Counter(words.dropna().tolist())
+    for phrase in extra_phrases:
+        if isinstance(phrase, str):
+            vocabulary.update(WORD_PATTERN.findall(phrase.lower()))
+    for word in SEED_WORDS:
+        vocabulary[word] += SEED_WORD_COUNT
+    return Counter({w: c for w, c in vocabulary.items() if len(w) > 1})
+
+
+class TextNormalizer:
+    """
+    Hashtag segmentation and Hinglish normalisation for posts.
+
+    Concatenated hashtags are split with a unigram dynamic-programming segmenter (minimum total
+    -log P(word)). Results are memoised in a bounded LRU cache per distinct hashtag, so a tag that
+    recurs across millions of posts is segmented once.
+    """
+
+    def __init__(self, vocabulary, cache_size=SEGMENT_CACHE_SIZE):
+        self.vocabulary = vocabulary
+        total = sum(vocabulary.values()) or 1
+        self._log_total = math.log(total)
+        self._costs = {w: self._log_total - math.log(c) for w, c in vocabulary.items()}
+        self.segment = lru_cache(maxsize=cache_size)(self._segment)
+        self.normalize_tags = lru_cache(maxsize=cache_size)(self._normalize_tags)
+
+    @classmethod
+    def from_corpus(cls, texts, extra_phrases=(), cache_size=SEGMENT_CACHE_SIZE):
+        return cls(build_vocabulary(texts, extra_phrases), cache_size=cache_size)
+
+    @classmethod
+    def from_gazetteer(cls, cache_size=SEGMENT_CACHE_SIZE):
+        """Segmenter over SEED_WORDS and GAZETTEER only: results do not depend on the batch being cleaned."""
+        return cls(build_vocabulary((), GAZETTEER), cache_size=cache_size)
+
+    def _word_cost(self, word):
+        cost = self._costs.get(word)
+        if cost is not None:
+            return cost
+        # Unknown words: probability falls by 10x per character, so long unknown runs stay whole
+        # rather than shattering into short dictionary words
+        return self._log_total + (len(word) - 1) * math.log(10)
+
+    def _segment(self, word):
+        """Best split of one lowercase alphabetic run, as a tuple of words."""
+        if word in SPLIT_PHRASES:
+            return tuple(SPLIT_PHRASES[word].split())
+        if word in self._costs or len(word) <= 2:
+            return (word,)
+        n = len(word)
+        best = [0.0] + [math.inf] * n
+        split_at = [0] * (n + 1)
+        for end in range(1, n + 1):
+            for start in range(max(0, end - MAX_WORD_LENGTH), end):
+                cost = best[start] + self._word_cost(word[start:end])
+                if cost < best[end]:
+                    best[end], split_at[end] = cost, start
+        words, end = [], n
+        while end > 0:
+            words.append(word[split_at[end]:end])
+            end = split_at[end]
+        return tuple(reversed(words))
+
+    def split_hashtag(self, tag):
+        """'HeartOfIndia', 'heartofindia' and 'MPTourism' -> ['heart', 'of', 'india'] / ['mp', 'tourism']."""
+        words = []
+        for piece in CAMEL_PATTERN.findall(tag):
+            piece = piece.lower()
+            words.extend(self.segment(piece) if piece.isalpha() else (piece,))
+        return words
+
+    def normalize_tokens(self, tokens):
+        """Applies SPLIT_PHRASES and HINGLISH_LEXICON to already-lowercased tokens, dropping fillers."""
+        normalized = []
+        for token in tokens:
+            token = SPLIT_PHRASES.get(token, token)
+            token = HINGLISH_LEXICON.get(token, token)
+            if token:
+                normalized.extend(token.split())
+        return normalized
+
+    def expand_hashtags(self, text):
+        """Replaces every '#Tag' in raw text with its segmented words (before lowercasing loses camel case)."""
+        return HASHTAG_PATTERN.sub(lambda m: ' ' + ' '.join(self.split_hashtag(m.group(1))) + ' ', text)
+
+    def _normalize_tags(self, raw_tags):
+        """
+        Parses a raw tags cell ('#VisitMP #PenchNationalPark', 'MadhyaPradesh IndianTourism',
+        '#A, #B') into a tuple of normalised tags, each a space-joined phrase ('visit mp').
+        """
+        if not isinstance(raw_tags, str):
+            return ()
+        tags = []
+        for tag in TAG_SEPARATORS.split(raw_tags):
+            words = self.normalize_tokens(self.split_hashtag(tag)) if tag else []
+            if words:
+                tags.append(' '.join(words))
+        return tuple(dict.fromkeys(tags))
+
+    def normalize_tag_column(self, tags):
+        """Vectorised over distinct cells: returns a Series of '|'-joined normalised tags."""
+        distinct = pd.Series(tags.unique(), dtype=object)
+        lookup = {raw: '|'.join(self.normalize_tags(raw)) for raw in distinct}
+        return tags.map(lookup)
+
+    def cache_stats(self):
+        info = self.segment.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'segment_cache_hits': info.hits,
+            'segment_cache_misses': info.misses,
+            'segment_cache_size': info.currsize,
+            'segment_hit_rate': round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# --- Main Execution Block ---
+
+def main():
+    """Re-parses the tags of the cleaned posts and prints the most common normalised tags."""
+    if not os.path.exists(CLEAN_FILE):
+        print(f"Error: Clean data file not found at {CLEAN_FILE}. Please run data_cleaner.py first.")
+        return
+
+    df = pd.read_csv(CLEAN_FILE)
+    normalizer = TextNormalizer.from_corpus(df['text'], pd.concat([df['place_name'], df['city']]))
+    normalized = normalizer.normalize_tag_column(df['tags'])
+
+    tag_counts = normalized.str.split('|').explode().replace('', pd.NA).dropna().value_counts()
+    print(f"Parsed {len(df)} tag cells into {len(tag_counts)} distinct normalised tags.")
+    print(tag_counts.head(20).to_markdown(numalign="left", stralign="left"))
+    print(f"Segmenter cache: {normalizer.cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+from datetime import datetime
+
+# --- Configuration ---
+INPUT_FILE = 'turiscope_mp_tourism_clean_data.csv'
+OUTPUT_FILE = 'data/trend_alerts.json'
+
+PERIOD = 'M'                 # bucket posts by calendar month
+EWMA_ALPHA = 0.3             # weight of the newest period in the smoothed sentiment
+TREND_THRESHOLD = 0.05       # EWMA vs long-run mean gap needed to call a trend
+Z_ALERT = 2.0                # latest period this many std devs below baseline -> alert
+CUSUM_SLACK = 0.5            # k: per-period drop (in baseline std units) tolerated before CUSUM accumulates
+CUSUM_ALERT = 4.0            # h: accumulated standardized drop that raises an alert
+MIN_POSTS = 5                # entities with fewer posts get no label/alert
+MIN_OBSERVED_PERIODS = 4     # periods with posts needed before a baseline std is trusted
+MIN_STD = 0.1                # floor on the baseline std so near-constant histories don't explode z
+RECENT_PERIODS = 3           # only alert on entities whose latest posts fall in the last N periods
+
+
+def parse_post_dates(dates):
+    """Parses the mixed ISO (2023-09-11) and day-first (13-06-2025) date strings in the raw data."""
+    parsed = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce')
+    fallback = pd.to_datetime(dates[parsed.isna()], format='%d-%m-%Y', errors='coerce')
+    return parsed.fillna(fallback)
+
+
+def build_sentiment_matrix(entity_codes, period_codes, scores, n_entities, n_periods):
+    """
+    Scatters posts into dense (entity x period) sum and count matrices with np.add.at and returns
+    (mean_sentiment, counts); cells without posts are NaN in the mean.
+    """
+    sums = np.zeros((n_entities, n_periods))
+    counts = np.zeros((n_entities, n_periods))
+    np.add.at(sums, (entity_codes, period_codes), scores)
+    np.add.at(counts, (entity_codes, period_codes), 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts, counts
+
+
+def detect_trends(mean, counts, alpha=EWMA_ALPHA):
+    """
+    Runs EWMA, rolling z-score and one-sided (downward, standardized) CUSUM for every entity at once.
+    The only loop is over periods; each step is a vector operation across all entities.
+
+    Returns a dict of per-entity arrays: ewma, baseline, baseline_std, latest, z_score, cusum,
+    long_run_mean, total_posts, n_observed, last_period (index of the latest period with posts).
+    """
+    n_entities, n_periods = mean.shape
+    observed = ~np.isnan(mean)
+    n_observed = observed.sum(axis=1)
+
+    ewma = np.full(n_entities, np.nan)
+    ew_var = np.zeros(n_entities)
+    baseline = np.full(n_entities, np.nan)
+    baseline_std = np.zeros(n_entities)
+    cusum = np.zeros(n_entities)
+    latest = np.full(n_entities, np.nan)
+    last_period = np.full(n_entities, -1)
+
+    for t in range(n_periods):
+        x, seen = mean[:, t], observed[:, t]
+        started = seen & ~np.isnan(ewma)
+        first = seen & np.isnan(ewma)
+
+        # Baseline is the state *before* this period, so the latest point is scored against history
+        baseline = np.where(seen, ewma, baseline)
+        baseline_std = np.where(seen, np.sqrt(ew_var), baseline_std)
+
+        deviation = np.where(started, x - ewma, 0.0)
+        standardized = deviation / np.maximum(np.sqrt(ew_var), MIN_STD)
+        cusum = np.where(started, np.maximum(0.0, cusum - standardized - CUSUM_SLACK), cusum)
+        ew_var = np.where(started, (1 - alpha) * (ew_var + alpha * deviation ** 2), ew_var)
+        ewma = np.where(started, ewma + alpha * deviation, np.where(first, x, ewma))
+
+        latest = np.where(seen, x, latest)
+        last_period = np.where(seen, t, last_period)
+
+    total_posts = counts.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        long_run_mean = np.nansum(np.nan_to_num(mean) * counts, axis=1) / total_posts
+        z_score = (latest - baseline) / np.maximum(baseline_std, MIN_STD)
+
+    return {
+        'ewma': ewma, 'baseline': baseline, 'baseline_std': baseline_std, 'latest': latest,
+        'z_score': z_score, 'cusum': cusum, 'long_run_mean': long_run_mean,
+        'total_posts': total_posts, 'n_observed': n_observed, 'last_period': last_period,
+    }
+
+
+def label_trends(stats):
+    """Vectorized trend labels from the EWMA vs long-run mean gap."""
+    gap = stats['ewma'] - stats['long_run_mean']
+    labels = np.where(gap >= TREND_THRESHOLD, 'Trending Positively',
+                      np.where(gap <= -TREND_THRESHOLD, 'Trending Negatively', 'Holding Neutral'))
+    return np.where(stats['total_posts'] >= MIN_POSTS, labels, 'Insufficient Data')
+
+
+def run_trend_detection(df):
+    """
+    Computes trend labels and sentiment-drop alerts for every place and city in `df`.
+    Returns (entities_df, alerts_df), one row per entity and one per alert.
+    """
+    df = df.assign(post_date=parse_post_dates(df['date'])).dropna(subset=['post_date', 'sentiment_score'])
+    ordinals = pd.PeriodIndex(df['post_date'].dt.to_period(PERIOD)).asi8
+    df = df.assign(period_code=ordinals - ordinals.min())
+    period_index = pd.period_range(df['post_date'].min(), periods=int(df['period_code'].max()) + 1, freq=PERIOD)
+
+    place_col = 'place_id' if 'place_id' in df.columns else 'place_name'
+    name_col = 'canonical_place_name' if 'canonical_place_name' in df.columns else 'place_name'
+    places = df[df['place_name'] != 'MISSING_PLACE']
+    cities = df[df['city'] != 'MISSING_CITY']
+
+    frames = []
+    for entity_type, subset, key_col in (('place', places, place_col), ('city', cities, 'city')):
+        codes, uniques = pd.factorize(subset[key_col])
+        mean, counts = build_sentiment_matrix(
+            codes, subset['period_code'].to_numpy(), subset['sentiment_score'].to_numpy(dtype=np.float64),
+            len(uniques), len(period_index)
+        )
+        stats = detect_trends(mean, counts)
+
+        frame = pd.DataFrame(stats)
+        frame.insert(0, 'entity_type', entity_type)
+        frame.insert(1, 'entity_id', np.asarray(uniques, dtype=object))
+        if entity_type == 'place':
+            first_rows = subset.drop_duplicates(key_col).set_index(key_col)
+            frame.insert(2, 'name', frame['entity_id'].map(first_rows[name_col]))
+            frame.insert(3, 'city', frame['entity_id'].map(first_rows['city']))
+        else:
+            frame.insert(2, 'name', frame['entity_id'])
+            frame.insert(3, 'city', frame['entity_id'])
+        frame['trend'] = label_trends(stats)
+        frame['recent'] = stats['last_period'] >= len(period_index) - RECENT_PERIODS
+        frame['last_period'] = np.where(
+            stats['last_period'] >= 0, period_index.astype(str).to_numpy()[stats['last_period']], None
+        )
+        frames.append(frame)
+
+    entities = pd.concat(frames, ignore_index=True)
+    entities['total_posts'] = entities['total_posts'].astype(int)
+    eligible = (
+        entities['recent']
+        & (entities['total_posts'] >= MIN_POSTS)
+        & (entities['n_observed'] >= MIN_OBSERVED_PERIODS)
+    )
+    sudden = eligible & (entities['z_score'] <= -Z_ALERT)
+    # A CUSUM alarm only counts while the entity is still below its baseline
+    sustained = eligible & (entities['cusum'] >= CUSUM_ALERT) & (entities['latest'] < entities['baseline'])
+    high = (entities['z_score'] <= -2 * Z_ALERT) | (entities['cusum'] >= 2 * CUSUM_ALERT)
+
+    alerts = entities.assign(
+        reason=np.where(sudden, 'sudden_drop', 'sustained_decline'),
+        severity=np.where(high, 'high', 'medium'),
+    )[sudden | sustained].sort_values(['severity', 'z_score'])
+    return entities, alerts
+
+
+def _round_record(record):
+    return {k: (round(v, 4) if isinstance(v, float) and np.isfinite(v) else (None if isinstance(v, float) else v))
+            for k, v in record.items()}
+
+# --- Main Execution Block ---
+
+def main():
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: Clean data file not found at {INPUT_FILE}. Please run data_cleaner.py first.")
+        return
+
+    df = pd.read_csv(INPUT_FILE)
+    print(f"Scanning {len(df)} posts for sentiment trends and spikes...")
+    entities, alerts = run_trend_detection(df)
+
+    # Chatbot-facing labels, keyed like the assistant's knowledge base: "Place (City)"
+    labelled = entities[(entities['entity_type'] == 'place') & (entities['trend'] != 'Insufficient Data')]
+    trending = {
+        f"{row.name} ({row.city})": {
+            'place_id': row.entity_id,
+            'sentiment_score': round(float(row.ewma), 3),
+            'trend': row.trend,
+        }
+        for row in labelled.itertuples(index=False)
+    }
+
+    alert_columns = ['entity_type', 'entity_id', 'name', 'city', 'last_period', 'latest', 'baseline',
+                     'z_score', 'cusum', 'total_posts', 'reason', 'severity']
+    output = {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'period': PERIOD,
+        'trending': trending,
+        'alerts': [_round_record(r) for r in alerts[alert_columns].to_dict('records')],
+    }
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with open(OUTPUT_FILE, 'w') as f:
+        json.dump(output, f, indent=4)
+
+    counts = labelled['trend'].value_counts().to_dict()
+    print(f"Labelled {len(labelled)} places: {counts}")
+    print(f"Raised {len(alerts)} sentiment-drop alerts.")
+    print(f"[SUCCESS] Trend labels and alerts saved to {OUTPUT_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
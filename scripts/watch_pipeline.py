@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from data_cleaner import (setup_nltk, cleaning_rules_version, process_pending_files, materialize_clean_store,
+                          publish_clean_data, materialize_new_posts, publish_new_posts, OUTPUT_FILE)
+from raw_manifest import RawManifest, resolve_sources, RAW_DIR
+from add_coordinates import add_coordinates_and_save, update_coordinates, MAP_FILE
+from analysis_engine import run_exact_analysis, update_exact_analysis, ANALYSIS_COLUMNS, ANALYSIS_STATE_FILE
+from civic_complaint_extractor import extract_and_analyze_civic_data, update_civic_data
+from entity_resolution import PLACE_IDS_FILE
+from post_store import load_posts, STATS_FILE
+import dashboard_artifacts
+
+# --- Configuration ---
+SPOOL_DIR = 'data/spool'                      # scrapers drop new raw CSVs here
+ARCHIVE_DIR = os.path.join(RAW_DIR, 'spool')  # claimed files move here, so batch runs see them as processed
+FAILED_DIR = 'data/quarantine/failed_drops'   # claimed files that could not be ingested, with the error
+VERSION_FILE = 'data/artifact_version.json'
+POLL_SECONDS = 5
+SETTLE_SECONDS = 2           # files modified more recently than this may still be being written
+MAX_BATCH_FILES = 50         # bounds the work (and latency) of one micro-batch
+
+# Artifacts each stage rewrites; published with the version so readers know what changed
+STAGE_ARTIFACTS = {
+    'clean': ['turiscope_mp_tourism_clean_data.csv', 'data/post_store'],
+    'geocode': ['data/map_data.json'],
+    'aggregate': ['data/analysis_results.json'],
+    'civic': ['data/civic_impact_metrics.json', 'data/extracted_civic_complaints.csv'],
+    'dashboard': [dashboard_artifacts.OUTPUT_FILE],
+}
+
+# State a batch pipeline run leaves behind; with all of it present a micro-batch only processes its new posts
+INCREMENTAL_STATE = [OUTPUT_FILE, STATS_FILE, PLACE_IDS_FILE, MAP_FILE, ANALYSIS_STATE_FILE]
+
+
+def read_artifact_version(version_file=VERSION_FILE):
+    """Last published version record ({'version': 0} before the first micro-batch)."""
+    if not os.path.exists(version_file):
+        return {'version': 0}
+    with open(version_file, 'r') as f:
+        return json.load(f)
+
+
+def publish_artifact_version(record, version_file=VERSION_FILE):
+    """Writes the next version number atomically, so the dashboard never reads a half-written file."""
+    record = {**record, 'version': read_artifact_version(version_file)['version'] + 1}
+    os.makedirs(os.path.dirname(version_file), exist_ok=True)
+    tmp_file = f"{version_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(record, f, indent=4)
+    os.replace(tmp_file, version_file)
+    return record['version']
+
+
+def ready_files(spool_dir=SPOOL_DIR):
+    """Spooled CSVs that have stopped changing, oldest first, at most MAX_BATCH_FILES."""
+    now = time.time()
+    files = [p for p in resolve_sources(spool_dir) if now - os.path.getmtime(p) >= SETTLE_SECONDS]
+    return sorted(files, key=os.path.getmtime)[:MAX_BATCH_FILES]
+
+
+def claim_files(paths, archive_dir=ARCHIVE_DIR):
+    """Moves a batch out of the spool into the raw archive (timestamp-prefixed so names never collide)."""
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    target_dir = os.path.join(archive_dir, stamp[:8])
+    os.makedirs(target_dir, exist_ok=True)
+    claimed = []
+    for path in paths:
+        target = os.path.normpath(os.path.join(target_dir, f"{stamp}-{os.path.basename(path)}"))
+        os.replace(path, target)
+        claimed.append(target)
+    return claimed
+
+
+def unprocessed_claims(manifest, archive_dir=ARCHIVE_DIR):
+    """Claimed files the manifest has no record of, e.g. because the watcher stopped mid-batch."""
+    return [path for path in resolve_sources(archive_dir) if path not in manifest.files]
+
+
+def quarantine_files(failures, failed_dir=FAILED_DIR):
+    """Moves claimed files that could not be ingested out of the archive, with the error next to each."""
+    if failures:
+        os.makedirs(failed_dir, exist_ok=True)
+    for path, error in failures.items():
+        target = os.path.join(failed_dir, os.path.basename(path))
+        os.replace(path, target)
+        with open(f"{target}.error.txt", 'w') as f:
+            f.write(f"{error}\n")
+        print(f"Moved {os.path.basename(path)} to {failed_dir}/.")
+
+
+def run_micro_batch(paths, manifest, rules_version):
+    """
+    Runs clean -> geocode -> aggregate -> civic -> dashboard artifacts for one batch.
+    Files that fail to ingest are moved to FAILED_DIR and the rest of the batch carries on.
+    Returns (stage timings, {path: error}); timings are None when every file in the batch failed.
+
+    Normally only the batch's new posts go through the stages: they are appended to the post store
+    partitions they fall in, their place ids are resolved against the stored place-id table, and
+    their sums are merged into the saved aggregates, so latency follows the batch size rather than
+    the history. Without that state (first run), or with an empty `paths` (retry after a failed
+    batch), the stages are rebuilt over everything ingested so far.
+    """
+    timings = {}
+    incremental = bool(paths) and all(os.path.exists(path) for path in INCREMENTAL_STATE)
+
+    started = time.perf_counter()
+    failures = process_pending_files(manifest, paths, rules_version)
+    quarantine_files(failures)
+    if paths and len(failures) == len(paths):
+        return None, failures
+    print("Processing only the new posts." if incremental else "Rebuilding every stage over all ingested posts.")
+    if incremental:
+        new_posts = materialize_new_posts(manifest, [p for p in paths if p not in failures])
+        publish_new_posts(new_posts)
+    else:
+        publish_clean_data(materialize_clean_store(manifest))
+    timings['clean'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if incremental:
+        update_coordinates(new_posts)
+    else:
+        add_coordinates_and_save()
+    timings['geocode'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if incremental:
+        update_exact_analysis(new_posts[[col for col in ANALYSIS_COLUMNS if col in new_posts.columns]])
+    else:
+        run_exact_analysis(load_posts(columns=ANALYSIS_COLUMNS))
+    timings['aggregate'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if incremental:
+        update_civic_data(new_posts)
+    else:
+        extract_and_analyze_civic_data()
+    timings['civic'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    dashboard_artifacts.main()
+    timings['dashboard'] = time.perf_counter() - started
+
+    return {stage: round(seconds, 3) for stage, seconds in timings.items()}, failures
+
+
+def process_spool(manifest, rules_version, spool_dir=SPOOL_DIR, retry=False):
+    """
+    Claims and processes one micro-batch: settled spool files plus claimed files a previous run left
+    unprocessed. With retry=True the stages run even without new files (the last batch failed).
+    Returns the published version or None.
+    """
+    recovered = unprocessed_claims(manifest)
+    batch = ready_files(spool_dir)
+    if not batch and not recovered and not retry:
+        return None
+    if recovered:
+        print(f"\nRecovering {len(recovered)} claimed file(s) missing from the manifest.")
+    oldest_drop = min((os.path.getmtime(p) for p in batch + recovered), default=time.time())
+    claimed = recovered + claim_files(batch)
+    print(f"\n[{datetime.now():%H:%M:%S}] Micro-batch of {len(claimed)} file(s): {', '.join(os.path.basename(p) for p in claimed) or '(retry)'}")
+
+    timings, failures = run_micro_batch(claimed, manifest, rules_version)
+    if timings is None:
+        print("No file in this batch could be ingested; nothing published.")
+        return None
+    processed = [p for p in claimed if p not in failures]
+    rows_accepted = sum(manifest.files[p]['rows_accepted'] for p in processed)
+    version = publish_artifact_version({
+        'published_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'files': processed,
+        'failed_files': sorted(os.path.basename(p) for p in failures),
+        'rows_accepted': rows_accepted,
+        'artifacts': sorted(path for paths in STAGE_ARTIFACTS.values() for path in paths),
+        'stage_seconds': timings,
+        'freshness_seconds': round(time.time() - oldest_drop, 3),
+    })
+    print(f"[SUCCESS] Artifact version {version} published: {rows_accepted} new post(s), "
+          f"{sum(timings.values()):.1f}s of processing, {time.time() - oldest_drop:.1f}s since the oldest drop.")
+    return version
+
+# --- Main Execution Block ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a spool directory and refresh the dashboard artifacts in micro-batches.")
+    parser.add_argument('--spool', default=SPOOL_DIR, help=f"Directory scrapers drop raw CSVs into (default: {SPOOL_DIR}).")
+    parser.add_argument('--interval', type=float, default=POLL_SECONDS, help="Seconds between spool polls.")
+    parser.add_argument('--once', action='store_true', help="Process whatever is ready now and exit.")
+    args = parser.parse_args()
+
+    setup_nltk()
+    os.makedirs(args.spool, exist_ok=True)
+    manifest = RawManifest()
+    rules_version = cleaning_rules_version()
+    print(f"\nWatching {args.spool}/ every {args.interval}s (Ctrl+C to stop). Current artifact version: "
+          f"{read_artifact_version()['version']}.")
+
+    retry = False
+    try:
+        while True:
+            try:
+                version = process_spool(manifest, rules_version, args.spool, retry)
+                retry = False
+            except Exception as e:
+                # Claimed files missing from the manifest are recovered next poll; retry re-runs the stages too
+                print(f"[ERROR] Micro-batch failed: {type(e).__name__}: {e}. Retrying on the next poll.")
+                version, retry = None, True
+            if args.once:
+                if version is None and not retry:
+                    print("No artifact version published.")
+                return
+            if version is None:
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nWatcher stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import types
+import pytest
+from benchmark_chat_context import ENTITIES, PLACES, SCRIPT, SYSTEM_TOKENS, StubModel, run_session
+from chat_context import ConversationContext, estimate_tokens
+
+APP_FILE = os.path.join(os.path.dirname(__file__), '..', 'app.py')
+ACK_TOKENS = estimate_tokens("Noted, I'll use that context.")
+
+
+def scripted_prompt(turn):
+    return SCRIPT[turn % len(SCRIPT)].format(place=PLACES[(turn // len(SCRIPT)) % len(PLACES)])
+
+
+def test_history_stays_under_budget_over_a_long_session():
+    context = ConversationContext(entities=ENTITIES)
+    model = StubModel()
+    for turn in range(200):
+        prompt = scripted_prompt(turn)
+        contents = context.build_contents(prompt)
+        history = ConversationContext.contents_tokens(contents) - estimate_tokens(prompt)
+        assert history <= context.budget_tokens + ACK_TOKENS
+        context.add_exchange(prompt, model.generate_content(contents))
+        assert estimate_tokens(context.summary()) <= context.summary_tokens
+        assert len(context.exchanges) <= context.keep_recent
+
+    assert context.summary_lines and context.omitted > 0
+
+
+def test_folding_keeps_recently_discussed_places():
+    turns = 44
+    context = ConversationContext(entities=ENTITIES)
+    _, calls = run_session(context, turns)
+
+    # The session came back round to the first place after every other one was discussed and folded
+    last_place = PLACES[((turns - 1) // len(SCRIPT)) % len(PLACES)]
+    assert context.summary_lines
+    assert context.recent_entities[-1] == last_place
+    assert last_place in context.summary()
+    for turn, contents in enumerate(calls):
+        if SCRIPT[turn % len(SCRIPT)].startswith("What are its"):
+            earlier = ' '.join(part for message in contents[:-1] for part in message['parts'])
+            assert PLACES[(turn // len(SCRIPT)) % len(PLACES)] in earlier
+
+
+def test_recent_entities_are_capped_and_ordered():
+    context = ConversationContext(entities=ENTITIES)
+    for place in PLACES + ['Upper Lake']:
+        context.add_exchange(f"Tell me about {place}.", "It is worth a visit.")
+
+    assert context.recent_entities == PLACES[1:] + ['Upper Lake']
+
+
+def test_record_turn_stores_prompt_tokens_and_latency():
+    context = ConversationContext(entities=ENTITIES)
+    context.add_exchange("Tell me about Upper Lake.", "It is a large lake in Bhopal.")
+    contents = context.build_contents("What are its timings?")
+
+    record = context.record_turn(contents, SYSTEM_TOKENS, 0.12345)
+
+    assert record is context.turn_metrics[-1]
+    assert record['turn'] == 1
+    assert record['history_tokens'] == ConversationContext.contents_tokens(contents)
+    assert record['prompt_tokens'] == record['history_tokens'] + SYSTEM_TOKENS
+    assert record['latency_s'] == 0.123
+    assert record['verbatim_exchanges'] == 1
+    assert record['folded_exchanges'] == 0
+
+
+def test_stub_session_latency_stays_flat():
+    metrics, _ = run_session(ConversationContext(entities=ENTITIES), 40)
+
+    assert [m['turn'] for m in metrics] == list(range(1, 41))
+    assert max(m['prompt_tokens'] for m in metrics) <= SYSTEM_TOKENS + 1200 + ACK_TOKENS + 50
+    assert all(m['latency_s'] > 0 for m in metrics)
+
+
+class FailingModel:
+    """Replies to every prompt except those containing 'fail', which raise like a quota error would."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def generate_content(self, contents=None, **kwargs):
+        prompt = contents[-1]['parts'][0]
+        if 'fail' in prompt:
+            raise RuntimeError("429 quota exceeded")
+        return types.SimpleNamespace(candidates=(), text=f"Reply to: {prompt}")
+
+
+@pytest.fixture
+def gemini_stub(monkeypatch):
+    google = sys.modules.get('google') or types.ModuleType('google')
+    if not hasattr(google, '__path__'):
+        google.__path__ = []
+    genai = types.ModuleType('google.generativeai')
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = FailingModel
+    monkeypatch.setitem(sys.modules, 'google', google)
+    monkeypatch.setitem(sys.modules, 'google.generativeai', genai)
+    monkeypatch.setattr(google, 'generativeai', genai, raising=False)
+    return genai
+
+
+def test_error_replies_are_not_added_as_exchanges(gemini_stub):
+    pytest.importorskip('streamlit')
+    from streamlit.testing.v1 import AppTest
+    from benchmark_startup import VIEWS
+
+    app = AppTest.from_file(APP_FILE, default_timeout=60)
+    app.secrets['gemini'] = {'api_key': 'stub'}
+    app.run()
+    app.sidebar.radio[0].set_value(VIEWS[2]).run()
+    app.chat_input[0].set_value("Tell me about Upper Lake.").run()
+    app.chat_input[0].set_value("Please fail this one.").run()
+
+    context = app.session_state['chat_context']
+    assert context.exchanges == [("Tell me about Upper Lake.", "Reply to: Tell me about Upper Lake.")]
+    assert len(context.turn_metrics) == 2
+    assert app.session_state['messages'][-1]['content'].startswith("Gemini error:")